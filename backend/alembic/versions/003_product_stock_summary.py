@@ -0,0 +1,70 @@
+"""Add denormalized stock summary columns to products
+
+Revision ID: 003_product_stock_summary
+Revises: 002_variant_version
+Create Date: 2024-02-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003_product_stock_summary'
+down_revision: Union[str, None] = '002_variant_version'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Stock summary maintained from product_variants, used by catalog filters
+    op.add_column(
+        'products',
+        sa.Column('in_stock', sa.Boolean(), nullable=False, server_default='false')
+    )
+    op.add_column(
+        'products',
+        sa.Column(
+            'available_sizes',
+            postgresql.ARRAY(sa.String(20)),
+            nullable=False,
+            server_default='{}',
+        )
+    )
+
+    # Backfill from current variant stock
+    op.execute(
+        """
+        UPDATE products p
+        SET in_stock = s.in_stock,
+            available_sizes = s.available_sizes
+        FROM (
+            SELECT
+                product_id,
+                bool_or(stock > 0) AS in_stock,
+                coalesce(
+                    array_agg(DISTINCT size ORDER BY size) FILTER (WHERE stock > 0),
+                    '{}'
+                ) AS available_sizes
+            FROM product_variants
+            GROUP BY product_id
+        ) s
+        WHERE p.id = s.product_id
+        """
+    )
+
+    op.create_index(
+        'ix_products_available_sizes',
+        'products',
+        ['available_sizes'],
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_available_sizes', table_name='products')
+    op.drop_column('products', 'available_sizes')
+    op.drop_column('products', 'in_stock')
@@ -0,0 +1,65 @@
+"""Add foreign key and listing indexes
+
+Revision ID: 004_foreign_key_indexes
+Revises: 003_product_stock_summary
+Create Date: 2024-02-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004_foreign_key_indexes'
+down_revision: Union[str, None] = '003_product_stock_summary'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, extra create_index kwargs)
+INDEXES = [
+    # selectinload(Product.variants) and variant lookups by product
+    ('ix_product_variants_product_id', 'product_variants', ['product_id'], {}),
+    # Category filter on the catalog
+    ('ix_products_category_id', 'products', ['category_id'], {}),
+    # Storefront listing: active products, newest first
+    (
+        'ix_products_active_created_at',
+        'products',
+        ['created_at'],
+        {'postgresql_where': sa.text('is_active')},
+    ),
+    # selectinload(Order.items)
+    ('ix_order_items_order_id', 'order_items', ['order_id'], {}),
+    # User order history, newest first (also covers lookups by user_id)
+    ('ix_orders_user_id_created_at', 'orders', ['user_id', 'created_at'], {}),
+    # User wishlist, newest first
+    ('ix_wishlist_items_user_id_created_at', 'wishlist_items', ['user_id', 'created_at'], {}),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+                **kwargs,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,46 @@
+"""Cart write-behind: unique session carts with a revision
+
+Revision ID: 005_cart_write_behind
+Revises: 004_foreign_key_indexes
+Create Date: 2024-02-22 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005_cart_write_behind'
+down_revision: Union[str, None] = '004_foreign_key_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Revision of the Redis cart document last written to the row; the
+    # write-behind sync only ever moves a cart forward.
+    op.add_column(
+        'carts',
+        sa.Column('revision', sa.BigInteger(), server_default='0', nullable=False),
+    )
+
+    # One cart per session: keep the newest, then make the index unique so
+    # the sync can upsert with ON CONFLICT (session_id).
+    op.execute(
+        """
+        DELETE FROM carts c
+        USING carts newer
+        WHERE c.session_id = newer.session_id
+          AND (newer.created_at, newer.id) > (c.created_at, c.id)
+        """
+    )
+    op.drop_index('ix_carts_session_id', table_name='carts')
+    op.create_index('ix_carts_session_id', 'carts', ['session_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_carts_session_id', table_name='carts')
+    op.create_index('ix_carts_session_id', 'carts', ['session_id'])
+    op.drop_column('carts', 'revision')
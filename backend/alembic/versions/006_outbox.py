@@ -0,0 +1,37 @@
+"""Add transactional outbox
+
+Revision ID: 006_outbox
+Revises: 005_cart_write_behind
+Create Date: 2024-02-29 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006_outbox'
+down_revision: Union[str, None] = '005_cart_write_behind'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Delivered messages are deleted, so the table stays small; the index
+    # for the relay's (attempts, id) poll is added in 010_outbox_dead_letter.
+    op.create_table(
+        'outbox_messages',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('topic', sa.String(100), nullable=False),
+        sa.Column('payload', postgresql.JSONB(), nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('outbox_messages')
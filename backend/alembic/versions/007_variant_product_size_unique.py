@@ -0,0 +1,35 @@
+"""One variant per product and size
+
+Revision ID: 007_variant_product_size_unique
+Revises: 006_outbox
+Create Date: 2024-03-07 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007_variant_product_size_unique'
+down_revision: Union[str, None] = '006_outbox'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Already enforced by the admin API; as a constraint it lets the bulk
+    # import upsert variants with ON CONFLICT (product_id, size). Also
+    # covers lookups by product_id, so the plain index is dropped.
+    op.create_index(
+        'ix_product_variants_product_id_size',
+        'product_variants',
+        ['product_id', 'size'],
+        unique=True,
+    )
+    op.drop_index('ix_product_variants_product_id', table_name='product_variants')
+
+
+def downgrade() -> None:
+    op.create_index('ix_product_variants_product_id', 'product_variants', ['product_id'])
+    op.drop_index('ix_product_variants_product_id_size', table_name='product_variants')
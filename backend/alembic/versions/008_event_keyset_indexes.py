@@ -0,0 +1,74 @@
+"""Add (event_time, id) keyset indexes for event history
+
+Revision ID: 008_event_keyset_indexes
+Revises: 007_variant_product_size_unique
+Create Date: 2024-03-12 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008_event_keyset_indexes'
+down_revision: Union[str, None] = '007_variant_product_size_unique'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (new index, columns, index it replaces, its columns)
+INDEXES = [
+    # User event history and export, paged by (event_time, id)
+    (
+        'ix_events_user_event_time_id',
+        ['user_id', 'event_time', 'id'],
+        'ix_events_user_event_time',
+        ['user_id', 'event_time'],
+    ),
+    # Session event history, paged the same way
+    (
+        'ix_events_session_event_time_id',
+        ['session_id', 'event_time', 'id'],
+        'ix_events_session_event_time',
+        ['session_id', 'event_time'],
+    ),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, columns, old_name, _ in INDEXES:
+            op.create_index(
+                name,
+                'events',
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+            # The new index covers every query the old one served
+            op.drop_index(
+                old_name,
+                table_name='events',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, old_name, old_columns in reversed(INDEXES):
+            op.create_index(
+                old_name,
+                'events',
+                old_columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+            op.drop_index(
+                name,
+                table_name='events',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
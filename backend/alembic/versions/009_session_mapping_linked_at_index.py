@@ -0,0 +1,40 @@
+"""Add linked_at index for the identity link backfill
+
+Revision ID: 009_session_mapping_linked_at
+Revises: 008_event_keyset_indexes
+Create Date: 2024-03-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '009_session_mapping_linked_at'
+down_revision: Union[str, None] = '008_event_keyset_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # backfill_identity_links only looks at recently linked sessions
+        op.create_index(
+            'ix_session_user_mappings_linked_at',
+            'session_user_mappings',
+            ['linked_at'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_session_user_mappings_linked_at',
+            table_name='session_user_mappings',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
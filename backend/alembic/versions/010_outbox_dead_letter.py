@@ -0,0 +1,47 @@
+"""Dead-letter outbox messages and index the relay's poll
+
+Revision ID: 010_outbox_dead_letter
+Revises: 009_session_mapping_linked_at
+Create Date: 2024-03-21 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '010_outbox_dead_letter'
+down_revision: Union[str, None] = '009_session_mapping_linked_at'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'outbox_messages',
+        sa.Column('dead_lettered_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        # The relay polls pending messages ordered by (attempts, id)
+        op.create_index(
+            'ix_outbox_messages_pending',
+            'outbox_messages',
+            ['attempts', 'id'],
+            postgresql_where=sa.text('dead_lettered_at IS NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_outbox_messages_pending',
+            table_name='outbox_messages',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('outbox_messages', 'dead_lettered_at')
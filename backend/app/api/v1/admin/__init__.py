@@ -1,7 +1,7 @@
 # Admin API endpoints
 from fastapi import APIRouter
 
-from app.api.v1.admin import products, orders, categories
+from app.api.v1.admin import products, orders, categories, inventory, events
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -9,3 +9,5 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 router.include_router(products.router)
 router.include_router(orders.router)
 router.include_router(categories.router)
+router.include_router(inventory.router)
+router.include_router(events.router)
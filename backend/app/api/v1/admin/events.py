@@ -0,0 +1,25 @@
+"""Admin event endpoints (data requests and offline analytics)."""
+from uuid import UUID
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import AdminUser
+from app.api.v1.events import event_export_cursor, event_export_response
+from app.services.event_service import EventCursor
+
+router = APIRouter(prefix="/events", tags=["admin-events"])
+
+
+@router.get("/users/{user_id}/export")
+async def export_user_events(
+    user_id: UUID,
+    admin: AdminUser,
+    after: Optional[EventCursor] = Depends(event_export_cursor),
+):
+    """
+    Export a user's full event history as NDJSON, oldest first.
+
+    Resumable with **after_time** and **after_id**, like /events/me/export.
+    """
+    return event_export_response(user_id, after)
@@ -0,0 +1,127 @@
+"""Admin inventory endpoints (bulk stock sync)."""
+from uuid import UUID
+from typing import Optional
+
+from fastapi import APIRouter
+from pydantic import BaseModel, Field, model_validator
+
+from app.api.deps import DbSession, AdminUser
+from app.services.inventory_service import InventoryService
+from app.services.outbox import outbox_relay
+
+router = APIRouter(prefix="/inventory", tags=["admin-inventory"])
+
+
+class StockLevel(BaseModel):
+    """Absolute stock for a SKU (e.g. from a warehouse snapshot)."""
+    sku: str = Field(min_length=1, max_length=100)
+    stock: int = Field(ge=0)
+
+
+class StockAdjustment(BaseModel):
+    """Relative stock change for a variant."""
+    variant_id: UUID
+    delta: int
+
+
+class BulkStockUpdate(BaseModel):
+    """Schema for changing the stock of many variants at once."""
+    levels: list[StockLevel] = Field(default=[], max_length=20000)
+    adjustments: list[StockAdjustment] = Field(default=[], max_length=20000)
+
+    @model_validator(mode="after")
+    def require_changes(self) -> "BulkStockUpdate":
+        if not self.levels and not self.adjustments:
+            raise ValueError("Provide levels or adjustments")
+        return self
+
+
+class BulkStockResult(BaseModel):
+    """Outcome for one level or adjustment of a bulk stock update."""
+    sku: Optional[str] = None
+    variant_id: Optional[UUID] = None
+    success: bool
+    stock: Optional[int] = None  # Stock after the update (None if not found)
+    error: Optional[str] = None
+
+
+class BulkStockResponse(BaseModel):
+    """Bulk stock update response."""
+    updated: int  # Variants whose stock changed
+    failed: int
+    results: list[BulkStockResult]
+
+
+@router.post("/stock/bulk", response_model=BulkStockResponse)
+async def bulk_update_stock(
+    stock_update: BulkStockUpdate,
+    admin: AdminUser,
+    db: DbSession,
+):
+    """
+    Set stock by SKU and/or adjust it by variant in one transaction.
+
+    Levels are applied first, then adjustments (several adjustments of one
+    variant add up). An adjustment that would take stock below zero is
+    rejected as a conflict, as are unknown SKUs and variants; the rest are
+    still applied. All changed variants are written with a single UPDATE,
+    and their products' stock summary is refreshed (which publishes
+    inventory.stock_changed events for stock caches).
+    """
+    levels = {level.sku: level.stock for level in stock_update.levels}
+    deltas: dict[UUID, int] = {}
+    for adjustment in stock_update.adjustments:
+        deltas[adjustment.variant_id] = deltas.get(adjustment.variant_id, 0) + adjustment.delta
+
+    inventory = InventoryService(db)
+    variants = await inventory.lock_variants(variant_ids=list(deltas), skus=list(levels))
+    current = {variant.id: variant.stock for variant in variants}
+    by_sku = {variant.sku: variant.id for variant in variants if variant.sku}
+
+    stock = dict(current)
+    results = []
+    for sku, level in levels.items():
+        variant_id = by_sku.get(sku)
+        if variant_id is None:
+            results.append(BulkStockResult(sku=sku, success=False, error="SKU not found"))
+            continue
+        stock[variant_id] = level
+        results.append(BulkStockResult(sku=sku, variant_id=variant_id, success=True, stock=level))
+
+    for variant_id, delta in deltas.items():
+        if variant_id not in stock:
+            results.append(
+                BulkStockResult(variant_id=variant_id, success=False, error="Variant not found")
+            )
+        elif stock[variant_id] + delta < 0:
+            results.append(
+                BulkStockResult(
+                    variant_id=variant_id,
+                    success=False,
+                    stock=stock[variant_id],
+                    error=f"Insufficient stock: {stock[variant_id]} available, change of {delta}",
+                )
+            )
+        else:
+            stock[variant_id] += delta
+            results.append(
+                BulkStockResult(variant_id=variant_id, success=True, stock=stock[variant_id])
+            )
+
+    # Snapshots mostly repeat the current stock; only write what changed
+    changed = {variant_id: level for variant_id, level in stock.items() if level != current[variant_id]}
+    await inventory.write_stock(changed)
+    await db.commit()
+    if changed:
+        outbox_relay.wake()
+
+    # Levels report the final stock too, when an adjustment followed them
+    for result in results:
+        if result.success:
+            result.stock = stock[result.variant_id]
+
+    return BulkStockResponse(
+        updated=len(changed),
+        failed=sum(1 for result in results if not result.success),
+        results=results,
+    )
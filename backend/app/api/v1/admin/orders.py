@@ -3,15 +3,19 @@ from uuid import UUID
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from pydantic import BaseModel
-from sqlalchemy import select, func
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy import any_, bindparam, select, func, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import DbSession, AdminUser
+from app.domain.order import get_allowed_sources
 from app.models import Order, OrderItem
 from app.models.order import OrderStatus
 from app.schemas.order import OrderResponse, OrderItemResponse, ShippingAddress
+from app.services.export import MEDIA_TYPES, ExportFormat, export_headers, stream_export
 
 router = APIRouter(prefix="/orders", tags=["admin-orders"])
 
@@ -21,6 +25,28 @@ class OrderStatusUpdate(BaseModel):
     status: OrderStatus
 
 
+class BulkOrderStatusUpdate(BaseModel):
+    """Schema for moving many orders to one status."""
+    order_ids: list[UUID] = Field(min_length=1, max_length=5000)
+    status: OrderStatus
+
+
+class BulkOrderStatusResult(BaseModel):
+    """Outcome for one order of a bulk status update."""
+    order_id: UUID
+    success: bool
+    status: Optional[OrderStatus] = None  # Status after the update (None if not found)
+    error: Optional[str] = None
+
+
+class BulkOrderStatusResponse(BaseModel):
+    """Bulk status update response."""
+    status: OrderStatus
+    updated: int
+    failed: int
+    results: list[BulkOrderStatusResult]
+
+
 class OrderListResponse(BaseModel):
     """Paginated order list response."""
     items: list[OrderResponse]
@@ -55,6 +81,11 @@ def parse_order_status(value: str) -> OrderStatus:
     )
 
 
+def uuid_array(name: str, values: list[UUID]):
+    """Bind a list of UUIDs as one uuid[] parameter (for ``= ANY(...)``)."""
+    return bindparam(name, values, type_=ARRAY(PG_UUID(as_uuid=True)))
+
+
 def order_to_response(order: Order) -> OrderResponse:
     """Convert order model to response."""
     return OrderResponse(
@@ -146,6 +177,56 @@ async def list_orders(
     )
 
 
+@router.get("/export")
+async def export_orders(
+    admin: AdminUser,
+    format: ExportFormat = Query("csv"),
+    status: Optional[str] = None,
+    search: Optional[str] = None,
+):
+    """
+    Export all orders matching the list filters, one row per order.
+
+    The file is streamed from a server-side cursor, so exports of any size
+    take constant memory.
+    """
+    parsed_status: Optional[OrderStatus] = None
+    if status is not None:
+        parsed_status = parse_order_status(status)
+
+    query = (
+        select(
+            Order.id,
+            Order.order_number,
+            Order.status,
+            Order.user_id,
+            select(func.count(OrderItem.id))
+            .where(OrderItem.order_id == Order.id)
+            .scalar_subquery()
+            .label("item_count"),
+            Order.subtotal,
+            Order.shipping_cost,
+            Order.tax,
+            Order.total,
+            Order.shipping_address,
+            Order.notes,
+            Order.created_at,
+            Order.updated_at,
+        )
+        .order_by(Order.created_at.desc())
+    )
+    if parsed_status:
+        query = query.where(Order.status == parsed_status)
+    if search:
+        query = query.where(Order.order_number.ilike(f"%{search}%"))
+
+    return StreamingResponse(
+        stream_export(query, format),
+        media_type=MEDIA_TYPES[format],
+        headers=export_headers("orders", format),
+    )
+
+
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
     order_id: UUID,
@@ -206,6 +287,75 @@ async def update_order_status(
     return order_to_response(order)
 
 
+@router.post("/status/bulk", response_model=BulkOrderStatusResponse)
+async def bulk_update_order_status(
+    status_update: BulkOrderStatusUpdate,
+    admin: AdminUser,
+    db: DbSession,
+):
+    """
+    Move many orders to one status (e.g. end-of-day shipping).
+
+    Transitions follow the same rules as the single-order update. All valid
+    transitions are applied in one UPDATE; every order gets a result, and
+    orders that are missing or in a state that cannot move to the target
+    status are reported as failures without affecting the others.
+    """
+    target = status_update.status
+    order_ids = list(dict.fromkeys(status_update.order_ids))
+    allowed_from = get_allowed_sources(target)
+
+    # Re-checks the status under the row lock, so concurrent updates are safe
+    updated: set[UUID] = set()
+    if allowed_from:
+        result = await db.execute(
+            update(Order)
+            .where(
+                Order.id == any_(uuid_array("order_ids", order_ids)),
+                Order.status.in_(allowed_from),
+            )
+            .values(status=target)
+            .returning(Order.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated = set(result.scalars().all())
+        await db.commit()
+
+    # Current status of the orders left over, to explain why
+    current: dict[UUID, OrderStatus] = {}
+    rejected = [order_id for order_id in order_ids if order_id not in updated]
+    if rejected:
+        result = await db.execute(
+            select(Order.id, Order.status).where(Order.id == any_(uuid_array("order_ids", rejected)))
+        )
+        current = dict(result.all())
+
+    results = []
+    for order_id in order_ids:
+        if order_id in updated:
+            results.append(BulkOrderStatusResult(order_id=order_id, success=True, status=target))
+        elif order_id not in current:
+            results.append(
+                BulkOrderStatusResult(order_id=order_id, success=False, error="Order not found")
+            )
+        else:
+            results.append(
+                BulkOrderStatusResult(
+                    order_id=order_id,
+                    success=False,
+                    status=current[order_id],
+                    error=f"Cannot transition from {current[order_id].value} to {target.value}",
+                )
+            )
+
+    return BulkOrderStatusResponse(
+        status=target,
+        updated=len(updated),
+        failed=len(order_ids) - len(updated),
+        results=results,
+    )
+
+
 @router.get("/stats/summary", response_model=dict)
 async def get_order_stats(
     admin: AdminUser,
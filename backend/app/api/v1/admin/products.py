@@ -1,17 +1,26 @@
 """Admin product management endpoints."""
 from uuid import UUID
-from typing import Optional
+from typing import AsyncIterator, Literal, Optional
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, Field
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import DbSession, AdminUser
+from app.db.base import async_session_maker
 from app.models import Product, ProductVariant, Category
 from app.schemas.product import ProductResponse, ProductVariantResponse, CategoryResponse
+from app.services.export import MEDIA_TYPES, ExportFormat, export_headers, stream_export
+from app.services.inventory_service import InventoryService
+from app.services.product_import import (
+    ProductImporter, parse_csv, parse_ndjson, read_spool, spool_upload,
+)
 
 router = APIRouter(prefix="/products", tags=["admin-products"])
 
@@ -81,8 +90,6 @@ class ProductListResponse(BaseModel):
 def product_to_response(product: Product) -> ProductResponse:
     """Convert product model to response."""
     variants = []
-    available_sizes = []
-    in_stock = False
 
     if product.variants:
         for v in product.variants:
@@ -95,9 +102,6 @@ def product_to_response(product: Product) -> ProductResponse:
                 created_at=v.created_at,
                 updated_at=v.updated_at,
             ))
-            if v.stock > 0:
-                in_stock = True
-                available_sizes.append(v.size)
 
     category_response = None
     if product.category:
@@ -133,8 +137,8 @@ def product_to_response(product: Product) -> ProductResponse:
         created_at=product.created_at,
         updated_at=product.updated_at,
         variants=variants,
-        in_stock=in_stock,
-        available_sizes=available_sizes,
+        in_stock=product.in_stock,
+        available_sizes=product.available_sizes,
     )
 
 
@@ -188,6 +192,62 @@ async def list_products(
     )
 
 
+@router.get("/export")
+async def export_products(
+    admin: AdminUser,
+    format: ExportFormat = Query("csv"),
+    search: Optional[str] = None,
+    is_active: Optional[bool] = None,
+):
+    """
+    Export all products matching the list filters, one row per variant
+    (products without variants get one row with empty variant columns).
+
+    The columns are those of the product import, so an export can be
+    edited and imported back. The file is streamed from a server-side
+    cursor, so exports of any size take constant memory.
+    """
+    query = (
+        select(
+            Product.slug,
+            Product.name,
+            Product.description,
+            Product.price,
+            Product.compare_at_price,
+            Product.images,
+            Product.brand,
+            Product.material,
+            Product.color,
+            Product.gender,
+            Product.is_active,
+            Product.is_featured,
+            Category.slug.label("category"),
+            Product.meta_title,
+            Product.meta_description,
+            ProductVariant.size,
+            ProductVariant.sku,
+            ProductVariant.stock,
+            Product.id.label("product_id"),
+            ProductVariant.id.label("variant_id"),
+            Product.created_at,
+            Product.updated_at,
+        )
+        .outerjoin(Category, Category.id == Product.category_id)
+        .outerjoin(ProductVariant, ProductVariant.product_id == Product.id)
+        .order_by(Product.created_at.desc(), Product.id, ProductVariant.size)
+    )
+    if search:
+        query = query.where(Product.name.ilike(f"%{search}%"))
+    if is_active is not None:
+        query = query.where(Product.is_active == is_active)
+
+    return StreamingResponse(
+        stream_export(query, format),
+        media_type=MEDIA_TYPES[format],
+        headers=export_headers("products", format),
+    )
+
+
 @router.post("", response_model=ProductResponse, status_code=201)
 async def create_product(
     product_data: ProductCreateAdmin,
@@ -243,6 +303,36 @@ async def create_product(
     return product_to_response(product)
 
 
+@router.post("/import")
+async def import_products(
+    request: Request,
+    admin: AdminUser,
+    format: Literal["csv", "ndjson"] = Query("csv"),
+):
+    """
+    Create or update products and variants from a CSV or NDJSON upload.
+
+    The request body is the file itself. It is received in full, then
+    imported in chunks (see app.services.product_import). The response
+    streams NDJSON progress events: "error" for each rejected record,
+    "progress" after each chunk, and a final "done" with the totals.
+    """
+    parse = parse_csv if format == "csv" else parse_ndjson
+    # Read before responding: the response's disconnect listener would
+    # otherwise consume body messages the parser is waiting for
+    upload = await spool_upload(request.stream())
+
+    async def events() -> AsyncIterator[bytes]:
+        # The import outlives the request's own session, so it uses its own
+        async with async_session_maker() as db:
+            async for event in ProductImporter(db).run(parse(read_spool(upload))):
+                yield orjson.dumps(event) + b"\n"
+
+    return StreamingResponse(
+        events(), media_type="application/x-ndjson", background=BackgroundTask(upload.close)
+    )
+
+
 @router.get("/{product_id}", response_model=ProductResponse)
 async def get_product(
     product_id: UUID,
@@ -368,6 +458,7 @@ async def create_variant(
     )
 
     db.add(variant)
+    await InventoryService(db).refresh_stock_summary([product_id])
     await db.commit()
     await db.refresh(variant)
 
@@ -406,6 +497,8 @@ async def update_variant(
     for field, value in update_dict.items():
         setattr(variant, field, value)
 
+    if "stock" in update_dict or "size" in update_dict:
+        await InventoryService(db).refresh_stock_summary([product_id])
     await db.commit()
     await db.refresh(variant)
 
@@ -440,4 +533,5 @@ async def delete_variant(
         raise HTTPException(status_code=404, detail="Variant not found")
 
     await db.delete(variant)
+    await InventoryService(db).refresh_stock_summary([product_id])
     await db.commit()
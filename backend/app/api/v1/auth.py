@@ -1,11 +1,10 @@
 """Authentication API endpoints."""
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
-import redis.asyncio as redis
 
 from app.api.deps import DbSession
 from app.core.session import get_or_create_session_id
-from app.core.redis import get_redis
-from app.core.rate_limit import limiter
+from app.core.redis import CartShards, get_cart_redis
+from app.core.rate_limit import RateLimit
 from app.schemas.user import (
     UserCreate,
     UserResponse,
@@ -27,10 +26,10 @@ async def get_auth_service(db: DbSession) -> AuthService:
 
 async def get_cart_service(
     db: DbSession,
-    redis_client: redis.Redis = Depends(get_redis),
+    carts: CartShards = Depends(get_cart_redis),
 ) -> CartService:
     """Dependency for cart service."""
-    return CartService(db, redis_client)
+    return CartService(db, carts)
 
 
 async def get_event_service(db: DbSession) -> EventService:
@@ -43,8 +42,7 @@ class AuthResponse:
     pass
 
 
-@router.post("/register", response_model=dict)
-@limiter.limit("3/minute")
+@router.post("/register", response_model=dict, dependencies=[Depends(RateLimit("3/minute"))])
 async def register(
     request: Request,
     user_data: UserCreate,
@@ -94,8 +92,7 @@ async def register(
     }
 
 
-@router.post("/login", response_model=dict)
-@limiter.limit("5/minute")
+@router.post("/login", response_model=dict, dependencies=[Depends(RateLimit("5/minute"))])
 async def login(
     request: Request,
     credentials: LoginRequest,
@@ -143,8 +140,7 @@ async def login(
     }
 
 
-@router.post("/refresh", response_model=Token)
-@limiter.limit("10/minute")
+@router.post("/refresh", response_model=Token, dependencies=[Depends(RateLimit("10/minute"))])
 async def refresh_token(
     request: Request,
     refresh_data: RefreshRequest,
@@ -3,11 +3,11 @@ from uuid import UUID
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
-import redis.asyncio as redis
 
-from app.api.deps import DbSession
+from app.api.deps import DbSession, CurrentUserOptional
 from app.core.session import get_or_create_session_id, get_session_id
-from app.core.redis import get_redis
+from app.core.redis import CartShards, get_cart_redis
+from app.core.responses import fast_json_response
 from app.schemas import CartResponse, CartItemCreate, CartItemUpdate
 from app.services.cart_service import CartService
 
@@ -16,16 +16,18 @@ router = APIRouter(prefix="/cart", tags=["cart"])
 
 async def get_cart_service(
     db: DbSession,
-    redis_client: redis.Redis = Depends(get_redis),
+    carts: CartShards = Depends(get_cart_redis),
 ) -> CartService:
     """Dependency for cart service."""
-    return CartService(db, redis_client)
+    return CartService(db, carts)
 
 
 @router.get("", response_model=CartResponse)
 async def get_cart(
     request: Request,
     response: Response,
+    db: DbSession,
+    current_user: CurrentUserOptional,
     cart_service: CartService = Depends(get_cart_service),
 ):
     """
@@ -35,10 +37,12 @@ async def get_cart(
     Returns cart with enriched product data.
     """
     session_id = get_or_create_session_id(request, response)
-    # TODO: Get user_id from auth in Batch 4
-    user_id = None
+    user_id = current_user.id if current_user else None
 
-    return await cart_service.get_cart(session_id, user_id)
+    cart = await cart_service.get_cart(session_id, user_id)
+    # Commits a session cart merged in through Postgres while Redis is down
+    await db.commit()
+    return fast_json_response(cart, response)
 
 
 @router.post("/items", response_model=CartResponse)
@@ -46,6 +50,8 @@ async def add_to_cart(
     item: CartItemCreate,
     request: Request,
     response: Response,
+    db: DbSession,
+    current_user: CurrentUserOptional,
     cart_service: CartService = Depends(get_cart_service),
 ):
     """
@@ -58,9 +64,12 @@ async def add_to_cart(
     If the item already exists in cart, quantity is added to existing.
     """
     session_id = get_or_create_session_id(request, response)
-    user_id = None
+    user_id = current_user.id if current_user else None
 
-    return await cart_service.add_item(session_id, item, user_id)
+    cart = await cart_service.add_item(session_id, item, user_id)
+    # Commits cart changes written to Postgres while Redis is down
+    await db.commit()
+    return fast_json_response(cart, response)
 
 
 @router.patch("/items/{variant_id}", response_model=CartResponse)
@@ -69,6 +78,8 @@ async def update_cart_item(
     update: CartItemUpdate,
     request: Request,
     response: Response,
+    db: DbSession,
+    current_user: CurrentUserOptional,
     cart_service: CartService = Depends(get_cart_service),
 ):
     """
@@ -81,9 +92,11 @@ async def update_cart_item(
     if not session_id:
         raise HTTPException(status_code=400, detail="No cart found")
 
-    user_id = None
+    user_id = current_user.id if current_user else None
 
-    return await cart_service.update_item(session_id, variant_id, update, user_id)
+    cart = await cart_service.update_item(session_id, variant_id, update, user_id)
+    await db.commit()
+    return fast_json_response(cart, response)
 
 
 @router.delete("/items/{variant_id}", response_model=CartResponse)
@@ -91,6 +104,8 @@ async def remove_from_cart(
     variant_id: UUID,
     request: Request,
     response: Response,
+    db: DbSession,
+    current_user: CurrentUserOptional,
     cart_service: CartService = Depends(get_cart_service),
 ):
     """
@@ -102,14 +117,18 @@ async def remove_from_cart(
     if not session_id:
         raise HTTPException(status_code=400, detail="No cart found")
 
-    user_id = None
+    user_id = current_user.id if current_user else None
 
-    return await cart_service.remove_item(session_id, variant_id, user_id)
+    cart = await cart_service.remove_item(session_id, variant_id, user_id)
+    await db.commit()
+    return fast_json_response(cart, response)
 
 
 @router.delete("", status_code=204)
 async def clear_cart(
     request: Request,
+    db: DbSession,
+    current_user: CurrentUserOptional,
     cart_service: CartService = Depends(get_cart_service),
 ):
     """Clear all items from the cart."""
@@ -117,13 +136,18 @@ async def clear_cart(
     if not session_id:
         return
 
-    await cart_service.clear_cart(session_id)
+    user_id = current_user.id if current_user else None
+
+    await cart_service.clear_cart(session_id, user_id)
+    await db.commit()
 
 
 @router.post("/refresh-prices", response_model=CartResponse)
 async def refresh_cart_prices(
     request: Request,
     response: Response,
+    db: DbSession,
+    current_user: CurrentUserOptional,
     cart_service: CartService = Depends(get_cart_service),
 ):
     """
@@ -137,6 +161,8 @@ async def refresh_cart_prices(
     Returns the cart with all item prices updated to current values.
     """
     session_id = get_or_create_session_id(request, response)
-    user_id = None
+    user_id = current_user.id if current_user else None
 
-    return await cart_service.refresh_prices(session_id, user_id)
+    cart = await cart_service.refresh_prices(session_id, user_id)
+    await db.commit()
+    return fast_json_response(cart, response)
@@ -1,10 +1,17 @@
 """Events API endpoints for clickstream data."""
-from fastapi import APIRouter, Depends, Request, Response
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from uuid import UUID
 
-from app.api.deps import DbSession, CurrentUserOptional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import DbSession, CurrentUser, CurrentUserOptional
 from app.core.session import get_or_create_session_id
+from app.db.base import async_session_maker
 from app.schemas.event import EventBatchCreate, EventBatchResponse
-from app.services.event_service import EventService
+from app.services.event_service import EventCursor, EventService
+from app.services.export import MEDIA_TYPES, export_headers, ndjson_lines
 
 router = APIRouter(prefix="/events", tags=["events"])
 
@@ -49,3 +56,43 @@ async def create_event_batch(
     user_id = current_user.id if current_user else None
 
     return await event_service.create_batch(batch, user_id)
+
+
+def event_export_cursor(
+    after_time: Optional[datetime] = None,
+    after_id: Optional[UUID] = None,
+) -> Optional[EventCursor]:
+    """Resume position of an event export: the last event already received."""
+    if (after_time is None) != (after_id is None):
+        raise HTTPException(status_code=400, detail="after_time and after_id go together")
+    return (after_time, after_id) if after_time is not None else None
+
+
+def event_export_response(user_id: UUID, after: Optional[EventCursor]) -> StreamingResponse:
+    """Stream a user's event history as NDJSON, oldest first."""
+
+    async def lines() -> AsyncIterator[bytes]:
+        # The export outlives the request's own session, so it uses its own
+        async with async_session_maker() as db:
+            async for batch in EventService(db).stream_user_events(user_id, after):
+                yield ndjson_lines(batch)
+
+    return StreamingResponse(
+        lines(),
+        media_type=MEDIA_TYPES["ndjson"],
+        headers=export_headers("events", "ndjson"),
+    )
+
+
+@router.get("/me/export")
+async def export_my_events(
+    current_user: CurrentUser,
+    after: Optional[EventCursor] = Depends(event_export_cursor),
+):
+    """
+    Export the current user's full event history as NDJSON, oldest first.
+
+    To resume an interrupted export, pass the event_time and id of the
+    last event received as **after_time** and **after_id**.
+    """
+    return event_export_response(current_user.id, after)
@@ -25,6 +25,7 @@ class DetailedHealthResponse(BaseModel):
     version: str
     database: str
     redis: str
+    circuit_breakers: dict[str, dict]
 
 
 @router.get("/health", response_model=HealthResponse)
@@ -39,7 +40,11 @@ async def health_check():
 
 @router.get("/health/detailed", response_model=DetailedHealthResponse)
 async def detailed_health_check():
-    """Detailed health check including database and Redis status."""
+    """Detailed health check including database, Redis and circuit breaker status.
+
+    Redis being down makes the API degraded rather than unhealthy: carts
+    fall back to the database and rate limiting fails open.
+    """
     # Check database
     db_status = "healthy"
     try:
@@ -52,9 +57,11 @@ async def detailed_health_check():
     # Check Redis
     redis_healthy = await RedisManager.health_check()
     redis_status = "healthy" if redis_healthy else "unhealthy"
+    circuit_breakers = RedisManager.breaker_states()
+    breakers_closed = all(b["state"] == "closed" for b in circuit_breakers.values())
 
     # Determine overall status
-    if db_status == "healthy" and redis_status == "healthy":
+    if db_status == "healthy" and redis_status == "healthy" and breakers_closed:
         overall = "healthy"
     elif db_status == "unhealthy" and redis_status == "unhealthy":
         overall = "unhealthy"
@@ -67,4 +74,5 @@ async def detailed_health_check():
         version="0.1.0",
         database=db_status,
         redis=redis_status,
+        circuit_breakers=circuit_breakers,
     )
@@ -2,12 +2,14 @@
 from uuid import UUID
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query
 import redis.asyncio as redis
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query
 
 from app.api.deps import DbSession, CurrentUser
 from app.core.session import get_session_id, get_or_create_session_id
-from app.core.redis import get_redis
+from app.core.rate_limit import RateLimit
+from app.core.redis import CartShards, get_cart_redis, get_redis
+from app.core.responses import fast_json_response
 from app.schemas.order import OrderCreate, OrderResponse, OrderListResponse
 from app.services.order_service import OrderService
 
@@ -16,13 +18,19 @@ router = APIRouter(prefix="/orders", tags=["orders"])
 
 async def get_order_service(
     db: DbSession,
-    redis_client: redis.Redis = Depends(get_redis),
+    carts: CartShards = Depends(get_cart_redis),
+    cache: redis.Redis = Depends(get_redis),
 ) -> OrderService:
     """Dependency for order service."""
-    return OrderService(db, redis_client)
+    return OrderService(db, carts, cache)
 
 
-@router.post("", response_model=OrderResponse, status_code=201)
+@router.post(
+    "",
+    response_model=OrderResponse,
+    status_code=201,
+    dependencies=[Depends(RateLimit())],
+)
 async def create_order(
     order_data: OrderCreate,
     request: Request,
@@ -49,7 +57,7 @@ async def create_order(
         user_id=current_user.id,
         session_id=session_id,
     )
-    return order
+    return fast_json_response(order, response, status_code=201)
 
 
 @router.get("", response_model=OrderListResponse)
@@ -64,11 +72,12 @@ async def list_orders(
 
     Requires authentication. Returns paginated list of orders sorted by date (newest first).
     """
-    return await order_service.list_user_orders(
+    orders = await order_service.list_user_orders(
         user_id=current_user.id,
         page=page,
         page_size=page_size,
     )
+    return fast_json_response(orders)
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
@@ -87,7 +96,7 @@ async def get_order(
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
-    return order
+    return fast_json_response(order)
 
 
 @router.get("/number/{order_number}", response_model=OrderResponse)
@@ -106,4 +115,4 @@ async def get_order_by_number(
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
-    return order
+    return fast_json_response(order)
@@ -1,21 +1,23 @@
 """Product API endpoints."""
 from uuid import UUID
-from typing import Optional
+from typing import Annotated, Literal, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.api.deps import DbSession
-from app.schemas import ProductResponse, ProductListResponse, ProductFilters
+from app.core.responses import fast_json_response
+from app.schemas import (
+    ProductResponse, ProductListResponse, ProductFilters,
+    ProductSummary, ProductSummaryListResponse, ProductFacets,
+)
 from app.services.product_service import ProductService
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+ProductView = Literal["full", "summary"]
 
-@router.get("", response_model=ProductListResponse)
-async def list_products(
-    db: DbSession,
-    page: int = Query(1, ge=1, description="Page number"),
-    page_size: int = Query(12, ge=1, le=100, description="Items per page"),
+
+def get_product_filters(
     category_id: Optional[UUID] = Query(None, description="Filter by category ID"),
     category_slug: Optional[str] = Query(None, description="Filter by category slug"),
     brand: Optional[str] = Query(None, description="Filter by brand"),
@@ -27,6 +29,38 @@ async def list_products(
     in_stock: Optional[bool] = Query(None, description="Filter by in-stock status"),
     is_featured: Optional[bool] = Query(None, description="Filter featured products"),
     search: Optional[str] = Query(None, description="Search term"),
+) -> ProductFilters:
+    """Build product filters from query parameters (shared by listing and facets)."""
+    # Parse sizes from comma-separated string
+    size_list = None
+    if sizes:
+        size_list = [s.strip() for s in sizes.split(",") if s.strip()]
+
+    return ProductFilters(
+        category_id=category_id,
+        category_slug=category_slug,
+        brand=brand,
+        color=color,
+        gender=gender,
+        min_price=min_price,
+        max_price=max_price,
+        sizes=size_list,
+        in_stock=in_stock,
+        is_featured=is_featured,
+        search=search,
+    )
+
+
+Filters = Annotated[ProductFilters, Depends(get_product_filters)]
+
+
+@router.get("", response_model=Union[ProductListResponse, ProductSummaryListResponse])
+async def list_products(
+    db: DbSession,
+    filters: Filters,
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(12, ge=1, le=100, description="Items per page"),
+    view: ProductView = Query("full", description="Response shape: full or summary"),
 ):
     """
     Get paginated list of products with optional filters.
@@ -44,38 +78,49 @@ async def list_products(
     - **in_stock**: Filter only in-stock products
     - **is_featured**: Filter featured products
     - **search**: Search in name, description, brand
+    - **view**: `summary` returns slim items for grid views (no description,
+      SEO fields, variants or category)
     """
-    # Parse sizes from comma-separated string
-    size_list = None
-    if sizes:
-        size_list = [s.strip() for s in sizes.split(",") if s.strip()]
+    service = ProductService(db)
+    if view == "summary":
+        products = await service.get_product_summaries(
+            filters=filters, page=page, page_size=page_size
+        )
+    else:
+        products = await service.get_products(filters=filters, page=page, page_size=page_size)
+    return fast_json_response(products)
 
-    filters = ProductFilters(
-        category_id=category_id,
-        category_slug=category_slug,
-        brand=brand,
-        color=color,
-        gender=gender,
-        min_price=min_price,
-        max_price=max_price,
-        sizes=size_list,
-        in_stock=in_stock,
-        is_featured=is_featured,
-        search=search,
-    )
 
+@router.get("/facets", response_model=ProductFacets)
+async def get_product_facets(
+    db: DbSession,
+    filters: Filters,
+):
+    """
+    Get filter facet counts for the products matching the given filters.
+
+    Accepts the same filters as the product listing and returns the number
+    of matching products per brand, color, gender, size and price range,
+    plus the total, so filter UIs can show counts next to each option.
+    """
     service = ProductService(db)
-    return await service.get_products(filters=filters, page=page, page_size=page_size)
+    facets = await service.get_facets(filters=filters)
+    return fast_json_response(facets)
 
 
-@router.get("/featured", response_model=list[ProductResponse])
+@router.get("/featured", response_model=Union[list[ProductResponse], list[ProductSummary]])
 async def get_featured_products(
     db: DbSession,
     limit: int = Query(8, ge=1, le=20, description="Number of featured products"),
+    view: ProductView = Query("full", description="Response shape: full or summary"),
 ):
     """Get featured products for homepage."""
     service = ProductService(db)
-    return await service.get_featured_products(limit=limit)
+    if view == "summary":
+        products = await service.get_featured_summaries(limit=limit)
+    else:
+        products = await service.get_featured_products(limit=limit)
+    return fast_json_response(products)
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
@@ -94,7 +139,7 @@ async def get_product(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    return product
+    return fast_json_response(product)
 
 
 @router.get("/slug/{slug}", response_model=ProductResponse)
@@ -113,4 +158,4 @@ async def get_product_by_slug(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    return product
+    return fast_json_response(product)
@@ -4,6 +4,7 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException
 
 from app.api.deps import DbSession, CurrentUser
+from app.core.responses import fast_json_response
 from app.schemas.wishlist import WishlistItemCreate, WishlistItemResponse, WishlistResponse
 from app.services.wishlist_service import WishlistService
 
@@ -25,7 +26,8 @@ async def get_wishlist(
 
     Requires authentication. Returns all wishlist items with product details.
     """
-    return await wishlist_service.get_wishlist(current_user.id)
+    wishlist = await wishlist_service.get_wishlist(current_user.id)
+    return fast_json_response(wishlist)
 
 
 @router.post("/items", response_model=WishlistItemResponse, status_code=201)
@@ -42,7 +44,8 @@ async def add_to_wishlist(
     Idempotent: adding the same product twice returns the existing item.
     Requires authentication.
     """
-    return await wishlist_service.add_item(current_user.id, item_data.product_id)
+    item = await wishlist_service.add_item(current_user.id, item_data.product_id)
+    return fast_json_response(item, status_code=201)
 
 
 @router.delete("/items/{product_id}", status_code=204)
@@ -77,4 +80,4 @@ async def check_wishlist(
     Requires authentication.
     """
     in_wishlist = await wishlist_service.is_in_wishlist(current_user.id, product_id)
-    return {"in_wishlist": in_wishlist}
+    return fast_json_response({"in_wishlist": in_wishlist})
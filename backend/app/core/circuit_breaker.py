@@ -0,0 +1,133 @@
+"""Circuit breaker for calls to backing services.
+
+A breaker counts consecutive failures of a service. Once
+``failure_threshold`` calls in a row have failed it opens: further calls
+fail immediately with CircuitOpenError instead of each waiting for a
+timeout, so callers switch to their fallback straight away. After
+``reset_timeout`` seconds a single trial call is let through (half open);
+if it succeeds the breaker closes, otherwise it opens again.
+
+Only ``failure_exceptions`` count as failures. Any other exception (e.g. a
+Redis WATCH conflict) means the service answered, and counts as a success.
+
+Usage:
+    async with breaker.guard():
+        value = await client.get(key)
+"""
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from app.core.logging import get_logger
+from app.core.metrics import CIRCUIT_BREAKER_STATE
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose breaker is open."""
+
+    def __init__(self, name: str):
+        self.name = name
+        super().__init__(f"Circuit breaker {name!r} is open")
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (per worker process)."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        failure_exceptions: tuple[type[BaseException], ...],
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_exceptions = failure_exceptions
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._set_state(CLOSED)
+
+    @property
+    def state(self) -> str:
+        """Current state; an open breaker whose timeout has passed reports half open."""
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return self._state
+
+    def _set_state(self, state: str) -> None:
+        self._state = state
+        CIRCUIT_BREAKER_STATE.labels(breaker=self.name).set(_STATE_VALUES[state])
+
+    def allow_request(self) -> bool:
+        """Whether a call may go through now (reserves the trial call when half open)."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            self._set_state(HALF_OPEN)
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._trial_in_flight = False
+        if self._state != CLOSED:
+            self._set_state(CLOSED)
+            logger.info("Circuit breaker closed", extra={"breaker": self.name})
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._trial_in_flight = False
+        if self._state == HALF_OPEN or (
+            self._state == CLOSED and self._failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            self._set_state(OPEN)
+            logger.warning(
+                "Circuit breaker opened",
+                extra={
+                    "breaker": self.name,
+                    "failures": self._failures,
+                    "reset_timeout": self.reset_timeout,
+                },
+            )
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[None]:
+        """Run the enclosed calls through the breaker.
+
+        Raises:
+            CircuitOpenError: If the breaker is open.
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(self.name)
+        try:
+            yield
+        except self.failure_exceptions:
+            self.record_failure()
+            raise
+        except Exception:
+            self.record_success()
+            raise
+        except BaseException:
+            # Cancelled: no verdict on the service, free the trial slot
+            self._trial_in_flight = False
+            raise
+        else:
+            self.record_success()
+
+    def snapshot(self) -> dict:
+        """State summary for health checks."""
+        return {"state": self.state, "consecutive_failures": self._failures}
@@ -1,17 +1,37 @@
-"""Structured JSON logging configuration."""
+"""Structured JSON logging configuration.
+
+Records are not written on the calling thread: the root logger only has a
+QueueHandler that puts the record on a bounded in-memory queue, and a
+QueueListener thread formats them as JSON and writes them to stdout. A
+burst of log lines therefore never blocks the event loop on stdout. When
+the queue is full new records are dropped (and counted) rather than
+blocking; the number of dropped records is reported once there is room.
+
+Every record is tagged with the current request ID (see
+app.core.request_context). High-volume loggers can be sampled below
+WARNING with settings.log_sample_rates, e.g. {"app.services.event_service": 0.1}.
+"""
+import atexit
 import logging
+import queue
+import random
 import sys
-import json
 from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any, Optional
 
+import orjson
+
+from app.core.config import settings
+from app.core.request_context import get_request_id
+
 
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging."""
 
     def format(self, record: logging.LogRecord) -> str:
         log_entry: dict[str, Any] = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -20,15 +40,96 @@ class JSONFormatter(logging.Formatter):
             "line": record.lineno,
         }
 
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            log_entry["request_id"] = request_id
+
         # Add extra fields if present
         if hasattr(record, "extra") and record.extra:
             log_entry.update(record.extra)
 
-        # Add exception info if present
+        # Add exception info if present (pre-rendered when queued)
         if record.exc_info:
             log_entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_entry["exception"] = record.exc_text
+
+        return orjson.dumps(log_entry, default=str).decode()
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach the current request ID to each record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = get_request_id()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records below WARNING from selected loggers.
+
+    Rates are keyed by logger name; the longest matching dotted prefix wins.
+    """
 
-        return json.dumps(log_entry)
+    def __init__(self, rates: dict[str, float]) -> None:
+        super().__init__()
+        self.rates = rates
+        self._cache: dict[str, Optional[float]] = {}
+
+    def _rate_for(self, name: str) -> Optional[float]:
+        if name not in self._cache:
+            rate = None
+            prefix = name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._cache[name] = rate
+        return self._cache[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        return rate is None or random.random() < rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks the caller and keeps records structured."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve everything that must not be deferred to the listener thread
+        # (lazy args, traceback objects) but leave JSON encoding to it.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.dropped:
+                self.queue.put_nowait(self._dropped_record())
+                self.dropped = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _dropped_record(self) -> logging.LogRecord:
+        record = logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0, "Log records dropped", None, None
+        )
+        record.extra = {"dropped": self.dropped}
+        return record
+
+
+_listener: Optional[QueueListener] = None
 
 
 class ExtraLoggerAdapter(logging.LoggerAdapter):
@@ -50,20 +151,32 @@ def setup_logging(debug: bool = False) -> None:
     Args:
         debug: If True, sets log level to DEBUG; otherwise INFO.
     """
+    global _listener
+
     level = logging.DEBUG if debug else logging.INFO
 
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(level)
 
-    # Remove existing handlers
+    # Remove existing handlers (and stop a previous listener)
+    shutdown_logging()
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
 
-    # Add JSON handler for stdout
+    # JSON handler for stdout, fed from the queue by a background thread
     handler = logging.StreamHandler(sys.stdout)
     handler.setFormatter(JSONFormatter())
-    root_logger.addHandler(handler)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    if settings.log_sample_rates:
+        queue_handler.addFilter(SamplingFilter(settings.log_sample_rates))
+    queue_handler.addFilter(RequestContextFilter())
+    root_logger.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
 
     # Quiet noisy loggers
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
@@ -74,6 +187,16 @@ def setup_logging(debug: bool = False) -> None:
     logging.getLogger("httpx").setLevel(logging.WARNING)
 
 
+@atexit.register
+def shutdown_logging() -> None:
+    """Stop the listener thread, writing out all queued records."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def get_logger(name: str, **default_extra: Any) -> ExtraLoggerAdapter:
     """Get a logger instance with optional default extra fields.
 
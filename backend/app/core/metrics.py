@@ -0,0 +1,237 @@
+"""Prometheus metrics.
+
+Metrics are exposed at ``/metrics`` in the Prometheus text format. With
+several uvicorn/gunicorn workers, set ``PROMETHEUS_MULTIPROC_DIR`` to an
+empty directory shared by the workers (and cleared on deploy): every
+worker then writes its samples there and ``/metrics`` aggregates all of
+them, whichever worker serves the scrape.
+"""
+import os
+import time
+from typing import Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+# Label used for requests that did not match any route (keeps cardinality bounded)
+UNMATCHED_ROUTE = "<unmatched>"
+
+# HTTP
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route and status code",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+# Database
+DB_REQUEST_QUERIES = Histogram(
+    "db_request_queries",
+    "SQL statements executed per HTTP request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+DB_REQUEST_DURATION = Histogram(
+    "db_request_duration_seconds",
+    "Total database time per HTTP request",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DB_REQUEST_DUPLICATE_QUERIES = Counter(
+    "db_request_duplicate_queries_total",
+    "Repeated SQL statement shapes within a request (likely N+1)",
+    ["route"],
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Database pool connections by state",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+
+# Redis
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Redis command latency",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+REDIS_COMMAND_ERRORS = Counter(
+    "redis_command_errors_total",
+    "Redis commands that raised an error",
+    ["command"],
+)
+CIRCUIT_BREAKER_STATE = Gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state (0 closed, 1 half open, 2 open)",
+    ["breaker"],
+    multiprocess_mode="livemax",
+)
+CART_STORE_FALLBACKS = Counter(
+    "cart_store_fallbacks_total",
+    "Cart operations served from Postgres because Redis was unavailable",
+    ["operation"],
+)
+CART_SYNC_CARTS = Counter(
+    "cart_sync_carts_total",
+    "Carts written to Postgres by the write-behind sync",
+)
+RATE_LIMIT_FAIL_OPEN = Counter(
+    "rate_limit_fail_open_total",
+    "Requests allowed without a rate limit check because Redis was unavailable",
+)
+
+# Application
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result (hit or miss)",
+    ["cache", "result"],
+)
+EVENTS_INGESTED = Counter(
+    "events_ingested_total",
+    "Clickstream events received by result",
+    ["result"],
+)
+CHECKOUT_OUTCOMES = Counter(
+    "checkout_outcomes_total",
+    "Checkout attempts by outcome",
+    ["outcome"],
+)
+OUTBOX_MESSAGES = Counter(
+    "outbox_messages_total",
+    "Outbox messages handled by the relay, by topic and result (published, failed or dead_lettered)",
+    ["topic", "result"],
+)
+
+# Background tasks
+TASK_RUNS = Counter(
+    "task_runs_total",
+    "Background task runs by task and state (succeeded, failed or retried)",
+    ["task", "state"],
+)
+TASK_DURATION = Histogram(
+    "task_duration_seconds",
+    "Background task run time",
+    ["task"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0),
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Count a cache lookup; the hit ratio is hits / (hits + misses)."""
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def observe_db_pool(pool) -> None:
+    """Record the current connection counts of a SQLAlchemy QueuePool."""
+    if not hasattr(pool, "checkedout"):
+        return
+    DB_POOL_CONNECTIONS.labels(state="checked_out").set(pool.checkedout())
+    DB_POOL_CONNECTIONS.labels(state="idle").set(pool.checkedin())
+    DB_POOL_CONNECTIONS.labels(state="overflow").set(max(pool.overflow(), 0))
+
+
+def route_label(scope: Scope) -> str:
+    """Get the route template for a request, for use as a metric label.
+
+    The matched route's template is used as is, so
+    /api/v1/products/3f2a... is reported as /api/v1/products/{product_id}.
+    FastAPI keeps routes of included routers under their own (unprefixed)
+    path and records the full template on the effective route context.
+    """
+    route = (scope.get("fastapi") or {}).get("effective_route_context") or scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    return getattr(route, "path_format", None) or route.path
+
+
+class MetricsMiddleware:
+    """Record request count, latency and in-flight requests per route.
+
+    Implemented as raw ASGI middleware; the route label is the route
+    template (see route_label), never the raw path. Latency covers the
+    full response, including streamed bodies.
+    """
+
+    def __init__(self, app: ASGIApp, pool=None) -> None:
+        self.app = app
+        self.pool = pool
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            route = route_label(scope)
+            HTTP_REQUEST_DURATION.labels(method=method, route=route).observe(
+                time.perf_counter() - start
+            )
+            HTTP_REQUESTS.labels(method=method, route=route, status=str(status_code)).inc()
+            if self.pool is not None:
+                observe_db_pool(self.pool)
+
+
+def _registry() -> CollectorRegistry:
+    """Get the registry to expose, aggregating all workers in multiprocess mode."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Expose metrics in the Prometheus text format."""
+    return Response(generate_latest(_registry()), media_type=CONTENT_TYPE_LATEST)
+
+
+def start_metrics_server(port: int) -> None:
+    """Serve metrics over HTTP from a process without the API (e.g. a Celery worker)."""
+    start_http_server(port, registry=_registry())
+
+
+def mark_process_dead(pid: Optional[int] = None) -> None:
+    """Drop a stopped worker's live gauges (multiprocess mode only)."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid or os.getpid())
@@ -0,0 +1,87 @@
+"""Per-request SQL query stats middleware."""
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import (
+    DB_REQUEST_DUPLICATE_QUERIES,
+    DB_REQUEST_DURATION,
+    DB_REQUEST_QUERIES,
+    route_label,
+)
+from app.db.instrumentation import QueryStats, track_queries
+
+logger = get_logger(__name__)
+
+
+class QueryStatsMiddleware:
+    """Track the SQL executed by each request.
+
+    Outside production the numbers are returned as response headers:
+
+        X-DB-Query-Count: statements executed before the response started
+        X-DB-Time-Ms: total database time
+        X-DB-Duplicate-Queries: executions repeating an earlier statement shape
+
+    In every environment the numbers feed the per-route db_request_*
+    metrics, and requests that exceed settings.db_query_warn_count queries
+    or repeat statement shapes settings.db_duplicate_warn_count times
+    (likely N+1) are logged with the offending statements.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.expose_headers = not settings.is_production
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start" and self.expose_headers:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Query-Count"] = str(stats.count)
+                    headers["X-DB-Time-Ms"] = f"{stats.total_time_ms:.2f}"
+                    headers["X-DB-Duplicate-Queries"] = str(stats.duplicate_count)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_stats)
+            finally:
+                self._record(scope, stats)
+
+    def _record(self, scope: Scope, stats: QueryStats) -> None:
+        """Record query metrics and log requests whose query pattern looks like a regression."""
+        route = route_label(scope)
+        DB_REQUEST_QUERIES.labels(route=route).observe(stats.count)
+        if not stats.count:
+            return
+
+        DB_REQUEST_DURATION.labels(route=route).observe(stats.total_time)
+        if stats.duplicate_count:
+            DB_REQUEST_DUPLICATE_QUERIES.labels(route=route).inc(stats.duplicate_count)
+
+        repeated = {
+            statement: n
+            for statement, n in stats.duplicates.items()
+            if n >= settings.db_duplicate_warn_count
+        }
+        if stats.count < settings.db_query_warn_count and not repeated:
+            return
+
+        logger.warning(
+            "High query count for request",
+            extra={
+                "path": scope["path"],
+                "route": route,
+                "method": scope["method"],
+                "query_count": stats.count,
+                "db_time_ms": round(stats.total_time_ms, 2),
+                "duplicate_queries": stats.duplicate_count,
+                "repeated_statements": repeated,
+            },
+        )
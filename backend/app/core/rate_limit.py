@@ -1,15 +1,83 @@
-"""Rate limiting configuration using slowapi."""
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+"""Rate limiting.
+
+Limits are enforced with GCRA (generic cell rate algorithm) counters in
+Redis: one key per (route scope, client) holding the theoretical arrival
+time, updated atomically by a Lua script. Unlike a fixed window this never
+admits 2x the limit around a window boundary, and a client may burst up
+to the full limit only after being idle.
+
+To keep Redis off the hot path, each worker leases tokens in batches: a
+single script call reserves up to ``rate_limit_local_batch`` requests
+(never more than the client has left), which are then spent from a local
+in-memory bucket without a round trip. Unspent tokens expire after
+``rate_limit_lease_seconds``, so leasing only ever makes the limiter
+stricter, never looser. A denied client is remembered locally until its
+retry time. Small limits (e.g. 3/minute on registration) lease one token
+at a time and behave exactly like a shared counter.
+
+Authenticated requests are keyed by user ID, anonymous ones by client IP.
+
+If Redis is unavailable (call failed or circuit breaker open) the limiter
+fails open: requests are allowed, apart from clients already denied
+locally, rather than rejecting traffic because of an infrastructure fault.
+"""
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
 from fastapi import Request
 from fastapi.responses import JSONResponse
+from jose import JWTError, jwt
 
 from app.core.config import settings
+from app.core.exceptions import RateLimitError
 from app.core.logging import get_logger
+from app.core.metrics import RATE_LIMIT_FAIL_OPEN, route_label
+from app.core.redis import REDIS_UNAVAILABLE, RedisManager
 
 logger = get_logger(__name__)
 
+KEY_PREFIX = "ratelimit:"
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# KEYS[1]: counter key
+# ARGV[1]: emission interval (microseconds per request)
+# ARGV[2]: period (microseconds, also the burst tolerance window)
+# ARGV[3]: number of requests to reserve
+# Returns {granted, retry_after_us}: granted may be lower than requested
+# when fewer requests are left; retry_after_us is set when granted is 0.
+GCRA_SCRIPT = """
+local emission = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000000 + tonumber(time[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local available = math.floor((now + period - tat) / emission)
+if available < 1 then
+    return {0, tat - period + emission - now}
+end
+local granted = math.min(requested, available)
+local new_tat = tat + granted * emission
+redis.call('SET', KEYS[1], string.format('%d', new_tat), 'PX', math.ceil((new_tat - now) / 1000))
+return {granted, 0}
+"""
+
+
+def parse_limit(limit: str) -> tuple[int, int]:
+    """Parse a limit such as "5/minute" into (requests, period seconds)."""
+    count, _, unit = limit.partition("/")
+    try:
+        return int(count), PERIODS[unit.strip().lower()]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit: {limit!r}") from None
+
 
 def get_real_client_ip(request: Request) -> str:
     """Get client IP, considering proxies.
@@ -25,9 +93,11 @@ def get_real_client_ip(request: Request) -> str:
         settings.trust_proxy_headers is True. This prevents header
         spoofing when the backend is directly reachable.
     """
+    remote_address = request.client.host if request.client else "127.0.0.1"
+
     # Only trust proxy headers when explicitly configured
     if not settings.trust_proxy_headers:
-        return get_remote_address(request)
+        return remote_address
 
     # Check for forwarded header (behind reverse proxy)
     forwarded = request.headers.get("X-Forwarded-For")
@@ -38,20 +108,150 @@ def get_real_client_ip(request: Request) -> str:
     if real_ip:
         return real_ip
 
-    return get_remote_address(request)
+    return remote_address
+
+
+def get_rate_limit_identity(request: Request) -> str:
+    """Key requests by user for valid access tokens, otherwise by client IP.
+
+    Only the token signature is checked (no database lookup); the route's
+    own authentication dependency still validates the user.
+    """
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        except JWTError:
+            payload = None
+        if payload and payload.get("type") == "access" and payload.get("sub"):
+            return f"user:{payload['sub']}"
+    return f"ip:{get_real_client_ip(request)}"
+
+
+@dataclass
+class _LocalBucket:
+    """Tokens leased from Redis for one key, or a local denial."""
+    tokens: int = 0
+    expires_at: float = 0.0
+    blocked_until: float = 0.0
+
+
+class RateLimiter:
+    """GCRA limiter backed by Redis with per-worker token leasing."""
+
+    def __init__(
+        self,
+        local_batch: int = settings.rate_limit_local_batch,
+        lease_seconds: float = settings.rate_limit_lease_seconds,
+        max_local_keys: int = 10000,
+    ) -> None:
+        self.local_batch = local_batch
+        self.lease_seconds = lease_seconds
+        self.max_local_keys = max_local_keys
+        self._buckets: OrderedDict[str, _LocalBucket] = OrderedDict()
+        self._script = None
 
+    def _lease_size(self, limit: int) -> int:
+        """Tokens to reserve per Redis call: a small fraction of the limit."""
+        return max(1, min(self.local_batch, limit // 20))
 
-# Create limiter instance with Redis storage
-limiter = Limiter(
-    key_func=get_real_client_ip,
-    default_limits=[f"{settings.rate_limit_requests}/minute"],
-    storage_uri=settings.redis_url,
-    strategy="fixed-window",
-)
+    def _bucket(self, key: str) -> _LocalBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _LocalBucket()
+            if len(self._buckets) > self.max_local_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    async def hit(self, key: str, limit: int, period: int) -> Optional[float]:
+        """
+        Count one request against a limit.
+
+        Args:
+            key: Counter key (scope and client identity)
+            limit: Requests allowed per period
+            period: Period in seconds
+
+        Returns:
+            None if the request is allowed, otherwise seconds until retry.
+        """
+        now = time.monotonic()
+        bucket = self._bucket(key)
+
+        if bucket.blocked_until > now:
+            return bucket.blocked_until - now
+        if bucket.tokens > 0 and bucket.expires_at > now:
+            bucket.tokens -= 1
+            return None
+
+        client = await RedisManager.get_client("rate_limit")
+        if self._script is None:
+            self._script = client.register_script(GCRA_SCRIPT)
+
+        period_us = period * 1_000_000
+        try:
+            async with RedisManager.get_breaker("rate_limit").guard():
+                granted, retry_after_us = await self._script(
+                    keys=[KEY_PREFIX + key],
+                    args=[period_us // limit, period_us, self._lease_size(limit)],
+                    client=client,
+                )
+        except REDIS_UNAVAILABLE as e:
+            RATE_LIMIT_FAIL_OPEN.inc()
+            logger.debug("Rate limit check skipped", extra={"key": key, "error": str(e)})
+            return None
+        granted, retry_after_us = int(granted), int(retry_after_us)
+
+        now = time.monotonic()
+        if granted == 0:
+            retry_after = retry_after_us / 1_000_000
+            bucket.tokens = 0
+            bucket.blocked_until = now + retry_after
+            return retry_after
+
+        bucket.tokens = granted - 1
+        bucket.expires_at = now + min(self.lease_seconds, period)
+        return None
+
+
+limiter = RateLimiter()
+
+
+class RateLimit:
+    """Route dependency enforcing a rate limit.
+
+    Usage:
+        @router.post("/login", dependencies=[Depends(RateLimit("5/minute"))])
+
+    Args:
+        limit: Requests per period, e.g. "5/minute"; defaults to
+            settings.rate_limit_requests per settings.rate_limit_window_seconds
+        scope: Counter name; defaults to the route's method and path
+            template, so each route has its own budget. Routes given the
+            same scope share one.
+    """
+
+    def __init__(self, limit: Optional[str] = None, scope: Optional[str] = None) -> None:
+        if limit is None:
+            self.limit, self.period = settings.rate_limit_requests, settings.rate_limit_window_seconds
+        else:
+            self.limit, self.period = parse_limit(limit)
+        self.scope = scope
+
+    async def __call__(self, request: Request) -> None:
+        scope = self.scope or f"{request.method}:{route_label(request.scope)}"
+
+        identity = get_rate_limit_identity(request)
+        retry_after = await limiter.hit(f"{scope}:{identity}", self.limit, self.period)
+        if retry_after is not None:
+            raise RateLimitError(retry_after=math.ceil(retry_after))
 
 
 async def rate_limit_exceeded_handler(
-    request: Request, exc: RateLimitExceeded
+    request: Request, exc: RateLimitError
 ) -> JSONResponse:
     """Custom handler for rate limit exceeded errors.
 
@@ -62,13 +262,15 @@ async def rate_limit_exceeded_handler(
     Returns:
         JSON response with error details.
     """
+    retry_after = exc.details.get("retry_after", 60)
+
     logger.warning(
         "Rate limit exceeded",
         extra={
-            "client_ip": get_real_client_ip(request),
+            "client": get_rate_limit_identity(request),
             "path": str(request.url.path),
             "method": request.method,
-            "limit": str(exc.detail),
+            "retry_after": retry_after,
         },
     )
 
@@ -79,9 +281,9 @@ async def rate_limit_exceeded_handler(
                 "code": "RateLimitExceeded",
                 "message": "Too many requests",
                 "details": {
-                    "retry_after": 60,
+                    "retry_after": retry_after,
                 },
             }
         },
-        headers={"Retry-After": "60"},
+        headers={"Retry-After": str(retry_after)},
     )
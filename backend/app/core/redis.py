@@ -1,77 +1,320 @@
-"""Redis connection management."""
-from typing import Optional
+"""Redis connection management.
+
+Each workload gets its own connection pool (and optionally its own
+server), so a slow command or an exhausted pool in one feature cannot
+stall the others:
+
+    - cart: shopping carts, optionally sharded over several servers by
+      cart ID hash (settings.redis_cart_shard_urls)
+    - cache: general purpose caching
+    - rate_limit: rate limit counters
+    - stream: Redis Streams fed by the outbox relay (app.services.outbox)
+
+URLs may be plain ``redis://`` / ``rediss://`` URLs, Sentinel URLs
+(``redis+sentinel://[:password@]host:26379,host2:26379/service_name[/db]``)
+or Cluster URLs (``redis+cluster://host:port``). Carts rely on WATCH/MULTI
+transactions, so they are scaled out with shards rather than Cluster.
+
+Calls are guarded by one circuit breaker per workload (get_breaker). While
+a breaker is open, callers fall back immediately: carts to Postgres, rate
+limiting to allowing requests. Catch REDIS_UNAVAILABLE to handle both an
+open breaker and a failing call.
+"""
+import time
+import zlib
+from typing import Literal, Optional, get_args
+from urllib.parse import unquote, urlsplit
+
 import redis.asyncio as redis
+from redis.asyncio.cluster import RedisCluster
+from redis.asyncio.retry import Retry
+from redis.asyncio.sentinel import Sentinel
+from redis.backoff import EqualJitterBackoff
+from redis.exceptions import ConnectionError, TimeoutError
 
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import REDIS_COMMAND_DURATION, REDIS_COMMAND_ERRORS
 
 logger = get_logger(__name__)
 
+Workload = Literal["cart", "cache", "rate_limit", "stream"]
+
+SENTINEL_SCHEME = "redis+sentinel"
+CLUSTER_SCHEME = "redis+cluster"
+
+# Errors meaning Redis is down or too slow, as opposed to command errors
+CONNECTION_ERRORS = (ConnectionError, TimeoutError)
+
+# Everything a caller with a fallback should catch
+REDIS_UNAVAILABLE = (CircuitOpenError, *CONNECTION_ERRORS)
+
+
+class _CommandMetricsMixin:
+    """Record per-command latency and errors.
+
+    Commands queued on pipelines and MULTI/EXEC transactions bypass
+    execute_command and are not recorded individually.
+    """
+
+    async def execute_command(self, *args, **options):
+        command = str(args[0]).upper() if args else "UNKNOWN"
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        except Exception:
+            REDIS_COMMAND_ERRORS.labels(command=command).inc()
+            raise
+        finally:
+            REDIS_COMMAND_DURATION.labels(command=command).observe(time.perf_counter() - start)
+
+
+class InstrumentedRedis(_CommandMetricsMixin, redis.Redis):
+    """Redis client recording per-command latency and errors."""
+
+
+class InstrumentedRedisCluster(_CommandMetricsMixin, RedisCluster):
+    """Redis Cluster client recording per-command latency and errors."""
+
+
+class CartShards:
+    """Cart Redis clients, selected by a stable hash of the cart ID."""
+
+    def __init__(self, clients: list[redis.Redis]) -> None:
+        self.clients = clients
+
+    def for_cart(self, cart_id: str) -> redis.Redis:
+        """Get the client holding the given cart."""
+        if len(self.clients) == 1:
+            return self.clients[0]
+        return self.clients[zlib.crc32(cart_id.encode()) % len(self.clients)]
+
+
+def _safe_url(url: str) -> str:
+    """Strip credentials from a URL for logging."""
+    return url.split("@")[-1] if "@" in url else url
+
+
+def _client_options(workload: Workload) -> dict:
+    """Connection options shared by all workloads.
+
+    Cart values are binary (see app.services.cart_codec), so cart clients
+    return bytes rather than decoded strings.
+    """
+    return {
+        "encoding": "utf-8",
+        "decode_responses": workload != "cart",
+        "socket_timeout": settings.redis_socket_timeout,
+        "socket_connect_timeout": settings.redis_connect_timeout,
+        "health_check_interval": settings.redis_health_check_interval,
+        "retry": Retry(
+            EqualJitterBackoff(
+                cap=settings.redis_retry_backoff_cap,
+                base=settings.redis_retry_backoff_base,
+            ),
+            settings.redis_retry_attempts,
+        ),
+        "retry_on_error": list(CONNECTION_ERRORS),
+    }
+
+
+def create_redis_client(url: str, workload: Workload) -> redis.Redis:
+    """Create a client with its own pool for one workload."""
+    options = _client_options(workload)
+    scheme = urlsplit(url).scheme
+
+    if scheme == SENTINEL_SCHEME:
+        parts = urlsplit(url)
+        userinfo, _, hosts = parts.netloc.rpartition("@")
+        password = unquote(userinfo.partition(":")[2]) if userinfo else None
+        path = [segment for segment in parts.path.split("/") if segment]
+        if not path:
+            raise ValueError("Sentinel URL must include the service name")
+        service_name = path[0]
+        db = int(path[1]) if len(path) > 1 else 0
+        sentinels = []
+        for host in hosts.split(","):
+            hostname, _, port = host.partition(":")
+            sentinels.append((hostname, int(port or 26379)))
+        sentinel = Sentinel(
+            sentinels,
+            sentinel_kwargs={
+                "password": password,
+                "socket_timeout": settings.redis_socket_timeout,
+            },
+            password=password,
+            db=db,
+            **options,
+        )
+        return sentinel.master_for(
+            service_name,
+            redis_class=InstrumentedRedis,
+            max_connections=settings.redis_max_connections,
+        )
+
+    if scheme == CLUSTER_SCHEME:
+        if workload == "cart":
+            raise ValueError(
+                "Carts need WATCH/MULTI transactions; use redis_cart_shard_urls instead of Cluster"
+            )
+        return InstrumentedRedisCluster.from_url(
+            "redis" + url[len(CLUSTER_SCHEME):],
+            max_connections=settings.redis_max_connections,
+            **options,
+        )
+
+    pool = redis.BlockingConnectionPool.from_url(
+        url,
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout,
+        **options,
+    )
+    return InstrumentedRedis.from_pool(pool)
+
 
 class RedisManager:
-    """Manage Redis connection."""
+    """Manage Redis connections, one pool per workload."""
 
-    _client: Optional[redis.Redis] = None
+    _clients: dict[str, redis.Redis] = {}
+    _cart_shards: Optional[CartShards] = None
+    _breakers: dict[str, CircuitBreaker] = {}
     _initialized: bool = False
 
+    @classmethod
+    def _workload_urls(cls) -> dict[str, str]:
+        return {
+            "cache": settings.redis_cache_url or settings.redis_url,
+            "rate_limit": settings.redis_rate_limit_url or settings.redis_url,
+            "stream": settings.redis_stream_url or settings.redis_url,
+        }
+
     @classmethod
     async def init(cls) -> None:
-        """Initialize Redis connection and verify connectivity.
+        """Create the Redis clients and check connectivity.
+
+        An unreachable server does not prevent startup: it is logged, counted
+        against the workload's breaker, and the pool reconnects on later calls.
 
         Raises:
-            Exception: If Redis connection fails.
+            ValueError: If a Redis URL is invalid.
         """
         if cls._initialized:
             return
 
-        try:
-            cls._client = redis.from_url(
-                settings.redis_url,
-                encoding="utf-8",
-                decode_responses=True,
+        clients = {
+            workload: create_redis_client(url, workload)
+            for workload, url in cls._workload_urls().items()
+        }
+        cart_urls = settings.redis_cart_shard_urls or [settings.redis_cart_url or settings.redis_url]
+        cart_clients = [create_redis_client(url, "cart") for url in cart_urls]
+
+        cls._clients = clients
+        cls._cart_shards = CartShards(cart_clients)
+        cls._initialized = True
+
+        # Test connections
+        reachable = True
+        for workload, client in [*clients.items(), *(("cart", client) for client in cart_clients)]:
+            try:
+                async with cls.get_breaker(workload).guard():
+                    await client.ping()
+            except REDIS_UNAVAILABLE as e:
+                reachable = False
+                logger.error(
+                    "Redis connection failed",
+                    extra={"workload": workload, "error": str(e)},
+                )
+
+        if reachable:
+            logger.info(
+                "Redis connection established",
+                extra={
+                    "urls": {
+                        **{workload: _safe_url(url) for workload, url in cls._workload_urls().items()},
+                        "cart": [_safe_url(url) for url in cart_urls],
+                    },
+                },
             )
-            # Test connection
-            await cls._client.ping()
-            cls._initialized = True
-            # Log URL without credentials
-            safe_url = settings.redis_url.split("@")[-1] if "@" in settings.redis_url else settings.redis_url
-            logger.info("Redis connection established", extra={"url": safe_url})
-        except Exception as e:
-            logger.error("Redis connection failed", extra={"error": str(e)})
-            raise
 
     @classmethod
-    async def get_client(cls) -> redis.Redis:
-        """Get or create Redis client."""
-        if cls._client is None:
+    def get_breaker(cls, workload: Workload) -> CircuitBreaker:
+        """Get the circuit breaker guarding a workload's Redis calls."""
+        breaker = cls._breakers.get(workload)
+        if breaker is None:
+            breaker = cls._breakers[workload] = CircuitBreaker(
+                f"redis:{workload}",
+                failure_threshold=settings.redis_breaker_failure_threshold,
+                reset_timeout=settings.redis_breaker_reset_seconds,
+                failure_exceptions=CONNECTION_ERRORS,
+            )
+        return breaker
+
+    @classmethod
+    def breaker_states(cls) -> dict[str, dict]:
+        """Snapshot of every workload's circuit breaker."""
+        return {
+            workload: cls.get_breaker(workload).snapshot()
+            for workload in get_args(Workload)
+        }
+
+    @classmethod
+    async def get_client(cls, workload: Workload = "cache") -> redis.Redis:
+        """Get the client for a workload (carts: use get_cart_shards)."""
+        if not cls._initialized:
             await cls.init()
-        return cls._client
+        if workload == "cart":
+            return cls._cart_shards.clients[0]
+        return cls._clients[workload]
+
+    @classmethod
+    async def get_cart_shards(cls) -> CartShards:
+        """Get the cart clients."""
+        if not cls._initialized:
+            await cls.init()
+        return cls._cart_shards
+
+    @classmethod
+    def _all_clients(cls) -> list[redis.Redis]:
+        cart_clients = cls._cart_shards.clients if cls._cart_shards else []
+        return [*cls._clients.values(), *cart_clients]
 
     @classmethod
     async def health_check(cls) -> bool:
         """Check if Redis is healthy.
 
         Returns:
-            True if Redis responds to ping, False otherwise.
+            True if every pool responds to ping, False otherwise.
         """
+        clients = cls._all_clients()
+        if not clients:
+            return False
         try:
-            if cls._client:
-                await cls._client.ping()
-                return True
+            for client in clients:
+                await client.ping()
+            return True
         except Exception as e:
             logger.warning("Redis health check failed", extra={"error": str(e)})
         return False
 
     @classmethod
     async def close(cls) -> None:
-        """Close Redis connection."""
-        if cls._client:
-            await cls._client.close()
-            cls._client = None
-            cls._initialized = False
+        """Close Redis connections."""
+        clients = cls._all_clients()
+        for client in clients:
+            await client.aclose()
+        cls._clients = {}
+        cls._cart_shards = None
+        cls._initialized = False
+        if clients:
             logger.info("Redis connection closed")
 
 
 async def get_redis() -> redis.Redis:
-    """Dependency for getting Redis client."""
-    return await RedisManager.get_client()
+    """Dependency for getting the cache Redis client."""
+    return await RedisManager.get_client("cache")
+
+
+async def get_cart_redis() -> CartShards:
+    """Dependency for getting the cart Redis clients."""
+    return await RedisManager.get_cart_shards()
@@ -0,0 +1,53 @@
+"""Request ID correlation.
+
+Every request gets an ID, taken from a well-formed incoming ``X-Request-ID``
+header (set by a proxy or the frontend) or generated. It is stored in a
+context variable for the duration of the request, added to every log
+record (see app.core.logging) and echoed back in the response header.
+"""
+import re
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Accept client-supplied IDs only if they are short and log-safe
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    """Get the ID of the request being handled, if any."""
+    return request_id_var.get()
+
+
+class RequestIdMiddleware:
+    """Assign a request ID and expose it to logs and the response."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get(REQUEST_ID_HEADER)
+        if not request_id or not _VALID_REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        # Not reset afterwards: the server runs each request in its own task
+        # (own context copy), and the unhandled exception handler, which runs
+        # outside all middleware, should still see the ID.
+        request_id_var.set(request_id)
+        await self.app(scope, receive, send_with_request_id)
@@ -1,7 +1,8 @@
 """Request size limit middleware."""
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+import json
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import settings
 from app.core.logging import get_logger
@@ -9,56 +10,143 @@ from app.core.logging import get_logger
 logger = get_logger(__name__)
 
 
-class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
+class RequestSizeLimitMiddleware:
     """Limit request body size to prevent abuse.
 
-    This middleware checks the Content-Length header and rejects requests
-    that exceed the configured maximum size (settings.max_request_size_bytes).
+    Implemented as raw ASGI middleware so the body is never buffered here:
+    the limit (settings.max_request_size_bytes) is enforced twice:
+
+        - Up front, on the Content-Length header, before the app runs.
+        - On the bytes actually received, as the app reads the body. This
+          covers chunked transfer encoding and clients that send more than
+          they declared. Once the limit is crossed the app sees a client
+          disconnect and the response it produces is replaced with a 413.
 
-    Limitations:
-        - Only validates Content-Length header, not actual body streaming
-        - Chunked transfer encoding or missing Content-Length bypasses this check
-        - For production deployment, enforce body size limits at reverse proxy:
-          * nginx: client_max_body_size 10m;
-          * traefik: buffering.maxRequestBodyBytes: 10485760
-          * cloudflare: Max Upload Size in dashboard
+    Reverse proxies should still cap body sizes so oversized uploads are
+    dropped before reaching the app:
+        * nginx: client_max_body_size 10m;
+        * traefik: buffering.maxRequestBodyBytes: 10485760
+        * cloudflare: Max Upload Size in dashboard
+
+    Routes made for large uploads (e.g. bulk imports) can be given their
+    own limit with ``path_limits``, keyed by path prefix.
 
     Returns:
-        413 Payload Too Large if Content-Length exceeds limit
+        413 Payload Too Large if the body exceeds the limit
     """
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        # Check Content-Length header
-        content_length = request.headers.get("Content-Length")
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_size: int | None = None,
+        path_limits: dict[str, int] | None = None,
+    ) -> None:
+        self.app = app
+        self.max_size = max_size if max_size is not None else settings.max_request_size_bytes
+        self.path_limits = path_limits or {}
 
+    def _limit_for(self, path: str) -> int:
+        for prefix, limit in self.path_limits.items():
+            if path.startswith(prefix):
+                return limit
+        return self.max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        max_size = self._limit_for(scope["path"])
+
+        # Check Content-Length header
+        content_length = Headers(scope=scope).get("content-length")
         if content_length:
             try:
                 size = int(content_length)
-                if size > settings.max_request_size_bytes:
-                    logger.warning(
-                        "Request too large",
-                        extra={
-                            "content_length": size,
-                            "max_size": settings.max_request_size_bytes,
-                            "path": str(request.url.path),
-                            "method": request.method,
-                        },
-                    )
-                    return JSONResponse(
-                        status_code=413,
-                        content={
-                            "error": {
-                                "code": "RequestTooLarge",
-                                "message": "Request body too large",
-                                "details": {
-                                    "max_size_bytes": settings.max_request_size_bytes,
-                                    "received_bytes": size,
-                                },
-                            }
-                        },
-                    )
             except ValueError:
-                # Invalid Content-Length header, let it pass through
-                pass
+                # Invalid Content-Length header, enforce on streamed bytes only
+                size = None
+            if size is not None and size > max_size:
+                await self._reject(scope, send, size, max_size)
+                return
+
+        received = 0
+        exceeded = False
+        response_started = False
+        rejected = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            if exceeded:
+                return {"type": "http.disconnect"}
+
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_size:
+                    exceeded = True
+                    # Stop feeding the app; it sees the client as gone
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal response_started, rejected
+            if rejected:
+                return
+            if exceeded and not response_started:
+                # Replace whatever the app answered to the truncated body
+                rejected = True
+                await self._reject(scope, send, received, max_size)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            # Reading the truncated body raised (ClientDisconnect) unhandled
+            if not exceeded or response_started or rejected:
+                raise
+
+        if exceeded and not response_started and not rejected:
+            # The app gave up on the body without answering
+            await self._reject(scope, send, received, max_size)
+
+    async def _reject(self, scope: Scope, send: Send, size: int, max_size: int) -> None:
+        """Send a 413 response in the standard error envelope."""
+        logger.warning(
+            "Request too large",
+            extra={
+                "content_length": size,
+                "max_size": max_size,
+                "path": scope["path"],
+                "method": scope["method"],
+            },
+        )
+
+        body = json.dumps(
+            {
+                "error": {
+                    "code": "RequestTooLarge",
+                    "message": "Request body too large",
+                    "details": {
+                        "max_size_bytes": max_size,
+                        "received_bytes": size,
+                    },
+                }
+            }
+        ).encode("utf-8")
 
-        return await call_next(request)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 413,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"connection", b"close"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
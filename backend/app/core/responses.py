@@ -0,0 +1,68 @@
+"""Fast JSON response path for hot API endpoints.
+
+Routes that already build their exact response schema in the service layer
+can return ``fast_json_response(...)`` instead of the bare model. FastAPI
+then skips ``response_model`` re-validation and the ``jsonable_encoder``
+round trip, and the body is produced directly by pydantic-core (for
+models) or orjson (for plain data). ``response_model`` is still declared
+on the route so the OpenAPI schema is unchanged.
+"""
+from decimal import Decimal
+from typing import Any, Optional
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(obj: Any) -> Any:
+    """Serialize types orjson doesn't handle natively, matching pydantic's JSON mode."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by pydantic-core / orjson instead of stdlib json."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+
+        if isinstance(content, list) and content and isinstance(content[0], BaseModel):
+            return b"[" + b",".join(
+                item.__pydantic_serializer__.to_json(item) for item in content
+            ) + b"]"
+
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def fast_json_response(
+    content: Any,
+    response: Optional[Response] = None,
+    status_code: int = 200,
+) -> FastJSONResponse:
+    """Build a FastJSONResponse, bypassing response_model validation.
+
+    Args:
+        content: A response schema instance, list of them, or plain JSON data.
+            Must already match the route's declared response_model.
+        response: The injected ``Response`` parameter, if the route set
+            headers or cookies on it (e.g. the session cookie).
+        status_code: HTTP status code; the decorator's status_code is not
+            applied to responses returned directly.
+
+    Returns:
+        The rendered response.
+    """
+    result = FastJSONResponse(content, status_code=status_code)
+
+    if response is not None:
+        for key, value in response.raw_headers:
+            if key not in (b"content-length", b"content-type"):
+                result.raw_headers.append((key, value))
+
+    return result
@@ -1,56 +1,78 @@
 """Security headers middleware."""
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import settings
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Add security headers to all responses."""
+# Paths serving Swagger UI/ReDoc, which need inline scripts and styles
+DOCS_PATHS = frozenset({"/docs", "/redoc", "/openapi.json"})
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        response = await call_next(request)
+# Relaxed CSP for API documentation (Swagger UI/ReDoc)
+DOCS_CSP = (
+    "default-src 'self'; "
+    "script-src 'self' 'unsafe-inline' cdn.jsdelivr.net unpkg.com; "
+    "style-src 'self' 'unsafe-inline' cdn.jsdelivr.net; "
+    "img-src 'self' data:; "
+    "frame-ancestors 'none'"
+)
 
-        # Prevent clickjacking
-        response.headers["X-Frame-Options"] = "DENY"
+# Strict CSP for API endpoints (no script/style execution)
+API_CSP = "default-src 'none'; frame-ancestors 'none'"
 
-        # XSS Protection (legacy but still useful for older browsers)
-        response.headers["X-XSS-Protection"] = "1; mode=block"
 
+def _build_static_headers() -> dict[str, str]:
+    """Build the headers added to every response regardless of path."""
+    headers = {
+        # Prevent clickjacking
+        "X-Frame-Options": "DENY",
+        # XSS Protection (legacy but still useful for older browsers)
+        "X-XSS-Protection": "1; mode=block",
         # Prevent MIME type sniffing
-        response.headers["X-Content-Type-Options"] = "nosniff"
-
+        "X-Content-Type-Options": "nosniff",
         # Referrer policy
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-
+        "Referrer-Policy": "strict-origin-when-cross-origin",
         # Permissions policy (restrict browser features)
-        response.headers["Permissions-Policy"] = (
+        "Permissions-Policy": (
             "accelerometer=(), camera=(), geolocation=(), "
             "gyroscope=(), magnetometer=(), microphone=(), "
             "payment=(), usb=()"
-        )
+        ),
+    }
+
+    # HSTS (only in production with HTTPS)
+    if settings.is_production:
+        headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
 
-        # HSTS (only in production with HTTPS)
-        if settings.is_production:
-            response.headers["Strict-Transport-Security"] = (
-                "max-age=31536000; includeSubDomains"
-            )
+    return headers
+
+
+class SecurityHeadersMiddleware:
+    """Add security headers to all responses.
+
+    Implemented as raw ASGI middleware: headers are injected into the
+    ``http.response.start`` message, so the response body (including
+    streaming responses) passes through untouched.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.static_headers = _build_static_headers()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
         # Content Security Policy - path-based configuration
-        if request.url.path in ["/docs", "/redoc", "/openapi.json"]:
-            # Relaxed CSP for API documentation (Swagger UI/ReDoc)
-            response.headers["Content-Security-Policy"] = (
-                "default-src 'self'; "
-                "script-src 'self' 'unsafe-inline' cdn.jsdelivr.net unpkg.com; "
-                "style-src 'self' 'unsafe-inline' cdn.jsdelivr.net; "
-                "img-src 'self' data:; "
-                "frame-ancestors 'none'"
-            )
-        else:
-            # Strict CSP for API endpoints (no script/style execution)
-            response.headers["Content-Security-Policy"] = (
-                "default-src 'none'; frame-ancestors 'none'"
-            )
-
-        return response
+        csp = DOCS_CSP if scope["path"] in DOCS_PATHS else API_CSP
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for key, value in self.static_headers.items():
+                    headers[key] = value
+                headers["Content-Security-Policy"] = csp
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -11,9 +11,20 @@ SESSION_COOKIE_NAME = "footy_session_id"
 SESSION_COOKIE_MAX_AGE = 60 * 60 * 24 * 30  # 30 days
 
 
+def is_valid_session_id(session_id: str) -> bool:
+    """Check that a session ID has the form generate_session_id produces."""
+    try:
+        return str(uuid.UUID(session_id)) == session_id
+    except ValueError:
+        return False
+
+
 def get_session_id(request: Request) -> Optional[str]:
-    """Get session ID from request cookies."""
-    return request.cookies.get(SESSION_COOKIE_NAME)
+    """Get session ID from request cookies, ignoring malformed values."""
+    session_id = request.cookies.get(SESSION_COOKIE_NAME)
+    if session_id and not is_valid_session_id(session_id):
+        return None
+    return session_id
 
 
 def generate_session_id() -> str:
@@ -2,6 +2,8 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sess
 from sqlalchemy.orm import DeclarativeBase
 
 from app.core.config import settings
+from app.db.instrumentation import install_query_instrumentation
+from app.db.slow_query import install_slow_query_log
 
 
 class Base(DeclarativeBase):
@@ -13,6 +15,8 @@ engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
 )
+install_query_instrumentation(engine)
+install_slow_query_log(engine)
 
 async_session_maker = async_sessionmaker(
     engine,
@@ -0,0 +1,127 @@
+"""Per-request SQL instrumentation.
+
+Engine events record every statement executed while a ``track_queries()``
+block is active: the query count, total time spent in the database and how
+often each statement shape (the parameterized SQL text) repeats. Repeated
+shapes are the signature of N+1 access patterns, e.g. one SELECT per cart
+item.
+
+Tracking is scoped with a context variable, so concurrent requests never
+mix their numbers. ``QueryStatsMiddleware`` opens a tracking block per
+request; tests use ``query_budget()`` to fail when an endpoint or service
+call issues more queries than expected:
+
+    with query_budget(max_queries=3):
+        await service.get_products()
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@dataclass
+class QueryStats:
+    """Queries recorded within one tracking block."""
+    count: int = 0
+    total_time: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    @property
+    def total_time_ms(self) -> float:
+        """Total database time in milliseconds."""
+        return self.total_time * 1000
+
+    @property
+    def duplicates(self) -> dict[str, int]:
+        """Statement shapes executed more than once, with their counts."""
+        return {statement: n for statement, n in self.statements.items() if n > 1}
+
+    @property
+    def duplicate_count(self) -> int:
+        """Number of executions beyond the first of each statement shape."""
+        return sum(n - 1 for n in self.statements.values())
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised by query_budget() when a block issues more queries than allowed."""
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Get the stats of the active tracking block, if any."""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Record the SQL executed within the block into a fresh QueryStats."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int, max_duplicates: Optional[int] = 0) -> Iterator[QueryStats]:
+    """
+    Assert that the block stays within a query budget.
+
+    Args:
+        max_queries: Maximum number of statements the block may execute
+        max_duplicates: Maximum number of repeated statement shapes
+            (see QueryStats.duplicate_count), None to not check
+
+    Raises:
+        QueryBudgetExceeded: If either limit is exceeded
+    """
+    with track_queries() as stats:
+        yield stats
+
+    if stats.count > max_queries:
+        raise QueryBudgetExceeded(
+            f"Expected at most {max_queries} queries, got {stats.count}"
+        )
+    if max_duplicates is not None and stats.duplicate_count > max_duplicates:
+        repeated = "\n".join(
+            f"  {n}x {statement}" for statement, n in stats.duplicates.items()
+        )
+        raise QueryBudgetExceeded(
+            f"Expected at most {max_duplicates} duplicate queries, "
+            f"got {stats.duplicate_count}:\n{repeated}"
+        )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    start_times = conn.info.get("query_start_time")
+    if start_times:
+        stats.total_time += time.perf_counter() - start_times.pop()
+    stats.count += 1
+    stats.statements[statement] += 1
+
+
+def install_query_instrumentation(engine: AsyncEngine | Engine) -> None:
+    """Register the instrumentation event listeners on an engine."""
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,194 @@
+"""Query plan regression check for the hot service queries.
+
+Runs the catalog, order, wishlist and event service methods against a
+seeded database, captures every SELECT they issue and EXPLAINs it with
+sequential scans disabled. On a small seeded database the planner would
+happily seq-scan everything, so ``enable_seqscan = off`` is used to ask
+"is there an index this query can use?": a Seq Scan that survives it on
+one of the large tables means the access path has no supporting index.
+
+Run after ``alembic upgrade head`` and ``python -m app.db.seed``:
+
+    python -m app.db.plan_check
+
+Exits with status 1 if any violation is found.
+"""
+import asyncio
+import json
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterator
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.logging import setup_logging, get_logger
+from app.db.base import engine
+from app.models import Category, Order, Product, User
+from app.schemas import ProductFilters
+from app.services.event_service import EventService
+from app.services.order_service import OrderService
+from app.services.product_service import CategoryService, ProductService
+from app.services.wishlist_service import WishlistService
+
+logger = get_logger(__name__)
+
+# Tables expected to grow large; a Seq Scan on any of these is a regression
+LARGE_TABLES = frozenset({
+    "products",
+    "product_variants",
+    "orders",
+    "order_items",
+    "wishlist_items",
+    "events",
+})
+
+
+@dataclass
+class PlanViolation:
+    """A sequential scan on a large table found in a query plan."""
+    scenario: str
+    table: str
+    statement: str
+
+
+@dataclass
+class Scenario:
+    """A named service call whose queries are checked."""
+    name: str
+    run: Callable[[AsyncSession], Awaitable[Any]]
+    statements: list[tuple[str, Any]] = field(default_factory=list)
+
+
+def _seq_scans(plan: dict) -> Iterator[str]:
+    """Yield the relation names of all Seq Scan nodes in an EXPLAIN JSON plan."""
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan.get("Relation Name", "")
+    for child in plan.get("Plans", []):
+        yield from _seq_scans(child)
+
+
+async def _build_scenarios(session: AsyncSession) -> list[Scenario]:
+    """Build scenarios using ids of existing seeded rows."""
+    user_id = await session.scalar(select(User.id).limit(1))
+    product = (await session.execute(select(Product.id, Product.slug).limit(1))).first()
+    category_id = await session.scalar(select(Category.id).limit(1))
+    order_id = await session.scalar(select(Order.id).limit(1))
+
+    if user_id is None or product is None or category_id is None:
+        raise RuntimeError("Database is not seeded, run python -m app.db.seed first")
+
+    scenarios = [
+        Scenario("products.list", lambda db: ProductService(db).get_products()),
+        Scenario(
+            "products.list_by_category",
+            lambda db: ProductService(db).get_products(ProductFilters(category_id=category_id)),
+        ),
+        Scenario(
+            "products.list_by_size",
+            lambda db: ProductService(db).get_product_summaries(
+                ProductFilters(sizes=["42"], in_stock=True)
+            ),
+        ),
+        Scenario("products.featured", lambda db: ProductService(db).get_featured_products()),
+        Scenario("products.facets", lambda db: ProductService(db).get_facets()),
+        Scenario("products.by_id", lambda db: ProductService(db).get_product_by_id(product.id)),
+        Scenario(
+            "products.by_slug", lambda db: ProductService(db).get_product_by_slug(product.slug)
+        ),
+        Scenario(
+            "categories.by_id", lambda db: CategoryService(db).get_category_by_id(category_id)
+        ),
+        Scenario(
+            "orders.list_user", lambda db: OrderService(db, None).list_user_orders(user_id)
+        ),
+        Scenario("wishlist.get", lambda db: WishlistService(db).get_wishlist(user_id)),
+        Scenario("events.by_user", lambda db: EventService(db).get_user_events(user_id)),
+    ]
+    if order_id is not None:
+        scenarios.append(
+            Scenario("orders.get", lambda db: OrderService(db, None).get_order(order_id, user_id))
+        )
+    return scenarios
+
+
+async def _explain(conn: AsyncConnection, statement: str, parameters: Any) -> dict:
+    """EXPLAIN a captured statement with its original parameters."""
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+async def check_query_plans() -> list[PlanViolation]:
+    """Run all scenarios and return the sequential scan violations found."""
+    violations: list[PlanViolation] = []
+
+    async with engine.connect() as conn:
+        # Everything runs in one transaction that is rolled back at the end
+        await conn.begin()
+        await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+        session = AsyncSession(bind=conn, expire_on_commit=False)
+        scenarios = await _build_scenarios(session)
+        current: list[Scenario] = []
+
+        def capture(connection, cursor, statement, parameters, context, executemany):
+            if current and statement.lstrip().upper().startswith("SELECT"):
+                current[0].statements.append((statement, parameters))
+
+        event.listen(conn.sync_connection, "before_cursor_execute", capture)
+        try:
+            for scenario in scenarios:
+                current[:] = [scenario]
+                await scenario.run(session)
+                session.expunge_all()
+        finally:
+            current.clear()
+            event.remove(conn.sync_connection, "before_cursor_execute", capture)
+
+        for scenario in scenarios:
+            for statement, parameters in scenario.statements:
+                plan = await _explain(conn, statement, parameters)
+                for table in _seq_scans(plan):
+                    if table in LARGE_TABLES:
+                        violations.append(PlanViolation(scenario.name, table, statement))
+            logger.info(
+                "Checked query plans",
+                extra={"scenario": scenario.name, "statements": len(scenario.statements)},
+            )
+
+        await session.close()
+        await conn.rollback()
+
+    return violations
+
+
+async def main() -> int:
+    """Entry point: log violations and return the process exit status."""
+    setup_logging(debug=False)
+    try:
+        violations = await check_query_plans()
+    finally:
+        await engine.dispose()
+
+    for violation in violations:
+        logger.error(
+            "Sequential scan on large table",
+            extra={
+                "scenario": violation.scenario,
+                "table": violation.table,
+                "statement": violation.statement,
+            },
+        )
+
+    if violations:
+        return 1
+
+    logger.info("No sequential scans on large tables")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -13,6 +13,7 @@ from app.models import (
     User, UserRole, Category, Product, ProductVariant,
 )
 from app.core.logging import setup_logging, get_logger
+from app.services.inventory_service import InventoryService
 
 logger = get_logger(__name__)
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -218,6 +219,7 @@ async def seed_products(session: AsyncSession, categories: dict[str, Category])
         products.append(product)
 
     await session.flush()
+    await InventoryService(session).refresh_stock_summary(p.id for p in products)
     return products
 
 
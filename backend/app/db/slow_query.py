@@ -0,0 +1,186 @@
+"""Slow query log.
+
+Every statement slower than settings.slow_query_threshold_ms is logged
+with its normalized SQL, a fingerprint of its parameters (so repeated
+calls can be grouped without logging raw values) and the service or API
+function that issued it.
+
+A sample of slow SELECTs (settings.slow_query_explain_sample_rate) is
+additionally re-run as ``EXPLAIN (ANALYZE, BUFFERS)`` in a background task
+on its own connection, inside a rolled back transaction with a statement
+timeout. The plan is logged separately with the same fingerprint. At most
+one EXPLAIN runs at a time per worker; further samples are skipped.
+"""
+import asyncio
+import hashlib
+import random
+import re
+import sys
+import time
+from types import FrameType
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+try:
+    from greenlet import getcurrent
+except ImportError:  # pragma: no cover - greenlet ships with SQLAlchemy asyncio
+    getcurrent = None
+
+logger = get_logger(__name__)
+
+# Packages whose functions are reported as the caller of a slow query
+CALLER_PACKAGES = ("app.services.", "app.api.")
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER = re.compile(r"\$\d+|%\(\w+\)s|\?")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def normalize_sql(statement: str) -> str:
+    """Reduce a statement to its shape: literals and parameter lists become ?."""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _PARAMETER.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    return _PARAMETER_LIST.sub("(?...)", sql)
+
+
+def parameters_fingerprint(parameters: Any) -> str:
+    """Stable short hash of the bound parameters."""
+    return hashlib.blake2b(repr(parameters).encode(), digest_size=8).hexdigest()
+
+
+def _frames() -> Iterator[FrameType]:
+    """Walk the stack, continuing into the asyncio side of a greenlet_spawn."""
+    frame: Optional[FrameType] = sys._getframe(1)
+    while frame is not None:
+        yield frame
+        frame = frame.f_back
+
+    # AsyncSession runs the ORM in a child greenlet; the awaiting coroutines
+    # (service methods, endpoints) are on the parent greenlet's stack.
+    if getcurrent is not None:
+        parent = getcurrent().parent
+        frame = parent.gr_frame if parent is not None else None
+        while frame is not None:
+            yield frame
+            frame = frame.f_back
+
+
+def calling_method() -> Optional[str]:
+    """Find the innermost app service/API function on the call stack."""
+    for frame in _frames():
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(CALLER_PACKAGES):
+            return f"{module}.{frame.f_code.co_qualname}"
+    return None
+
+
+class SlowQueryLog:
+    """Engine listeners that log slow statements and sample their plans."""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.threshold = settings.slow_query_threshold_ms / 1000
+        self.sample_rate = settings.slow_query_explain_sample_rate
+        self._explain_task: Optional[asyncio.Task] = None
+
+    def install(self) -> None:
+        sync_engine = self.engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start_time", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start_times = conn.info.get("slow_query_start_time")
+        if not start_times:
+            return
+        elapsed = time.perf_counter() - start_times.pop()
+        if elapsed < self.threshold or statement.lstrip()[:7].upper() == "EXPLAIN":
+            return
+
+        normalized = normalize_sql(statement)
+        fingerprint = parameters_fingerprint(parameters)
+        logger.warning(
+            "Slow query",
+            extra={
+                "duration_ms": round(elapsed * 1000, 2),
+                "statement": normalized,
+                "parameters_fingerprint": fingerprint,
+                "parameter_count": len(parameters) if parameters else 0,
+                "executemany": executemany,
+                "caller": calling_method(),
+            },
+        )
+
+        if (
+            not executemany
+            and statement.lstrip()[:6].upper() == "SELECT"
+            and random.random() < self.sample_rate
+        ):
+            self._schedule_explain(statement, parameters, normalized, fingerprint)
+
+    def _schedule_explain(
+        self, statement: str, parameters: Any, normalized: str, fingerprint: str
+    ) -> None:
+        """Start a background EXPLAIN unless one is already running."""
+        if self._explain_task is not None and not self._explain_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._explain_task = loop.create_task(
+            self._explain(statement, parameters, normalized, fingerprint)
+        )
+
+    async def _explain(
+        self, statement: str, parameters: Any, normalized: str, fingerprint: str
+    ) -> None:
+        """Run EXPLAIN (ANALYZE, BUFFERS) on a separate connection and log the plan."""
+        try:
+            async with self.engine.connect() as conn:
+                await conn.begin()
+                await conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+                await conn.exec_driver_sql(
+                    f"SET LOCAL statement_timeout = {int(settings.slow_query_explain_timeout_ms)}"
+                )
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS, FORMAT TEXT) {statement}",
+                    parameters,
+                )
+                plan = "\n".join(row[0] for row in result)
+                await conn.rollback()
+        except Exception as e:
+            logger.warning(
+                "Slow query EXPLAIN failed",
+                extra={"parameters_fingerprint": fingerprint, "error": str(e)},
+            )
+            return
+
+        logger.info(
+            "Slow query plan",
+            extra={
+                "statement": normalized,
+                "parameters_fingerprint": fingerprint,
+                "plan": plan,
+            },
+        )
+
+
+def install_slow_query_log(engine: AsyncEngine) -> Optional[SlowQueryLog]:
+    """Install the slow query log on an engine, unless disabled (threshold <= 0)."""
+    if settings.slow_query_threshold_ms <= 0:
+        return None
+    slow_query_log = SlowQueryLog(engine)
+    slow_query_log.install()
+    return slow_query_log
@@ -5,6 +5,7 @@ from app.domain.order import (
     validate_transition,
     can_transition,
     get_allowed_transitions,
+    get_allowed_sources,
     InvalidStateTransitionError,
 )
 
@@ -14,5 +15,6 @@ __all__ = [
     "validate_transition",
     "can_transition",
     "get_allowed_transitions",
+    "get_allowed_sources",
     "InvalidStateTransitionError",
 ]
@@ -83,3 +83,20 @@ def get_allowed_transitions(current: OrderStatus) -> set[OrderStatus]:
     if current in TERMINAL_STATES:
         return set()
     return VALID_TRANSITIONS.get(current, set())
+
+
+def get_allowed_sources(target: OrderStatus) -> set[OrderStatus]:
+    """
+    Get the set of states from which an order may move to a target state.
+
+    Args:
+        target: The desired target status
+
+    Returns:
+        Set of OrderStatus values that can transition to target
+    """
+    return {
+        current
+        for current, allowed_targets in VALID_TRANSITIONS.items()
+        if current not in TERMINAL_STATES and target in allowed_targets
+    }
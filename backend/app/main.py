@@ -3,22 +3,27 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from slowapi.errors import RateLimitExceeded
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.core.redis import RedisManager
-from app.core.logging import setup_logging, get_logger
-from app.core.exceptions import FootyException
+from app.core.logging import setup_logging, shutdown_logging, get_logger
+from app.core.exceptions import FootyException, RateLimitError
 from app.core.exception_handlers import (
     footy_exception_handler,
     validation_exception_handler,
     http_exception_handler,
     unhandled_exception_handler,
 )
-from app.core.rate_limit import limiter, rate_limit_exceeded_handler
+from app.core.rate_limit import rate_limit_exceeded_handler
 from app.core.security_headers import SecurityHeadersMiddleware
 from app.core.request_limits import RequestSizeLimitMiddleware
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.metrics import MetricsMiddleware, mark_process_dead, metrics_endpoint
+from app.core.request_context import RequestIdMiddleware
+from app.db.base import engine
+from app.services.cart_sync import cart_sync_worker
+from app.services.outbox import outbox_relay
 from app.api.v1 import health, products, categories, cart, auth, orders, users, wishlist, events, statistics
 from app.api.v1.admin import router as admin_router
 
@@ -38,10 +43,18 @@ async def lifespan(app: FastAPI):
         },
     )
     await RedisManager.init()
+    if settings.cart_sync_enabled:
+        cart_sync_worker.start()
+    if settings.outbox_relay_enabled:
+        outbox_relay.start()
     yield
     # Shutdown
     logger.info("Application shutting down", extra={"app_name": settings.app_name})
+    await outbox_relay.stop()
+    await cart_sync_worker.stop()
     await RedisManager.close()
+    mark_process_dead()
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -67,24 +80,28 @@ app = FastAPI(
     ],
 )
 
-# Add limiter to app state for rate limiting
-app.state.limiter = limiter
-
 # Register exception handlers
 app.add_exception_handler(FootyException, footy_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
-app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
+app.add_exception_handler(RateLimitError, rate_limit_exceeded_handler)
 app.add_exception_handler(Exception, unhandled_exception_handler)
 
-# Add middleware (order matters - first added = outermost = runs first on request)
+# Add middleware (order matters - Starlette wraps each added middleware around the
+# ones added before it, so the last added is outermost and runs first on request)
 # 1. Security headers (runs on all responses)
 app.add_middleware(SecurityHeadersMiddleware)
 
 # 2. Request size limits (reject large requests early)
-app.add_middleware(RequestSizeLimitMiddleware)
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    path_limits={f"{settings.api_v1_prefix}/admin/products/import": settings.max_import_size_bytes},
+)
 
-# 3. CORS middleware (environment-aware)
+# 3. Per-request SQL stats (headers outside production, N+1 warnings)
+app.add_middleware(QueryStatsMiddleware)
+
+# 4. CORS middleware (environment-aware)
 if settings.is_development:
     # Permissive CORS for development
     app.add_middleware(
@@ -92,7 +109,10 @@ if settings.is_development:
         allow_origins=settings.cors_origins,
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-        allow_headers=["Authorization", "Content-Type"],
+        allow_headers=["Authorization", "Content-Type", "X-Request-ID"],
+        expose_headers=[
+            "X-Request-ID", "X-DB-Query-Count", "X-DB-Time-Ms", "X-DB-Duplicate-Queries",
+        ],
     )
 else:
     # Stricter CORS for production/staging
@@ -102,9 +122,17 @@ else:
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
         allow_headers=["Authorization", "Content-Type", "X-Request-ID"],
+        expose_headers=["X-Request-ID"],
         max_age=600,  # 10 minutes cache for preflight
     )
 
+# 5. Request ID correlation (logs from all inner layers carry the ID)
+app.add_middleware(RequestIdMiddleware)
+
+# 6. Request metrics. Starlette wraps later middleware around earlier ones,
+# so this is the outermost layer and also times rejected requests.
+app.add_middleware(MetricsMiddleware, pool=engine.sync_engine.pool)
+
 # Include routers
 app.include_router(health.router, prefix=settings.api_v1_prefix)
 app.include_router(products.router, prefix=settings.api_v1_prefix)
@@ -118,6 +146,9 @@ app.include_router(events.router, prefix=settings.api_v1_prefix)
 app.include_router(statistics.router, prefix=settings.api_v1_prefix)
 app.include_router(admin_router, prefix=settings.api_v1_prefix)
 
+# Prometheus scrape endpoint (outside the versioned API)
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
 
 @app.get("/")
 async def root():
@@ -7,6 +7,7 @@ from app.models.cart import Cart, CartItem
 from app.models.order import Order, OrderItem, OrderStatus
 from app.models.event import Event, SessionUserMapping, TrafficSource
 from app.models.wishlist import WishlistItem
+from app.models.outbox import OutboxMessage
 
 __all__ = [
     # Mixins
@@ -32,4 +33,6 @@ __all__ = [
     "TrafficSource",
     # Wishlist
     "WishlistItem",
+    # Outbox
+    "OutboxMessage",
 ]
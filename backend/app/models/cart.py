@@ -2,7 +2,7 @@
 import uuid
 from typing import TYPE_CHECKING, Optional
 from decimal import Decimal
-from sqlalchemy import String, Integer, ForeignKey, Numeric
+from sqlalchemy import BigInteger, String, Integer, ForeignKey, Numeric
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -19,7 +19,12 @@ class Cart(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "carts"
 
     # For anonymous users
-    session_id: Mapped[Optional[str]] = mapped_column(String(255), index=True, nullable=True)
+    session_id: Mapped[Optional[str]] = mapped_column(
+        String(255), index=True, unique=True, nullable=True
+    )
+
+    # Revision of the Redis cart last synced to this row (see CartStore)
+    revision: Mapped[int] = mapped_column(BigInteger, server_default="0", nullable=False)
 
     # For authenticated users
     user_id: Mapped[Optional[uuid.UUID]] = mapped_column(
@@ -49,8 +49,9 @@ class Event(Base, UUIDMixin):
     event_metadata: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
 
     __table_args__ = (
-        Index("ix_events_session_event_time", "session_id", "event_time"),
-        Index("ix_events_user_event_time", "user_id", "event_time"),
+        # Event history by session or user, paged by (event_time, id)
+        Index("ix_events_session_event_time_id", "session_id", "event_time", "id"),
+        Index("ix_events_user_event_time_id", "user_id", "event_time", "id"),
         Index("ix_events_name_time", "event_name", "event_time"),
     )
 
@@ -69,4 +70,5 @@ class SessionUserMapping(Base, UUIDMixin):
 
     __table_args__ = (
         Index("ix_session_user_unique", "session_id", "user_id", unique=True),
+        Index("ix_session_user_mappings_linked_at", "linked_at"),
     )
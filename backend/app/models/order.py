@@ -3,7 +3,7 @@ import uuid
 from enum import Enum
 from decimal import Decimal
 from typing import TYPE_CHECKING, Optional
-from sqlalchemy import String, Integer, ForeignKey, Numeric, Text, Enum as SQLEnum
+from sqlalchemy import String, Integer, ForeignKey, Numeric, Text, Index, Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 
@@ -73,6 +73,10 @@ class Order(Base, UUIDMixin, TimestampMixin):
         cascade="all, delete-orphan",
     )
 
+    __table_args__ = (
+        Index("ix_orders_user_id_created_at", "user_id", "created_at"),
+    )
+
     def transition_to(self, new_status: OrderStatus) -> None:
         """
         Transition the order to a new status.
@@ -104,6 +108,7 @@ class OrderItem(Base, UUIDMixin, TimestampMixin):
         UUID(as_uuid=True),
         ForeignKey("orders.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
 
     # Reference to original product (may be null if product deleted)
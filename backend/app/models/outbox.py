@@ -0,0 +1,50 @@
+"""Outbox model for events published after commit."""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db.base import Base
+
+
+class OutboxMessage(Base):
+    """Event written in the same transaction as the change it describes.
+
+    The relay (app.services.outbox) performs the message's side effects,
+    publishes it and deletes the row, so the table only holds messages
+    not delivered yet, plus dead letters: messages that failed
+    settings.outbox_max_attempts times, kept for inspection but no longer
+    relayed.
+    """
+    __tablename__ = "outbox_messages"
+
+    # Sequential, so messages are relayed in commit order (roughly)
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+
+    topic: Mapped[str] = mapped_column(String(100), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+
+    # Failed delivery attempts so far
+    attempts: Mapped[int] = mapped_column(Integer, server_default="0", nullable=False)
+    # Set when the message is given up on
+    dead_lettered_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        # The relay's poll: pending messages, least failed first
+        Index(
+            "ix_outbox_messages_pending",
+            "attempts",
+            "id",
+            postgresql_where=text("dead_lettered_at IS NULL"),
+        ),
+    )
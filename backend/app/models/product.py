@@ -2,9 +2,9 @@
 import uuid
 from decimal import Decimal
 from typing import TYPE_CHECKING, Optional
-from sqlalchemy import String, Text, Numeric, Integer, Boolean, ForeignKey, ARRAY
+from sqlalchemy import String, Text, Numeric, Integer, Boolean, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, JSONB
 
 from app.db.base import Base
 from app.models.base import TimestampMixin, UUIDMixin
@@ -38,11 +38,19 @@ class Product(Base, UUIDMixin, TimestampMixin):
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     is_featured: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
+    # Stock summary, denormalized from variants for catalog filters.
+    # Maintained by InventoryService.refresh_stock_summary whenever variant stock changes.
+    in_stock: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false", nullable=False)
+    available_sizes: Mapped[list[str]] = mapped_column(
+        ARRAY(String(20)), default=list, server_default="{}", nullable=False
+    )
+
     # Category
     category_id: Mapped[Optional[uuid.UUID]] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("categories.id"),
         nullable=True,
+        index=True,
     )
 
     # SEO and metadata
@@ -57,15 +65,10 @@ class Product(Base, UUIDMixin, TimestampMixin):
         cascade="all, delete-orphan",
     )
 
-    @property
-    def in_stock(self) -> bool:
-        """Check if any variant is in stock."""
-        return any(v.stock > 0 for v in self.variants)
-
-    @property
-    def available_sizes(self) -> list[str]:
-        """Get list of available sizes."""
-        return [v.size for v in self.variants if v.stock > 0]
+    __table_args__ = (
+        Index("ix_products_available_sizes", "available_sizes", postgresql_using="gin"),
+        Index("ix_products_active_created_at", "created_at", postgresql_where=text("is_active")),
+    )
 
 
 class ProductVariant(Base, UUIDMixin, TimestampMixin):
@@ -88,6 +91,11 @@ class ProductVariant(Base, UUIDMixin, TimestampMixin):
     # Relationships
     product: Mapped["Product"] = relationship("Product", back_populates="variants")
 
+    __table_args__ = (
+        # One variant per size (also serves lookups by product_id)
+        Index("ix_product_variants_product_id_size", "product_id", "size", unique=True),
+    )
+
     # Enable optimistic locking using the version field
     __mapper_args__ = {
         "version_id_col": version
@@ -1,7 +1,7 @@
 """Wishlist model."""
 import uuid
 from typing import TYPE_CHECKING
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -35,4 +35,5 @@ class WishlistItem(Base, UUIDMixin, TimestampMixin):
 
     __table_args__ = (
         UniqueConstraint("user_id", "product_id", name="uq_wishlist_user_product"),
+        Index("ix_wishlist_items_user_id_created_at", "user_id", "created_at"),
     )
@@ -10,7 +10,8 @@ from app.schemas.category import (
 from app.schemas.product import (
     ProductVariantBase, ProductVariantCreate, ProductVariantUpdate, ProductVariantResponse,
     ProductBase, ProductCreate, ProductUpdate, ProductResponse, ProductListResponse,
-    ProductFilters,
+    ProductSummary, ProductSummaryListResponse, ProductFilters,
+    FacetCount, PriceRangeCount, ProductFacets,
 )
 from app.schemas.cart import (
     CartItemBase, CartItemCreate, CartItemUpdate, CartItemResponse,
@@ -58,7 +59,12 @@ __all__ = [
     "ProductUpdate",
     "ProductResponse",
     "ProductListResponse",
+    "ProductSummary",
+    "ProductSummaryListResponse",
     "ProductFilters",
+    "FacetCount",
+    "PriceRangeCount",
+    "ProductFacets",
     # Cart
     "CartItemBase",
     "CartItemCreate",
@@ -92,6 +92,55 @@ class ProductListResponse(BaseSchema):
     pages: int
 
 
+class ProductSummary(BaseSchema):
+    """Slim product projection for grid views (no description, SEO or variants)."""
+    id: UUID
+    name: str
+    slug: str
+    price: Decimal
+    compare_at_price: Optional[Decimal] = None
+    images: list[str] = []
+    brand: Optional[str] = None
+    color: Optional[str] = None
+    gender: Optional[str] = None
+    is_featured: bool = False
+    category_id: Optional[UUID] = None
+    in_stock: bool = False
+    available_sizes: list[str] = []
+
+
+class ProductSummaryListResponse(BaseSchema):
+    """Schema for paginated product summary list."""
+    items: list[ProductSummary]
+    total: int
+    page: int
+    page_size: int
+    pages: int
+
+
+class FacetCount(BaseSchema):
+    """Number of matching products for one facet value."""
+    value: str
+    count: int
+
+
+class PriceRangeCount(BaseSchema):
+    """Number of matching products in a price range (bounds are [min, max))."""
+    min_price: Optional[Decimal] = None
+    max_price: Optional[Decimal] = None
+    count: int
+
+
+class ProductFacets(BaseSchema):
+    """Facet counts for the products matching a filter set."""
+    total: int
+    brands: list[FacetCount] = []
+    colors: list[FacetCount] = []
+    genders: list[FacetCount] = []
+    sizes: list[FacetCount] = []
+    price_ranges: list[PriceRangeCount] = []
+
+
 # Filters
 class ProductFilters(BaseSchema):
     """Product filter parameters."""
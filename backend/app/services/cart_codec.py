@@ -0,0 +1,97 @@
+"""Binary encoding of cart documents stored in Redis.
+
+Carts used to be stored as JSON, with every UUID as a 36 character string
+and prices as decimal strings. The current encoding is a version byte
+followed by a msgpack array using raw 16-byte UUIDs and integer cents:
+
+    version 1: 0x01 + [rev, user_id | nil, [[id, product_id, variant_id, quantity, unit_price_cents], ...]]
+
+which is around a third of the size of the JSON for a typical cart.
+decode_cart still reads JSON documents (they start with "{"); CartStore
+rewrites them in the current encoding when it reads one.
+
+Decoded carts use the same dict shape as before (string UUIDs, decimal
+string prices), so callers do not depend on the storage format.
+"""
+from decimal import Decimal
+
+import msgpack
+import orjson
+
+CURRENT_VERSION = 1
+_VERSION_1 = bytes([1])
+
+
+def is_legacy(data: bytes) -> bool:
+    """Whether a stored cart predates the binary encoding."""
+    return data[:1] == b"{"
+
+
+def _uuid_bytes(value: str) -> bytes:
+    # Same output as UUID(value).bytes for canonical UUID strings
+    return bytes.fromhex(value.replace("-", ""))
+
+
+def _uuid_str(value: bytes) -> str:
+    # Same output as str(UUID(bytes=value)), without building a UUID object
+    h = value.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _price_str(cents: int) -> str:
+    sign = "-" if cents < 0 else ""
+    whole, fraction = divmod(abs(cents), 100)
+    return f"{sign}{whole}.{fraction:02d}"
+
+
+def _to_cents(price: str) -> int:
+    cents = Decimal(price) * 100
+    if cents != cents.to_integral_value():
+        raise ValueError(f"Price {price} has more than two decimal places")
+    return int(cents)
+
+
+def encode_cart(cart_dict: dict) -> bytes:
+    """Encode a cart document in the current format."""
+    items = [
+        [
+            _uuid_bytes(item["id"]),
+            _uuid_bytes(item["product_id"]),
+            _uuid_bytes(item["variant_id"]),
+            item["quantity"],
+            _to_cents(str(item["unit_price"])),
+        ]
+        for item in cart_dict.get("items", [])
+    ]
+    user_id = cart_dict.get("user_id")
+    payload = [cart_dict.get("rev", 0), _uuid_bytes(user_id) if user_id else None, items]
+    return _VERSION_1 + msgpack.packb(payload, use_bin_type=True)
+
+
+def decode_cart(data: bytes) -> dict:
+    """Decode a cart document in any supported format.
+
+    Raises:
+        ValueError: If the format version is unknown.
+    """
+    if is_legacy(data):
+        return orjson.loads(data)
+
+    if data[:1] != _VERSION_1:
+        raise ValueError(f"Unknown cart encoding version {data[0]}")
+
+    rev, user_id, items = msgpack.unpackb(data[1:], raw=False)
+    return {
+        "items": [
+            {
+                "id": _uuid_str(item_id),
+                "product_id": _uuid_str(product_id),
+                "variant_id": _uuid_str(variant_id),
+                "quantity": quantity,
+                "unit_price": _price_str(cents),
+            }
+            for item_id, product_id, variant_id, quantity, cents in items
+        ],
+        "user_id": _uuid_str(user_id) if user_id else None,
+        "rev": rev,
+    }
@@ -1,12 +1,10 @@
 """Cart service - business logic for shopping cart."""
-import json
+import uuid
 from datetime import datetime
 from uuid import UUID
-from typing import Optional, Callable
+from typing import Optional
 from decimal import Decimal
 
-import redis.asyncio as redis
-from redis.exceptions import WatchError
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -16,112 +14,55 @@ from app.core.exceptions import (
     NotFoundError,
     ValidationError,
 )
-from app.models import Product, ProductVariant, Cart, CartItem, User
+from app.core.redis import CartShards
+from app.services.cart_store import CartStore, cart_owner, resolve_cart_id
+from app.models import Product, ProductVariant
 from app.schemas import (
     CartItemCreate, CartItemUpdate, CartItemResponse, CartResponse,
     ProductResponse, ProductVariantResponse, CategoryResponse,
 )
 
 
-CART_KEY_PREFIX = "cart:"
-CART_TTL = 60 * 60 * 24 * 30  # 30 days
-MAX_RETRIES = 5  # Maximum retries for atomic operations
-
-
 class CartService:
-    """Service for cart operations using Redis for fast access."""
+    """Service for cart operations using Redis for fast access (see CartStore)."""
 
-    def __init__(self, db: AsyncSession, redis_client: redis.Redis):
+    def __init__(self, db: AsyncSession, carts: CartShards):
         self.db = db
-        self.redis = redis_client
-
-    def _cart_key(self, session_id: str) -> str:
-        """Generate Redis key for cart."""
-        return f"{CART_KEY_PREFIX}{session_id}"
+        self.store = CartStore(db, carts)
 
-    async def _atomic_update_cart(
-        self,
-        session_id: str,
-        modifier_fn: Callable[[dict], dict],
-        user_id: Optional[UUID] = None,
-    ) -> dict:
+    async def resolve_cart(self, session_id: str, user_id: Optional[UUID] = None) -> str:
         """
-        Atomically update cart using Redis WATCH/MULTI/EXEC pattern.
+        Get the cart ID for a request (see resolve_cart_id).
 
-        This prevents lost updates when multiple requests modify the same cart
-        concurrently. If the cart is modified between WATCH and EXEC, the
-        transaction is retried.
-
-        Args:
-            session_id: The cart session identifier
-            modifier_fn: A function that takes the current cart dict and returns modified cart dict
-            user_id: Optional user ID to associate with the cart
-
-        Returns:
-            The modified cart dictionary
-
-        Raises:
-            RuntimeError: If max retries exceeded
+        An authenticated request first moves in any lines still in its
+        session's cart: users already signed in when carts became keyed by
+        user have theirs under the session, and only a login merges it.
         """
-        cart_key = self._cart_key(session_id)
-
-        for attempt in range(MAX_RETRIES):
-            try:
-                async with self.redis.pipeline(transaction=True) as pipe:
-                    # Watch the cart key for changes
-                    await pipe.watch(cart_key)
-
-                    # Get current cart data through watched pipeline
-                    results = await pipe.get(cart_key).execute()
-                    cart_data = results[0]
-                    if cart_data:
-                        cart_dict = json.loads(cart_data)
-                    else:
-                        cart_dict = {"items": [], "user_id": str(user_id) if user_id else None}
-
-                    # Apply modification function
-                    modified_cart = modifier_fn(cart_dict)
-
-                    # Update user_id if provided
-                    if user_id:
-                        modified_cart["user_id"] = str(user_id)
-
-                    # Start transaction
-                    pipe.multi()
-
-                    # Set the modified cart atomically
-                    pipe.setex(cart_key, CART_TTL, json.dumps(modified_cart))
-
-                    # Execute transaction
-                    await pipe.execute()
-
-                    return modified_cart
-
-            except WatchError:
-                # Cart was modified by another request, retry
-                if attempt == MAX_RETRIES - 1:
-                    raise RuntimeError(
-                        f"Failed to update cart after {MAX_RETRIES} attempts due to concurrent modifications"
-                    )
-                continue
-
-        # Should not reach here, but just in case
-        raise RuntimeError("Unexpected error in atomic cart update")
+        if user_id:
+            session_cart = await self.store.load(session_id)
+            if session_cart and session_cart.get("items"):
+                await self._merge(session_id, user_id)
+        return resolve_cart_id(session_id, user_id)
 
     async def get_cart(self, session_id: str, user_id: Optional[UUID] = None) -> CartResponse:
         """Get cart for session or user."""
-        # Try to get cart from Redis first
-        cart_key = self._cart_key(session_id)
-        cart_data = await self.redis.get(cart_key)
+        cart_id = await self.resolve_cart(session_id, user_id)
+        return await self._cart_response(session_id, cart_id, await self.store.load(cart_id))
 
-        if cart_data:
-            cart_dict = json.loads(cart_data)
-            items = cart_dict.get("items", [])
-        else:
-            items = []
+    async def _cart_response(
+        self,
+        session_id: str,
+        cart_id: str,
+        cart_dict: Optional[dict],
+        products: Optional[dict[UUID, Product]] = None,
+        variants: Optional[dict[UUID, ProductVariant]] = None,
+    ) -> CartResponse:
+        """Build the cart response from a cart document (and any rows already loaded)."""
+        items = cart_dict.get("items", []) if cart_dict else []
+        _, owner_id = cart_owner(cart_id)
 
         # Enrich items with product data
-        enriched_items = await self._enrich_cart_items(items)
+        enriched_items = await self._enrich_cart_items(items, products, variants)
 
         # Calculate totals
         total = sum(item.subtotal for item in enriched_items)
@@ -132,7 +73,7 @@ class CartService:
         return CartResponse(
             id=session_id,
             session_id=session_id,
-            user_id=str(user_id) if user_id else None,
+            user_id=str(owner_id) if owner_id else None,
             items=enriched_items,
             total=float(total),
             item_count=item_count,
@@ -155,11 +96,10 @@ class CartService:
         quantity = item.quantity or 1
 
         # Get existing quantity if item already in cart
-        cart_key = self._cart_key(session_id)
-        cart_data = await self.redis.get(cart_key)
+        cart_id = await self.resolve_cart(session_id, user_id)
+        cart_dict = await self.store.load(cart_id)
         existing_qty = 0
-        if cart_data:
-            cart_dict = json.loads(cart_data)
+        if cart_dict:
             for cart_item in cart_dict.get("items", []):
                 if cart_item["variant_id"] == str(item.variant_id):
                     existing_qty = cart_item["quantity"]
@@ -197,7 +137,6 @@ class CartService:
                 items[existing_idx]["quantity"] += quantity
             else:
                 # Generate a unique ID based on timestamp and item count
-                import uuid
                 items.append({
                     "id": str(uuid.uuid4()),
                     "product_id": product_id_str,
@@ -210,9 +149,9 @@ class CartService:
             return cart_dict
 
         # Atomically update cart
-        await self._atomic_update_cart(session_id, add_item_modifier, user_id)
+        cart_dict = await self.store.update(cart_id, add_item_modifier, user_id)
 
-        return await self.get_cart(session_id, user_id)
+        return await self._cart_response(session_id, cart_id, cart_dict)
 
     async def update_item(
         self,
@@ -240,9 +179,8 @@ class CartService:
             raise InsufficientStockError(product_name, update.quantity, variant.stock)
 
         # Check cart exists before atomic update
-        cart_key = self._cart_key(session_id)
-        cart_data = await self.redis.get(cart_key)
-        if not cart_data:
+        cart_id = await self.resolve_cart(session_id, user_id)
+        if not await self.store.load(cart_id):
             raise NotFoundError("Cart", session_id)
 
         # Capture values for closure
@@ -270,11 +208,11 @@ class CartService:
             return cart_dict
 
         try:
-            await self._atomic_update_cart(session_id, update_item_modifier, user_id)
+            cart_dict = await self.store.update(cart_id, update_item_modifier, user_id)
         except ItemNotFoundError:
             raise NotFoundError("CartItem", variant_id)
 
-        return await self.get_cart(session_id, user_id)
+        return await self._cart_response(session_id, cart_id, cart_dict)
 
     async def remove_item(
         self,
@@ -284,9 +222,8 @@ class CartService:
     ) -> CartResponse:
         """Remove item from cart with atomic Redis operations."""
         # Check cart exists before atomic update
-        cart_key = self._cart_key(session_id)
-        cart_data = await self.redis.get(cart_key)
-        if not cart_data:
+        cart_id = await self.resolve_cart(session_id, user_id)
+        if not await self.store.load(cart_id):
             raise NotFoundError("Cart", session_id)
 
         # Capture values for closure
@@ -300,37 +237,66 @@ class CartService:
             cart_dict["items"] = items
             return cart_dict
 
-        await self._atomic_update_cart(session_id, remove_item_modifier, user_id)
+        cart_dict = await self.store.update(cart_id, remove_item_modifier, user_id)
 
-        return await self.get_cart(session_id, user_id)
+        return await self._cart_response(session_id, cart_id, cart_dict)
 
-    async def clear_cart(self, session_id: str) -> None:
+    async def clear_cart(self, session_id: str, user_id: Optional[UUID] = None) -> None:
         """Clear all items from cart."""
-        cart_key = self._cart_key(session_id)
-        await self.redis.delete(cart_key)
+        await self.store.delete(await self.resolve_cart(session_id, user_id))
 
     async def merge_carts(
         self,
         anonymous_session_id: str,
         user_id: UUID,
     ) -> CartResponse:
-        """Merge anonymous cart into user's cart on login."""
-        # Get anonymous cart
-        anon_cart_key = self._cart_key(anonymous_session_id)
-        anon_cart_data = await self.redis.get(anon_cart_key)
-
-        if not anon_cart_data:
-            # No anonymous cart to merge
-            return await self.get_cart(anonymous_session_id, user_id)
-
-        anon_cart = json.loads(anon_cart_data)
-        anon_items = anon_cart.get("items", [])
-
-        # Update cart with user_id
-        cart_dict = {"items": anon_items, "user_id": str(user_id)}
-        await self.redis.setex(anon_cart_key, CART_TTL, json.dumps(cart_dict))
-
-        return await self.get_cart(anonymous_session_id, user_id)
+        """
+        Merge an anonymous session's cart into the user's cart on login.
+
+        Quantities of the same variant are summed and capped at the
+        variant's stock, and lines for deleted or sold out variants are
+        dropped. Stock is looked up before either cart is changed, and the
+        move itself is atomic (see CartStore.merge), so a failure leaves the
+        session's lines in place and concurrent logins cannot merge them
+        twice.
+        """
+        cart_dict = await self._merge(anonymous_session_id, user_id)
+        cart_id = resolve_cart_id(anonymous_session_id, user_id)
+        return await self._cart_response(anonymous_session_id, cart_id, cart_dict)
+
+    async def _merge(self, session_id: str, user_id: UUID) -> dict:
+        """Move a session's cart lines into the user's cart; returns the user's cart."""
+        async def prepare(session_items: list[dict]):
+            stock = await self._get_stock({item["variant_id"] for item in session_items})
+
+            def merge_modifier(cart_dict: dict) -> dict:
+                """Modifier function to add the session's lines to the user's cart."""
+                items = cart_dict.get("items", [])
+                by_variant = {item["variant_id"]: item for item in items}
+
+                for session_item in session_items:
+                    available = stock.get(session_item["variant_id"], 0)
+                    existing = by_variant.get(session_item["variant_id"])
+                    if existing is not None:
+                        existing["quantity"] = min(
+                            existing["quantity"] + session_item["quantity"], available
+                        )
+                    elif available > 0:
+                        # New line ID: the session cart's copy may still be in Postgres
+                        merged_item = {
+                            **session_item,
+                            "id": str(uuid.uuid4()),
+                            "quantity": min(session_item["quantity"], available),
+                        }
+                        items.append(merged_item)
+                        by_variant[merged_item["variant_id"]] = merged_item
+
+                cart_dict["items"] = [item for item in items if item["quantity"] > 0]
+                return cart_dict
+
+            return merge_modifier
+
+        return await self.store.merge(session_id, user_id, prepare)
 
     async def refresh_prices(
         self,
@@ -346,41 +312,50 @@ class CartService:
         Returns the updated cart with current prices.
         """
         # Get current cart
-        cart_key = self._cart_key(session_id)
-        cart_data = await self.redis.get(cart_key)
+        cart_id = await self.resolve_cart(session_id, user_id)
+        cart_dict = await self.store.load(cart_id)
 
-        if not cart_data:
-            return await self.get_cart(session_id, user_id)
+        if not cart_dict:
+            return await self._cart_response(session_id, cart_id, cart_dict)
 
-        cart_dict = json.loads(cart_data)
         items = cart_dict.get("items", [])
 
         if not items:
-            return await self.get_cart(session_id, user_id)
+            return await self._cart_response(session_id, cart_id, cart_dict)
 
-        # Update each item's price to current product price
-        updated_items = []
-        for item in items:
-            product_id = UUID(item["product_id"])
-            product = await self._get_product(product_id)
+        # One bulk lookup for every line, reused for the response
+        products = await self._get_products({UUID(item["product_id"]) for item in items})
+        variants = await self._get_variants({UUID(item["variant_id"]) for item in items})
+        looked_up = {item["product_id"] for item in items}
+        prices = {str(product_id): product.price for product_id, product in products.items()}
 
-            if not product:
-                # Skip items with deleted products
-                continue
+        def is_stale(item: dict) -> bool:
+            """Whether a line's price differs from the current price (or its product is gone)."""
+            if item["product_id"] not in looked_up:
+                return False  # Added meanwhile at the current price
+            price = prices.get(item["product_id"])
+            return price is None or Decimal(item["unit_price"]) != price
 
-            # Update price to current product price
-            updated_item = item.copy()
-            updated_item["unit_price"] = str(product.price)
-            updated_items.append(updated_item)
+        if not any(is_stale(item) for item in items):
+            return await self._cart_response(session_id, cart_id, cart_dict, products, variants)
 
-        # Save updated cart atomically
+        # Only touch stale lines, so concurrent changes to the cart are kept
         def update_prices_modifier(cart_dict: dict) -> dict:
-            cart_dict["items"] = updated_items
+            refreshed = []
+            for item in cart_dict.get("items", []):
+                if is_stale(item):
+                    price = prices.get(item["product_id"])
+                    if price is None:
+                        # Skip items with deleted products
+                        continue
+                    item["unit_price"] = str(price)
+                refreshed.append(item)
+            cart_dict["items"] = refreshed
             return cart_dict
 
-        await self._atomic_update_cart(session_id, update_prices_modifier, user_id)
+        cart_dict = await self.store.update(cart_id, update_prices_modifier, user_id)
 
-        return await self.get_cart(session_id, user_id)
+        return await self._cart_response(session_id, cart_id, cart_dict, products, variants)
 
     async def _get_product(self, product_id: UUID) -> Optional[Product]:
         """Get product by ID."""
@@ -392,28 +367,67 @@ class CartService:
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
+    async def _get_stock(self, variant_ids: set[str]) -> dict[str, int]:
+        """Get current stock by variant ID for a set of variants."""
+        query = select(ProductVariant.id, ProductVariant.stock).where(
+            ProductVariant.id.in_([UUID(variant_id) for variant_id in variant_ids])
+        )
+        result = await self.db.execute(query)
+        return {str(variant_id): stock for variant_id, stock in result.all()}
+
+    async def _get_products(self, product_ids: set[UUID]) -> dict[UUID, Product]:
+        """Get active products by ID in one query (plus one for categories)."""
+        if not product_ids:
+            return {}
+        query = (
+            select(Product)
+            .options(selectinload(Product.category))
+            .where(Product.id.in_(product_ids), Product.is_active == True)
+        )
+        result = await self.db.execute(query)
+        return {product.id: product for product in result.scalars()}
+
+    async def _get_variants(self, variant_ids: set[UUID]) -> dict[UUID, ProductVariant]:
+        """Get product variants by ID in one query."""
+        if not variant_ids:
+            return {}
+        query = select(ProductVariant).where(ProductVariant.id.in_(variant_ids))
+        result = await self.db.execute(query)
+        return {variant.id: variant for variant in result.scalars()}
+
     async def _get_variant(self, variant_id: UUID) -> Optional[ProductVariant]:
         """Get product variant by ID."""
         query = select(ProductVariant).where(ProductVariant.id == variant_id)
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
-    async def _enrich_cart_items(self, items: list[dict]) -> list[CartItemResponse]:
-        """Enrich cart items with full product data."""
+    async def _enrich_cart_items(
+        self,
+        items: list[dict],
+        products: Optional[dict[UUID, Product]] = None,
+        variants: Optional[dict[UUID, ProductVariant]] = None,
+    ) -> list[CartItemResponse]:
+        """Enrich cart items with full product data, bulk loading rows not passed in."""
+        products = dict(products or {})
+        variants = dict(variants or {})
+        products.update(await self._get_products(
+            {UUID(item["product_id"]) for item in items} - products.keys()
+        ))
+        variants.update(await self._get_variants(
+            {UUID(item["variant_id"]) for item in items} - variants.keys()
+        ))
+
         enriched = []
 
         for item in items:
             product_id = UUID(item["product_id"])
             variant_id = UUID(item["variant_id"])
 
-            product = await self._get_product(product_id)
+            product = products.get(product_id)
             if not product:
                 continue  # Skip items with deleted products
 
-            variant_query = select(ProductVariant).where(ProductVariant.id == variant_id)
-            variant_result = await self.db.execute(variant_query)
-            variant = variant_result.scalar_one_or_none()
-
+            variant = variants.get(variant_id)
             if not variant:
                 continue  # Skip items with deleted variants
 
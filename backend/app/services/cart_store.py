@@ -0,0 +1,695 @@
+"""Cart storage - Redis in front of the carts/cart_items tables.
+
+A cart belongs either to an anonymous session or to a user; its cart ID is
+the session ID or "user:<user ID>" (user_cart_id). Requests authenticated
+as a user use the user's cart, so every device of a user shares it;
+anonymous requests use their session's cart (resolve_cart_id, no lookup).
+When a session logs in, its cart is moved into the user's cart (merge).
+
+Carts are read and written in Redis as one binary document per cart (see
+app.services.cart_codec), updated atomically with WATCH/MULTI/EXEC. Every
+write bumps the document's revision ("rev") and adds the cart ID to its
+shard's dirty set; the cart sync worker (app.services.cart_sync) copies dirty carts to Postgres in
+batches (write-behind). Postgres therefore holds every cart: Redis keys
+expire after settings.cart_cache_ttl_seconds, may be evicted under memory
+pressure (use maxmemory-policy volatile-lru, so the dirty sets, which have
+no TTL, are never evicted), and a cart missing from Redis is rehydrated
+from Postgres on its next read or write. A cart Postgres does not have
+either is cached as NO_CART for settings.cart_missing_ttl_seconds, so
+visitors without a cart are served from Redis alone.
+
+Every Redis call goes through the cart workload's circuit breaker. When
+Redis fails, or the breaker is open, carts are read from and written to
+Postgres directly, so browsing and checkout keep working (more slowly)
+through a Redis outage or failover. A cart changed in Postgres during an
+outage wins over its Redis copy: the worker process that wrote it deletes
+the Redis copy (drop_stale_copies) before it next reads or writes carts in
+Redis, or syncs them, and the cart is then rehydrated from Postgres.
+Changes made in Redis since the last sync cannot be read during the
+outage, so they are lost with that copy.
+"""
+import uuid
+from datetime import datetime
+from typing import Awaitable, Callable, Iterable, Iterator, Optional
+from uuid import UUID
+from decimal import Decimal
+
+from redis.exceptions import WatchError
+from sqlalchemy import any_, bindparam, delete, func, insert, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import CART_STORE_FALLBACKS, record_cache_lookup
+from app.core.redis import REDIS_UNAVAILABLE, CartShards, RedisManager
+from app.core.session import SESSION_COOKIE_MAX_AGE
+from app.models import Cart, CartItem, ProductVariant
+from app.services.cart_codec import decode_cart, encode_cart, is_legacy
+
+logger = get_logger(__name__)
+
+CART_KEY_PREFIX = "cart:"
+MERGED_KEY_PREFIX = "cart-merged:"  # Session ID -> IDs of its lines already merged
+USER_CART_PREFIX = "user:"
+DIRTY_CARTS_KEY = "carts:dirty"  # Set of cart IDs changed since the last sync
+NO_CART = b"\x00"  # Cached for a cart that does not exist (not a valid document)
+MAX_RETRIES = 5  # Maximum retries for atomic operations
+ITEM_INSERT_CHUNK = 1000  # Rows per multi-row INSERT (asyncpg allows 32767 parameters)
+
+# KEYS[1]: cart key, ARGV[1]: value read, ARGV[2]: replacement
+# Replaces the value only if it is unchanged, keeping its TTL.
+COMPARE_AND_SET_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('SET', KEYS[1], ARGV[2], 'KEEPTTL')
+end
+return false
+"""
+
+
+# Carts written to Postgres while Redis was unavailable, whose Redis copies
+# are stale (per worker process, like the circuit breaker)
+_stale_redis_carts: set[str] = set()
+
+
+def cart_key(cart_id: str) -> str:
+    """Generate Redis key for cart."""
+    return f"{CART_KEY_PREFIX}{cart_id}"
+
+
+def merged_key(session_id: str) -> str:
+    """Generate Redis key for the session lines a merge has moved already."""
+    return f"{MERGED_KEY_PREFIX}{session_id}"
+
+
+def user_cart_id(user_id: UUID | str) -> str:
+    """Cart ID of a user's cart."""
+    return f"{USER_CART_PREFIX}{user_id}"
+
+
+def resolve_cart_id(session_id: str, user_id: Optional[UUID] = None) -> str:
+    """Cart ID for a request: the user's cart if authenticated, else the session's."""
+    return user_cart_id(user_id) if user_id else session_id
+
+
+def cart_owner(cart_id: str) -> tuple[Optional[str], Optional[UUID]]:
+    """Split a cart ID into (session_id, user_id), one of which is set."""
+    if cart_id.startswith(USER_CART_PREFIX):
+        return None, UUID(cart_id[len(USER_CART_PREFIX):])
+    return cart_id, None
+
+
+def _chunks(rows: list, size: int) -> Iterator[list]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+async def _existing_variant_lines(db: AsyncSession, items: list[dict]) -> list[dict]:
+    """Drop cart_items rows whose variant (or product) has been deleted."""
+    if not items:
+        return items
+    result = await db.execute(
+        select(ProductVariant.id, ProductVariant.product_id).where(
+            ProductVariant.id == any_(bindparam(
+                "variant_ids",
+                list({item["variant_id"] for item in items}),
+                type_=ARRAY(PG_UUID(as_uuid=True)),
+            ))
+        )
+    )
+    existing = set(result.all())
+    return [item for item in items if (item["variant_id"], item["product_id"]) in existing]
+
+
+async def drop_stale_copies(carts: CartShards) -> None:
+    """
+    Delete the Redis copies of carts this process changed in Postgres
+    while Redis was unavailable. Call inside the cart breaker's guard.
+    """
+    if not _stale_redis_carts:
+        return
+    cart_ids = list(_stale_redis_carts)
+    # One pipeline per shard
+    pipelines = {}
+    for cart_id in cart_ids:
+        client = carts.for_cart(cart_id)
+        if id(client) not in pipelines:
+            pipelines[id(client)] = client.pipeline(transaction=False)
+        pipelines[id(client)].delete(cart_key(cart_id))
+    for pipeline in pipelines.values():
+        await pipeline.execute()
+    _stale_redis_carts.difference_update(cart_ids)
+    logger.info("Dropped Redis carts changed during outage", extra={"count": len(cart_ids)})
+
+
+async def persist_carts(db: AsyncSession, carts: dict[str, dict]) -> int:
+    """
+    Upsert cart documents into Postgres in bulk (caller commits).
+
+    A cart row is only replaced by a document with a higher revision, so
+    syncs running out of order, or racing a database fallback write, can
+    never move a cart backwards. Lines for variants deleted since they were
+    added are left out (the cart API drops them from responses anyway), so
+    they cannot fail the whole batch on the foreign key.
+
+    Args:
+        db: Database session
+        carts: Cart documents by cart ID
+
+    Returns:
+        Number of carts written
+    """
+    rows = {"session_id": [], "user_id": []}
+    for cart_id, cart_dict in carts.items():
+        session_id, user_id = cart_owner(cart_id)
+        rows["session_id" if session_id else "user_id"].append({
+            "id": uuid.uuid4(),
+            "session_id": session_id,
+            "user_id": user_id,
+            "revision": cart_dict.get("rev", 0),
+        })
+
+    # Cart ID -> carts.id of the rows actually written
+    written: dict[str, UUID] = {}
+    for owner_column, owner_rows in rows.items():
+        if not owner_rows:
+            continue
+        stmt = pg_insert(Cart).values(owner_rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[getattr(Cart, owner_column)],
+            set_={"revision": stmt.excluded.revision, "updated_at": func.now()},
+            where=Cart.revision < stmt.excluded.revision,
+        ).returning(Cart.id, Cart.session_id, Cart.user_id)
+        for row_id, session_id, user_id in (await db.execute(stmt)).all():
+            written[session_id or user_cart_id(user_id)] = row_id
+    if not written:
+        return 0
+
+    await db.execute(delete(CartItem).where(CartItem.cart_id.in_(written.values())))
+    items = [
+        {
+            "id": UUID(item["id"]),
+            "cart_id": row_id,
+            "product_id": UUID(item["product_id"]),
+            "variant_id": UUID(item["variant_id"]),
+            "quantity": item["quantity"],
+            "unit_price": Decimal(str(item["unit_price"])),
+        }
+        for cart_id, row_id in written.items()
+        for item in carts[cart_id].get("items", [])
+    ]
+    items = await _existing_variant_lines(db, items)
+    for chunk in _chunks(items, ITEM_INSERT_CHUNK):
+        await db.execute(insert(CartItem).values(chunk))
+
+    return len(written)
+
+
+async def delete_idle_carts(db: AsyncSession, idle_before: datetime, limit: int) -> int:
+    """
+    Delete anonymous carts unchanged since idle_before (caller commits).
+
+    User carts are kept. idle_before should be older than
+    settings.cart_cache_ttl_seconds, so the Redis copies are long gone.
+
+    Returns:
+        Number of carts deleted (at most limit)
+    """
+    batch = (
+        select(Cart.id)
+        .where(Cart.session_id.isnot(None), Cart.updated_at < idle_before)
+        .limit(limit)
+    )
+    result = await db.execute(delete(Cart).where(Cart.id.in_(batch.scalar_subquery())))
+    return result.rowcount
+
+
+class CartStore:
+    """Load and save cart documents by cart ID."""
+
+    def __init__(self, db: AsyncSession, carts: CartShards):
+        self.db = db
+        self.carts = carts
+        self.breaker = RedisManager.get_breaker("cart")
+
+    def _fallback(self, operation: str, cart_id: str, error: Exception) -> None:
+        CART_STORE_FALLBACKS.labels(operation=operation).inc()
+        logger.debug(
+            "Cart served from database",
+            extra={"operation": operation, "cart_id": cart_id, "error": str(error)},
+        )
+
+    async def merge(
+        self,
+        session_id: str,
+        user_id: UUID,
+        prepare: Callable[[list[dict]], Awaitable[Callable[[dict], dict]]],
+    ) -> dict:
+        """
+        Move a session's cart lines into a user's cart (on login).
+
+        ``prepare`` is called with the lines to move before anything is
+        written (e.g. to look up stock) and returns the modifier adding them
+        to the user's cart. The move never loses or duplicates a line:
+
+            1. the lines are added to the user's cart, and their IDs recorded
+               under merged_key(session_id), in one transaction on the user
+               cart's shard (WATCH on both keys, so concurrent logins of the
+               same session cannot both add them)
+            2. the session cart is emptied in one transaction on its shard,
+               unless lines not merged yet were added meanwhile, in which
+               case those are moved first
+
+        The cart shards may differ, so the two steps are separate
+        transactions; a merge interrupted between them is completed by the
+        next one, which only moves lines not recorded as merged. Without
+        Redis both carts are changed in one database savepoint instead.
+
+        Returns:
+            The user's cart document
+        """
+        try:
+            async with self.breaker.guard():
+                await drop_stale_copies(self.carts)
+                return await self._redis_merge(session_id, user_id, prepare)
+        except REDIS_UNAVAILABLE as e:
+            self._fallback("merge", session_id, e)
+            return await self._db_merge(session_id, user_id, prepare)
+
+    async def load(self, cart_id: str) -> Optional[dict]:
+        """Get a cart document, or None if there is none."""
+        try:
+            async with self.breaker.guard():
+                await drop_stale_copies(self.carts)
+                cart_data = await self.carts.for_cart(cart_id).get(cart_key(cart_id))
+        except REDIS_UNAVAILABLE as e:
+            self._fallback("load", cart_id, e)
+            return await self._db_load(cart_id)
+
+        record_cache_lookup("cart", hit=cart_data is not None)
+        if cart_data == NO_CART:
+            return None
+        if cart_data:
+            cart_dict = decode_cart(cart_data)
+            if is_legacy(cart_data):
+                await self._reencode(cart_id, cart_data, cart_dict)
+            return cart_dict
+
+        cart_dict = await self._db_load(cart_id)
+        await self._rehydrate(cart_id, cart_dict)
+        return cart_dict
+
+    async def save(self, cart_id: str, cart_dict: dict) -> None:
+        """Replace a cart document."""
+        await self.update(cart_id, lambda _: dict(cart_dict))
+
+    async def update(
+        self,
+        cart_id: str,
+        modifier_fn: Callable[[dict], dict],
+        user_id: Optional[UUID] = None,
+    ) -> dict:
+        """
+        Atomically update cart using Redis WATCH/MULTI/EXEC pattern.
+
+        This prevents lost updates when multiple requests modify the same cart
+        concurrently. If the cart is modified between WATCH and EXEC, the
+        transaction is retried. In the database fallback the cart row is
+        locked with SELECT ... FOR UPDATE instead, and the change is flushed
+        in a savepoint of the caller's transaction: the caller commits. The
+        cart's Redis copy is then stale and is deleted once Redis is back.
+
+        Args:
+            cart_id: Session ID or user cart ID
+            modifier_fn: A function that takes the current cart dict and returns modified cart dict
+            user_id: Optional user ID to associate with the cart
+
+        Returns:
+            The modified cart dictionary
+
+        Raises:
+            RuntimeError: If max retries exceeded
+        """
+        try:
+            async with self.breaker.guard():
+                await drop_stale_copies(self.carts)
+                return await self._redis_update(cart_id, modifier_fn, user_id)
+        except REDIS_UNAVAILABLE as e:
+            self._fallback("update", cart_id, e)
+            return await self._db_update(cart_id, modifier_fn, user_id)
+
+    async def delete(self, cart_id: str) -> None:
+        """Empty a cart.
+
+        The emptied document is written like any other change, so the sync
+        empties the Postgres copy too and a stale copy can never come back.
+        """
+
+        def clear_modifier(cart_dict: dict) -> dict:
+            cart_dict["items"] = []
+            return cart_dict
+
+        await self.update(cart_id, clear_modifier)
+
+    async def warm(self, changed_since: datetime, batch_size: int = 500) -> int:
+        """
+        Copy non-empty carts changed since a time from Postgres into Redis.
+
+        Used after Redis lost its data (restart, failover, eviction) so
+        active carts do not all miss at once. Carts already in Redis are
+        left alone.
+
+        Returns:
+            Number of carts written to Redis
+        """
+        warmed = 0
+        last_id: Optional[UUID] = None
+        while True:
+            query = (
+                select(Cart)
+                .options(selectinload(Cart.items))
+                .where(Cart.updated_at >= changed_since)
+                .order_by(Cart.id)
+                .limit(batch_size)
+            )
+            if last_id is not None:
+                query = query.where(Cart.id > last_id)
+            carts = (await self.db.execute(query)).scalars().all()
+            if not carts:
+                return warmed
+            last_id = carts[-1].id
+
+            # One pipeline per shard
+            pipelines = {}
+            for cart in carts:
+                if not cart.items:
+                    continue
+                cart_id = user_cart_id(cart.user_id) if cart.user_id else cart.session_id
+                client = self.carts.for_cart(cart_id)
+                if id(client) not in pipelines:
+                    pipelines[id(client)] = client.pipeline(transaction=False)
+                pipelines[id(client)].set(
+                    cart_key(cart_id),
+                    encode_cart(self._cart_to_dict(cart)),
+                    ex=settings.cart_cache_ttl_seconds,
+                    nx=True,
+                )
+            async with self.breaker.guard():
+                for pipeline in pipelines.values():
+                    warmed += sum(1 for written in await pipeline.execute() if written)
+
+            # Loaded carts are not needed again
+            self.db.expunge_all()
+
+    async def _reencode(self, cart_id: str, cart_data: bytes, cart_dict: dict) -> None:
+        """Rewrite a JSON cart in the binary encoding (unless written meanwhile)."""
+        client = self.carts.for_cart(cart_id)
+        try:
+            async with self.breaker.guard():
+                await client.eval(
+                    COMPARE_AND_SET_SCRIPT, 1, cart_key(cart_id), cart_data, encode_cart(cart_dict)
+                )
+        except REDIS_UNAVAILABLE as e:
+            self._fallback("reencode", cart_id, e)
+
+    async def _rehydrate(self, cart_id: str, cart_dict: Optional[dict]) -> None:
+        """
+        Put a cart loaded from Postgres back into Redis (unless written
+        meanwhile), or NO_CART, briefly, if Postgres has none either.
+        """
+        if cart_dict is None:
+            value, ttl = NO_CART, settings.cart_missing_ttl_seconds
+        else:
+            value, ttl = encode_cart(cart_dict), settings.cart_cache_ttl_seconds
+        try:
+            async with self.breaker.guard():
+                await self.carts.for_cart(cart_id).set(cart_key(cart_id), value, ex=ttl, nx=True)
+        except REDIS_UNAVAILABLE as e:
+            self._fallback("rehydrate", cart_id, e)
+
+    async def _redis_update(
+        self,
+        cart_id: str,
+        modifier_fn: Callable[[dict], dict],
+        user_id: Optional[UUID],
+    ) -> dict:
+        for attempt in range(MAX_RETRIES):
+            try:
+                return await self._update_once(cart_id, modifier_fn, user_id)
+            except WatchError:
+                # Cart was modified by another request, retry
+                if attempt == MAX_RETRIES - 1:
+                    raise RuntimeError(
+                        f"Failed to update cart after {MAX_RETRIES} attempts due to concurrent modifications"
+                    )
+                continue
+
+        # Should not reach here, but just in case
+        raise RuntimeError("Unexpected error in atomic cart update")
+
+    async def _update_once(
+        self,
+        cart_id: str,
+        modifier_fn: Callable[[dict], dict],
+        user_id: Optional[UUID],
+        merged: Optional[tuple[str, list[str]]] = None,
+    ) -> dict:
+        """
+        One WATCH/MULTI/EXEC attempt at a cart update.
+
+        With ``merged`` (merged key, session line IDs) the line IDs are
+        recorded as merged in the same transaction, and the attempt fails if
+        any of them already is.
+
+        Raises:
+            WatchError: If the cart (or merged key) changed meanwhile
+        """
+        key = cart_key(cart_id)
+        async with self.carts.for_cart(cart_id).pipeline(transaction=True) as pipe:
+            # Watch the cart key (and merged lines) for changes
+            await pipe.watch(key, *([merged[0]] if merged else []))
+            if merged and any(await pipe.smismember(*merged)):
+                raise WatchError("Session lines merged concurrently")
+
+            # Get current cart data through watched pipeline
+            cart_data = await pipe.get(key)
+            if cart_data and cart_data != NO_CART:
+                cart_dict = decode_cart(cart_data)
+            else:
+                # Expired, evicted or not created yet: continue from the Postgres copy
+                cart_dict = await self._db_load(cart_id) or {
+                    "items": [],
+                    "user_id": str(user_id) if user_id else None,
+                }
+            revision = cart_dict.get("rev", 0)
+
+            # Apply modification function
+            modified_cart = modifier_fn(cart_dict)
+            modified_cart["rev"] = revision + 1
+
+            # Update user_id if provided
+            if user_id:
+                modified_cart["user_id"] = str(user_id)
+
+            # Start transaction
+            pipe.multi()
+
+            # Set the modified cart and mark it for the sync atomically
+            pipe.setex(key, settings.cart_cache_ttl_seconds, encode_cart(modified_cart))
+            pipe.sadd(DIRTY_CARTS_KEY, cart_id)
+            if merged:
+                pipe.sadd(merged[0], *merged[1])
+                pipe.expire(merged[0], SESSION_COOKIE_MAX_AGE)
+
+            # Execute transaction
+            await pipe.execute()
+
+            return modified_cart
+
+    async def _redis_merge(
+        self,
+        session_id: str,
+        user_id: UUID,
+        prepare: Callable[[list[dict]], Awaitable[Callable[[dict], dict]]],
+    ) -> dict:
+        cart_id = user_cart_id(user_id)
+        # Written with the user's cart, so it lives on that cart's shard
+        lines_key = merged_key(session_id)
+        user_client = self.carts.for_cart(cart_id)
+        cart_dict: Optional[dict] = None
+
+        for attempt in range(MAX_RETRIES):
+            try:
+                merged = {line.decode() for line in await user_client.smembers(lines_key)}
+                session_dict = await self._peek(session_id)
+                pending = [
+                    item for item in session_dict.get("items", []) if item["id"] not in merged
+                ]
+
+                # 1. Add the lines to the user's cart, recording them as merged
+                if pending:
+                    modifier = await prepare(pending)
+                    ids = [item["id"] for item in pending]
+                    cart_dict = await self._update_once(
+                        cart_id, modifier, user_id, merged=(lines_key, ids)
+                    )
+                    merged.update(ids)
+
+                # 2. Empty the session cart, if it holds nothing else
+                if await self._empty_merged(session_id, merged):
+                    if cart_dict is None:
+                        cart_dict = await self.load(cart_id) or {"items": [], "user_id": str(user_id)}
+                    return cart_dict
+            except WatchError:
+                continue
+
+        raise RuntimeError(
+            f"Failed to merge cart after {MAX_RETRIES} attempts due to concurrent modifications"
+        )
+
+    async def _peek(self, cart_id: str) -> dict:
+        """Read a cart document without rehydrating it (empty if there is none)."""
+        cart_data = await self.carts.for_cart(cart_id).get(cart_key(cart_id))
+        if cart_data and cart_data != NO_CART:
+            return decode_cart(cart_data)
+        return await self._db_load(cart_id) or {"items": []}
+
+    async def _empty_merged(self, session_id: str, merged: Iterable[str]) -> bool:
+        """
+        Empty a session cart whose lines have all been merged.
+
+        Returns:
+            False if it holds lines not merged yet (nothing is changed)
+
+        Raises:
+            WatchError: If the cart changed meanwhile
+        """
+        key = cart_key(session_id)
+        merged = set(merged)
+        async with self.carts.for_cart(session_id).pipeline(transaction=True) as pipe:
+            await pipe.watch(key)
+            cart_data = await pipe.get(key)
+            if cart_data and cart_data != NO_CART:
+                cart_dict = decode_cart(cart_data)
+            else:
+                cart_dict = await self._db_load(session_id)
+            if cart_dict is None:
+                return True
+            items = cart_dict.get("items", [])
+            if any(item["id"] not in merged for item in items):
+                return False
+            if not items:
+                return True
+
+            # Written like any other change, so the sync empties the Postgres copy too
+            pipe.multi()
+            pipe.setex(
+                key,
+                settings.cart_cache_ttl_seconds,
+                encode_cart({"items": [], "user_id": None, "rev": cart_dict.get("rev", 0) + 1}),
+            )
+            pipe.sadd(DIRTY_CARTS_KEY, session_id)
+            await pipe.execute()
+            return True
+
+    async def _db_merge(
+        self,
+        session_id: str,
+        user_id: UUID,
+        prepare: Callable[[list[dict]], Awaitable[Callable[[dict], dict]]],
+    ) -> dict:
+        async with self.db.begin_nested():
+            session_cart = await self._db_get_cart(session_id, for_update=True)
+            items = self._cart_to_dict(session_cart)["items"] if session_cart else []
+            if not items:
+                return await self._db_load(user_cart_id(user_id)) or {
+                    "items": [], "user_id": str(user_id)
+                }
+            modifier = await prepare(items)
+            cart_dict = await self._db_update(user_cart_id(user_id), modifier, user_id)
+
+            def clear_modifier(cart_dict: dict) -> dict:
+                cart_dict["items"] = []
+                return cart_dict
+
+            await self._db_update(session_id, clear_modifier, None)
+        return cart_dict
+
+    async def _db_get_cart(self, cart_id: str, for_update: bool = False) -> Optional[Cart]:
+        session_id, user_id = cart_owner(cart_id)
+        query = (
+            select(Cart)
+            .options(selectinload(Cart.items))
+            .where(Cart.user_id == user_id if user_id else Cart.session_id == session_id)
+        )
+        if for_update:
+            query = query.with_for_update(of=Cart)
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    def _cart_to_dict(cart: Cart) -> dict:
+        return {
+            "items": [
+                {
+                    "id": str(item.id),
+                    "product_id": str(item.product_id),
+                    "variant_id": str(item.variant_id),
+                    "quantity": item.quantity,
+                    "unit_price": str(item.unit_price),
+                }
+                for item in sorted(cart.items, key=lambda item: item.created_at)
+            ],
+            "user_id": str(cart.user_id) if cart.user_id else None,
+            "rev": cart.revision,
+        }
+
+    async def _db_load(self, cart_id: str) -> Optional[dict]:
+        cart = await self._db_get_cart(cart_id)
+        return self._cart_to_dict(cart) if cart else None
+
+    async def _db_update(
+        self,
+        cart_id: str,
+        modifier_fn: Callable[[dict], dict],
+        user_id: Optional[UUID],
+    ) -> dict:
+        # The caller owns the transaction (and commits): the write runs in a
+        # savepoint, so a failure here only undoes this cart change
+        async with self.db.begin_nested():
+            cart = await self._db_get_cart(cart_id, for_update=True)
+            if cart:
+                cart_dict = self._cart_to_dict(cart)
+            else:
+                cart_dict = {"items": [], "user_id": None, "rev": 0}
+            revision = cart_dict["rev"]
+
+            modified_cart = modifier_fn(cart_dict)
+            modified_cart["rev"] = revision + 1
+
+            if user_id:
+                modified_cart["user_id"] = str(user_id)
+
+            if cart is None:
+                session_id, owner_id = cart_owner(cart_id)
+                cart = Cart(session_id=session_id, user_id=owner_id, items=[])
+                self.db.add(cart)
+
+            cart.revision = modified_cart["rev"]
+            rows = await _existing_variant_lines(self.db, [
+                {
+                    "id": UUID(item["id"]),
+                    "product_id": UUID(item["product_id"]),
+                    "variant_id": UUID(item["variant_id"]),
+                    "quantity": item["quantity"],
+                    "unit_price": Decimal(str(item["unit_price"])),
+                }
+                for item in modified_cart.get("items", [])
+            ])
+            cart.items = [CartItem(**row) for row in rows]
+            await self.db.flush()
+        # Written even if the caller rolls back: the copy is then merely
+        # rehydrated from Postgres again
+        _stale_redis_carts.add(cart_id)
+        return modified_cart
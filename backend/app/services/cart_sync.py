@@ -0,0 +1,156 @@
+"""Write-behind sync of Redis carts to Postgres.
+
+Each API worker runs a CartSyncWorker in the background. Every
+settings.cart_sync_interval_seconds it pops up to
+settings.cart_sync_batch_size cart IDs from each cart shard's dirty set
+(SPOP, so workers never sync the same cart concurrently), reads the carts
+with one MGET and upserts them in a single transaction (see
+persist_carts). If the database write fails the cart IDs are put back
+in the dirty set for the next round. A batch the database rejects (rather
+than fails to reach) is retried cart by cart instead, each in its own
+savepoint, and a cart that still fails is logged and not requeued, so one
+bad cart cannot hold back every batch it is drawn into; its next change
+marks it dirty again. Before each batch, the Redis copies of carts this
+process changed in Postgres during an outage are deleted
+(drop_stale_copies), so they are never synced over those changes. While
+a backlog remains, rounds run back to back instead of waiting for the
+interval.
+
+On shutdown the worker drains the dirty sets so recent changes are not
+left only in Redis.
+"""
+import asyncio
+from typing import Optional
+
+import redis.asyncio as redis
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import CART_SYNC_CARTS
+from app.core.redis import REDIS_UNAVAILABLE, CartShards, RedisManager
+from app.db.base import async_session_maker
+from app.services.cart_codec import decode_cart
+from app.services.cart_store import (
+    DIRTY_CARTS_KEY, NO_CART, cart_key, drop_stale_copies, persist_carts,
+)
+
+logger = get_logger(__name__)
+
+
+class CartSyncWorker:
+    """Background task copying dirty carts from Redis to Postgres."""
+
+    def __init__(
+        self,
+        interval: float = settings.cart_sync_interval_seconds,
+        batch_size: int = settings.cart_sync_batch_size,
+    ) -> None:
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    async def sync_shard(self, client: redis.Redis, shards: CartShards) -> int:
+        """
+        Sync one batch of dirty carts from a shard.
+
+        Returns:
+            Number of cart IDs taken from the dirty set
+        """
+        breaker = RedisManager.get_breaker("cart")
+        async with breaker.guard():
+            # A stale copy must not be synced over a change made during an outage
+            await drop_stale_copies(shards)
+            popped = await client.spop(DIRTY_CARTS_KEY, self.batch_size)
+            if not popped:
+                return 0
+            cart_ids = [cart_id.decode() for cart_id in popped]
+            documents = await client.mget([cart_key(cart_id) for cart_id in cart_ids])
+
+        # Carts that expired before being synced have nothing newer to write
+        carts = {
+            cart_id: decode_cart(document)
+            for cart_id, document in zip(cart_ids, documents)
+            if document and document != NO_CART
+        }
+
+        try:
+            try:
+                async with async_session_maker() as db:
+                    written = await persist_carts(db, carts)
+                    await db.commit()
+            except (IntegrityError, DataError):
+                written = await self._persist_each(carts)
+        except Exception:
+            try:
+                async with breaker.guard():
+                    await client.sadd(DIRTY_CARTS_KEY, *cart_ids)
+            except REDIS_UNAVAILABLE as e:
+                logger.error(
+                    "Cart sync could not requeue carts",
+                    extra={"count": len(cart_ids), "error": str(e)},
+                )
+            raise
+
+        CART_SYNC_CARTS.inc(written)
+        logger.debug(
+            "Carts synced",
+            extra={"dirty": len(cart_ids), "found": len(carts), "written": written},
+        )
+        return len(cart_ids)
+
+    async def _persist_each(self, carts: dict[str, dict]) -> int:
+        """Persist carts one by one, skipping those the database rejects."""
+        written = 0
+        async with async_session_maker() as db:
+            for cart_id, cart_dict in carts.items():
+                try:
+                    async with db.begin_nested():
+                        written += await persist_carts(db, {cart_id: cart_dict})
+                except (IntegrityError, DataError) as e:
+                    logger.error(
+                        "Cart sync rejected cart",
+                        extra={"cart_id": cart_id, "error": str(e)},
+                    )
+            await db.commit()
+        return written
+
+    async def sync_once(self) -> bool:
+        """Sync one batch from every shard; True if a backlog remains."""
+        backlog = False
+        shards = await RedisManager.get_cart_shards()
+        for client in shards.clients:
+            try:
+                backlog |= await self.sync_shard(client, shards) >= self.batch_size
+            except REDIS_UNAVAILABLE:
+                # Carts are being written to Postgres directly meanwhile
+                continue
+            except Exception as e:
+                logger.warning("Cart sync failed", extra={"error": str(e)})
+        return backlog
+
+    async def _run(self) -> None:
+        while True:
+            if not await self.sync_once():
+                await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start syncing in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="cart-sync")
+
+    async def stop(self) -> None:
+        """Stop the background task and flush what is still dirty."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        while await self.sync_once():
+            pass
+
+
+cart_sync_worker = CartSyncWorker()
@@ -1,15 +1,25 @@
 """Event service - business logic for clickstream events."""
 from uuid import UUID
-from datetime import datetime, timezone
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional, Sequence
 
-from sqlalchemy import select, and_
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import RowMapping, select, and_, tuple_, update
+from sqlalchemy.dialects.postgresql import distinct_on, insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from app.core.metrics import EVENTS_INGESTED
+from app.core.session import SESSION_COOKIE_MAX_AGE
 from app.models.event import Event, SessionUserMapping
 from app.schemas.event import EventCreate, EventBatchCreate, EventBatchResponse
 
+# (event_time, id) of an event: the position of a keyset page
+EventCursor = tuple[datetime, UUID]
+
+# Events per export query, and rows fetched per round trip within it
+EXPORT_BATCH_SIZE = 5000
+EXPORT_FETCH_SIZE = 500
+
 
 class EventService:
     """Service for clickstream event operations."""
@@ -70,6 +80,10 @@ class EventService:
         if created > 0:
             await self.db.commit()
 
+        EVENTS_INGESTED.labels(result="created").inc(created)
+        EVENTS_INGESTED.labels(result="duplicate").inc(duplicates)
+        EVENTS_INGESTED.labels(result="error").inc(errors)
+
         # Create identity linking if user is authenticated
         if user_id and session_ids:
             await self._link_sessions_to_user(session_ids, user_id)
@@ -87,8 +101,6 @@ class EventService:
     ) -> None:
         """
         Create session-user mappings for identity linking.
-
-        Also updates existing events from these sessions with the user_id.
         """
         now = datetime.now(timezone.utc)
 
@@ -114,21 +126,60 @@ class EventService:
 
         await self.db.commit()
 
-        # Update historical events from these sessions with user_id
-        # This links past anonymous events to the now-authenticated user
-        for session_id in session_ids:
-            await self.db.execute(
-                Event.__table__.update()
-                .where(
-                    and_(
-                        Event.session_id == session_id,
-                        Event.user_id.is_(None),
-                    )
-                )
-                .values(user_id=user_id)
-            )
+    async def backfill_identity_links(self, batch_size: int) -> int:
+        """
+        Attach user_id to anonymous events of sessions linked to a user.
+
+        This links past anonymous events to the now-authenticated user. It
+        runs as a background task (app.tasks.identity) rather than at login,
+        and also picks up events sent anonymously after the link was made.
+        A session linked to several users is attributed to the first one.
+
+        Only sessions linked within the session cookie's lifetime are
+        looked at: an older session can no longer send events, so its
+        events were backfilled by an earlier run.
+
+        Updates at most batch_size events and commits.
 
+        Returns:
+            Number of events updated
+        """
+        linked_since = datetime.now(timezone.utc) - timedelta(seconds=SESSION_COOKIE_MAX_AGE)
+        # Recently linked sessions that still have anonymous events
+        recent = aliased(SessionUserMapping)
+        sessions = (
+            select(recent.session_id)
+            .where(recent.linked_at >= linked_since)
+            .where(
+                select(Event.id)
+                .where(Event.session_id == recent.session_id)
+                .where(Event.user_id.is_(None))
+                .exists()
+            )
+            .limit(batch_size)
+        )
+        first_link = (
+            select(SessionUserMapping.session_id, SessionUserMapping.user_id)
+            .ext(distinct_on(SessionUserMapping.session_id))
+            .where(SessionUserMapping.session_id.in_(sessions))
+            .order_by(SessionUserMapping.session_id, SessionUserMapping.linked_at)
+            .cte("first_link")
+        )
+        batch = (
+            select(Event.id)
+            .join(first_link, first_link.c.session_id == Event.session_id)
+            .where(Event.user_id.is_(None))
+            .limit(batch_size)
+        )
+        result = await self.db.execute(
+            update(Event)
+            .where(Event.id.in_(batch.scalar_subquery()))
+            .where(Event.session_id == first_link.c.session_id)
+            .values(user_id=first_link.c.user_id)
+            .execution_options(synchronize_session=False)
+        )
         await self.db.commit()
+        return result.rowcount
 
     async def link_session_to_user(
         self,
@@ -138,7 +189,8 @@ class EventService:
         """
         Link a session to a user (called on login/register).
 
-        Creates the session-user mapping and updates historical events.
+        Creates the session-user mapping; the session's historical events
+        are updated by backfill_identity_links.
         """
         await self._link_sessions_to_user({session_id}, user_id)
 
@@ -146,16 +198,22 @@ class EventService:
         self,
         user_id: UUID,
         limit: int = 100,
-        offset: int = 0,
+        before: Optional[EventCursor] = None,
     ) -> list[Event]:
-        """Get events for a specific user."""
+        """
+        Get a user's events, newest first.
+
+        Pages are keyset-paginated: pass the (event_time, id) of the last
+        event of a page as ``before`` to get the next one.
+        """
         query = (
             select(Event)
             .where(Event.user_id == user_id)
-            .order_by(Event.event_time.desc())
+            .order_by(Event.event_time.desc(), Event.id.desc())
             .limit(limit)
-            .offset(offset)
         )
+        if before is not None:
+            query = query.where(tuple_(Event.event_time, Event.id) < before)
         result = await self.db.execute(query)
         return list(result.scalars().all())
 
@@ -163,15 +221,62 @@ class EventService:
         self,
         session_id: str,
         limit: int = 100,
-        offset: int = 0,
+        before: Optional[EventCursor] = None,
     ) -> list[Event]:
-        """Get events for a specific session."""
+        """Get a session's events, newest first (paged like get_user_events)."""
         query = (
             select(Event)
             .where(Event.session_id == session_id)
-            .order_by(Event.event_time.desc())
+            .order_by(Event.event_time.desc(), Event.id.desc())
             .limit(limit)
-            .offset(offset)
         )
+        if before is not None:
+            query = query.where(tuple_(Event.event_time, Event.id) < before)
         result = await self.db.execute(query)
         return list(result.scalars().all())
+
+    async def stream_user_events(
+        self,
+        user_id: UUID,
+        after: Optional[EventCursor] = None,
+    ) -> AsyncIterator[Sequence[RowMapping]]:
+        """
+        Stream a user's full event history, oldest first, in batches of rows.
+
+        The history is read in keyset pages of EXPORT_BATCH_SIZE events,
+        each an index range scan on (user_id, event_time, id) read through
+        a server-side cursor, so memory stays constant however long the
+        history is. An interrupted export resumes from the (event_time, id)
+        of the last event received, passed as ``after``.
+        """
+        columns = [
+            Event.id,
+            Event.event_id,
+            Event.event_name,
+            Event.session_id,
+            Event.user_id,
+            Event.event_time,
+            Event.traffic_source,
+            Event.page,
+            Event.referrer,
+            Event.event_metadata,
+        ]
+        while True:
+            query = (
+                select(*columns)
+                .where(Event.user_id == user_id)
+                .order_by(Event.event_time, Event.id)
+                .limit(EXPORT_BATCH_SIZE)
+                .execution_options(yield_per=EXPORT_FETCH_SIZE)
+            )
+            if after is not None:
+                query = query.where(tuple_(Event.event_time, Event.id) > after)
+
+            result = await self.db.stream(query)
+            count = 0
+            async for batch in result.mappings().partitions():
+                yield batch
+                count += len(batch)
+                after = (batch[-1]["event_time"], batch[-1]["id"])
+            if count < EXPORT_BATCH_SIZE:
+                return
@@ -0,0 +1,138 @@
+"""Redis fast path for idempotent requests.
+
+A request carrying an idempotency key first claims the key with SET NX,
+storing an in-flight marker that expires after
+settings.idempotency_lock_seconds (so a crashed worker cannot hold a key
+forever). The owner does the work, then replaces the marker with the
+serialized response, kept for settings.idempotency_ttl_seconds. If the
+work fails the marker is removed so the client can retry.
+
+A duplicate arriving while the key is in flight polls until the response
+is stored (and replays it) or the marker is gone (and claims the key
+itself). After settings.idempotency_wait_seconds it gives up with a
+ConflictError. A completed key is replayed straight from Redis.
+
+If Redis is unavailable the claim is untracked and callers fall back to
+their database check and unique constraints.
+"""
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.exceptions import ConflictError
+from app.core.logging import get_logger
+from app.core.redis import REDIS_UNAVAILABLE, RedisManager
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "idempotency:"
+IN_FLIGHT_PREFIX = "in-flight:"
+DONE_PREFIX = "done:"
+
+# Swap our own marker for the response. Does nothing if the marker expired
+# and another request has claimed the key since.
+COMPLETE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+# Remove our own marker, and only ours
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass
+class IdempotencyClaim:
+    """Result of claiming a key: owned (marker set), replayed (response set), or untracked."""
+    key: str
+    marker: Optional[str] = None
+    response: Optional[str] = None
+
+
+class IdempotencyStore:
+    """In-flight markers and stored responses for idempotency keys."""
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+        self.breaker = RedisManager.get_breaker("cache")
+        self._complete = client.register_script(COMPLETE_SCRIPT)
+        self._release = client.register_script(RELEASE_SCRIPT)
+
+    async def claim(self, scope: str, idempotency_key: str) -> IdempotencyClaim:
+        """
+        Claim a key, waiting for a concurrent request holding it to finish.
+
+        Raises:
+            ConflictError: If the key is still in flight after the wait
+        """
+        key = f"{KEY_PREFIX}{scope}:{idempotency_key}"
+        marker = f"{IN_FLIGHT_PREFIX}{uuid.uuid4().hex}"
+        deadline = time.monotonic() + settings.idempotency_wait_seconds
+
+        while True:
+            try:
+                async with self.breaker.guard():
+                    if await self.client.set(
+                        key, marker, nx=True, ex=settings.idempotency_lock_seconds
+                    ):
+                        return IdempotencyClaim(key, marker=marker)
+                    value = await self.client.get(key)
+            except REDIS_UNAVAILABLE as e:
+                logger.debug(
+                    "Idempotency key untracked",
+                    extra={"key": key, "error": str(e)},
+                )
+                return IdempotencyClaim(key)
+
+            if value is not None and value.startswith(DONE_PREFIX):
+                return IdempotencyClaim(key, response=value[len(DONE_PREFIX):])
+            if value is not None and time.monotonic() >= deadline:
+                raise ConflictError(
+                    "A request with this idempotency key is still being processed",
+                    "idempotency_key",
+                )
+            # In flight elsewhere: check again shortly (or claim it if it just went)
+            if value is not None:
+                await asyncio.sleep(settings.idempotency_poll_seconds)
+
+    async def complete(self, claim: IdempotencyClaim, response: str) -> None:
+        """Store the response for an owned claim, to be replayed to duplicates."""
+        if claim.marker is None:
+            return
+        try:
+            async with self.breaker.guard():
+                await self._complete(
+                    keys=[claim.key],
+                    args=[claim.marker, DONE_PREFIX + response, settings.idempotency_ttl_seconds],
+                )
+        except REDIS_UNAVAILABLE as e:
+            # Duplicates wait out the marker, then find the result in the database
+            logger.warning(
+                "Idempotent response not stored",
+                extra={"key": claim.key, "error": str(e)},
+            )
+
+    async def release(self, claim: IdempotencyClaim) -> None:
+        """Give up an owned claim so the request can be retried."""
+        if claim.marker is None:
+            return
+        try:
+            async with self.breaker.guard():
+                await self._release(keys=[claim.key], args=[claim.marker])
+        except REDIS_UNAVAILABLE as e:
+            logger.warning(
+                "Idempotency key not released",
+                extra={"key": claim.key, "error": str(e)},
+            )
@@ -0,0 +1,135 @@
+"""Inventory service - stock bookkeeping shared by checkout and admin."""
+from typing import Iterable, Sequence
+from uuid import UUID
+
+from sqlalchemy import Integer, Row, String, any_, bindparam, distinct, func, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, aggregate_order_by, array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Product, ProductVariant
+from app.services.outbox import STOCK_CHANGED, enqueue
+
+
+class InventoryService:
+    """Service for stock-related operations."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def refresh_stock_summary(self, product_ids: Iterable[UUID]) -> None:
+        """
+        Recompute the denormalized stock summary for the given products.
+
+        Updates Product.in_stock and Product.available_sizes from the current
+        variant rows in a single set-based UPDATE. Must be called in the same
+        transaction as any change to variant stock, size or existence
+        (pending ORM changes are flushed first). The caller commits.
+
+        Each product's new summary is also added to the outbox as an
+        inventory.stock_changed event, for stock caches and other consumers.
+        """
+        ids = list(set(product_ids))
+        if not ids:
+            return
+
+        await self.db.flush()
+
+        in_stock_variant = ProductVariant.stock > 0
+        summary = (
+            select(
+                Product.id.label("product_id"),
+                func.coalesce(func.bool_or(in_stock_variant), False).label("in_stock"),
+                func.coalesce(
+                    func.array_agg(
+                        aggregate_order_by(distinct(ProductVariant.size), ProductVariant.size)
+                    ).filter(in_stock_variant),
+                    array([], type_=String),
+                ).label("available_sizes"),
+            )
+            .outerjoin(ProductVariant, ProductVariant.product_id == Product.id)
+            .where(Product.id.in_(ids))
+            .group_by(Product.id)
+            .subquery()
+        )
+
+        result = await self.db.execute(
+            update(Product)
+            .where(Product.id == summary.c.product_id)
+            .values(
+                in_stock=summary.c.in_stock,
+                available_sizes=summary.c.available_sizes,
+            )
+            .returning(Product.id, Product.in_stock, Product.available_sizes)
+            .execution_options(synchronize_session=False)
+        )
+        for product_id, in_stock, available_sizes in result:
+            enqueue(self.db, STOCK_CHANGED, {
+                "product_id": str(product_id),
+                "in_stock": in_stock,
+                "available_sizes": list(available_sizes),
+            })
+
+    async def lock_variants(
+        self, variant_ids: Sequence[UUID] = (), skus: Sequence[str] = ()
+    ) -> list[Row]:
+        """
+        Lock variants by ID or SKU for a stock change.
+
+        Rows are locked in ID order, the same order checkout locks them in,
+        so bulk changes and checkouts cannot deadlock.
+
+        Returns:
+            (id, sku, product_id, stock) rows
+        """
+        conditions = []
+        if variant_ids:
+            conditions.append(
+                ProductVariant.id == any_(
+                    bindparam("variant_ids", list(variant_ids), type_=ARRAY(PG_UUID(as_uuid=True)))
+                )
+            )
+        if skus:
+            conditions.append(
+                ProductVariant.sku == any_(bindparam("skus", list(skus), type_=ARRAY(String)))
+            )
+        if not conditions:
+            return []
+
+        result = await self.db.execute(
+            select(
+                ProductVariant.id,
+                ProductVariant.sku,
+                ProductVariant.product_id,
+                ProductVariant.stock,
+            )
+            .where(or_(*conditions))
+            .order_by(ProductVariant.id)
+            .with_for_update()
+        )
+        return list(result.all())
+
+    async def write_stock(self, levels: dict[UUID, int]) -> None:
+        """
+        Set the stock of many variants in one UPDATE and refresh their
+        products' stock summary.
+
+        The variants should be locked first (lock_variants). Each variant's
+        version is bumped, so ORM copies loaded before the change fail their
+        optimistic lock instead of overwriting it. The caller commits.
+        """
+        if not levels:
+            return
+
+        new_levels = func.unnest(
+            bindparam("level_ids", list(levels), type_=ARRAY(PG_UUID(as_uuid=True))),
+            bindparam("level_stocks", list(levels.values()), type_=ARRAY(Integer)),
+        ).table_valued("variant_id", "stock").render_derived(name="levels")
+
+        result = await self.db.execute(
+            update(ProductVariant)
+            .where(ProductVariant.id == new_levels.c.variant_id)
+            .values(stock=new_levels.c.stock, version=ProductVariant.version + 1)
+            .returning(ProductVariant.product_id)
+            .execution_options(synchronize_session=False)
+        )
+        await self.refresh_stock_summary(result.scalars().all())
@@ -1,5 +1,4 @@
 """Order service - business logic for order management."""
-import json
 import random
 import string
 from uuid import UUID
@@ -15,14 +14,24 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.transaction import atomic_transaction
 from app.models import Order, OrderItem, Product, ProductVariant, User
 from app.models.order import OrderStatus
-from app.schemas.order import OrderCreate, OrderResponse, OrderItemResponse, ShippingAddress
+from app.schemas.order import (
+    OrderCreate, OrderResponse, OrderItemResponse, OrderListResponse, ShippingAddress,
+)
 from app.core.exceptions import (
     CartEmptyError,
+    FootyException,
     NotFoundError,
     PriceChangedError,
     ValidationError,
 )
 from app.core.logging import get_logger
+from app.core.metrics import CHECKOUT_OUTCOMES
+from app.core.redis import CartShards
+from app.services.cart_service import CartService
+from app.services.cart_store import CartStore
+from app.services.idempotency import IdempotencyStore
+from app.services.inventory_service import InventoryService
+from app.services.outbox import ORDER_CREATED, enqueue, outbox_relay
 
 logger = get_logger(__name__)
 
@@ -32,19 +41,14 @@ TAX_RATE = Decimal("0.08")  # 8% tax
 SHIPPING_THRESHOLD = Decimal("100.00")  # Free shipping over $100
 SHIPPING_COST = Decimal("9.99")  # Standard shipping
 
-CART_KEY_PREFIX = "cart:"
-
 
 class OrderService:
     """Service for order operations."""
 
-    def __init__(self, db: AsyncSession, redis_client: redis.Redis):
+    def __init__(self, db: AsyncSession, carts: CartShards, cache: Optional[redis.Redis] = None):
         self.db = db
-        self.redis = redis_client
-
-    def _cart_key(self, session_id: str) -> str:
-        """Generate Redis key for cart."""
-        return f"{CART_KEY_PREFIX}{session_id}"
+        self.cart_store = CartStore(db, carts)
+        self.idempotency = IdempotencyStore(cache) if cache is not None else None
 
     def _generate_order_number(self) -> str:
         """Generate a unique order number."""
@@ -52,21 +56,10 @@ class OrderService:
         random_part = "".join(random.choices(string.ascii_uppercase + string.digits, k=6))
         return f"FT-{timestamp}-{random_part}"
 
-    async def _get_cart_items(self, session_id: str) -> list[dict]:
-        """Get cart items from Redis."""
-        cart_key = self._cart_key(session_id)
-        cart_data = await self.redis.get(cart_key)
-
-        if not cart_data:
-            return []
-
-        cart_dict = json.loads(cart_data)
-        return cart_dict.get("items", [])
-
-    async def _clear_cart(self, session_id: str) -> None:
-        """Clear cart after order creation."""
-        cart_key = self._cart_key(session_id)
-        await self.redis.delete(cart_key)
+    async def _get_cart_items(self, cart_id: str) -> list[dict]:
+        """Get cart items from the cart store."""
+        cart_dict = await self.cart_store.load(cart_id)
+        return cart_dict.get("items", []) if cart_dict else []
 
     async def _validate_and_reserve_stock(
         self, cart_items: list[dict]
@@ -114,11 +107,15 @@ class OrderService:
         return True, "", reservations
 
     async def _deduct_stock(self, reservations: list[tuple[ProductVariant, int]]) -> None:
-        """Deduct stock for reserved items."""
+        """Deduct stock for reserved items and refresh the products' stock summary."""
         for variant, quantity in reservations:
             variant.stock -= quantity
             self.db.add(variant)
 
+        await InventoryService(self.db).refresh_stock_summary(
+            variant.product_id for variant, _ in reservations
+        )
+
     async def check_idempotency(
         self, idempotency_key: str, user_id: UUID
     ) -> Optional[Order]:
@@ -147,16 +144,50 @@ class OrderService:
         Create a new order from the user's cart.
 
         Implements idempotency: if an order with the same idempotency_key exists,
-        returns that order instead of creating a duplicate.
+        returns that order instead of creating a duplicate. Submissions of the
+        same key are deduplicated in Redis first (see app.services.idempotency):
+        only one of them creates the order, the others wait for and replay its
+        response without touching the database.
         """
+        if self.idempotency is None:
+            return await self._create_order(order_data, user_id, session_id)
+
+        try:
+            claim = await self.idempotency.claim(str(user_id), order_data.idempotency_key)
+        except FootyException as e:
+            CHECKOUT_OUTCOMES.labels(outcome=e.error_code).inc()
+            raise
+        if claim.response is not None:
+            CHECKOUT_OUTCOMES.labels(outcome="replayed").inc()
+            return OrderResponse.model_validate_json(claim.response)
+
+        try:
+            order = await self._create_order(order_data, user_id, session_id)
+        except Exception:
+            await self.idempotency.release(claim)
+            raise
+
+        await self.idempotency.complete(claim, order.model_dump_json())
+        return order
+
+    async def _create_order(
+        self,
+        order_data: OrderCreate,
+        user_id: UUID,
+        session_id: str,
+    ) -> OrderResponse:
+        """Create the order, unless the database already has one for the key."""
         # Check idempotency - return existing order if found
         existing_order = await self.check_idempotency(order_data.idempotency_key, user_id)
         if existing_order:
+            CHECKOUT_OUTCOMES.labels(outcome="replayed").inc()
             return self._order_to_response(existing_order)
 
-        # Get cart items
-        cart_items = await self._get_cart_items(session_id)
+        # Get cart items (moving in any left in the session's cart first)
+        cart_id = await CartService(self.db, self.cart_store.carts).resolve_cart(session_id, user_id)
+        cart_items = await self._get_cart_items(cart_id)
         if not cart_items:
+            CHECKOUT_OUTCOMES.labels(outcome="cart_empty").inc()
             raise CartEmptyError()
 
         # Use SERIALIZABLE isolation level for the order creation transaction
@@ -178,6 +209,15 @@ class OrderService:
                 subtotal = Decimal("0.00")
                 order_items_data = []
 
+                # Variants were just loaded (and locked); fetch every product in one query
+                variants = {variant.id: variant for variant, _ in reservations}
+                product_result = await self.db.execute(
+                    select(Product).where(
+                        Product.id.in_({UUID(item["product_id"]) for item in cart_items})
+                    )
+                )
+                products = {product.id: product for product in product_result.scalars()}
+
                 for item in cart_items:
                     product_id = UUID(item["product_id"])
                     variant_id = UUID(item["variant_id"])
@@ -185,16 +225,8 @@ class OrderService:
                     unit_price = Decimal(str(item["unit_price"]))
 
                     # Get product info for snapshot
-                    product_query = (
-                        select(Product)
-                        .where(Product.id == product_id)
-                    )
-                    product_result = await self.db.execute(product_query)
-                    product = product_result.scalar_one_or_none()
-
-                    variant_query = select(ProductVariant).where(ProductVariant.id == variant_id)
-                    variant_result = await self.db.execute(variant_query)
-                    variant = variant_result.scalar_one_or_none()
+                    product = products.get(product_id)
+                    variant = variants.get(variant_id)
 
                     if not product or not variant:
                         raise NotFoundError("Product or ProductVariant", item["variant_id"])
@@ -270,6 +302,17 @@ class OrderService:
                 # Deduct stock
                 await self._deduct_stock(reservations)
 
+                # Cart clearing and other follow-ups run from the outbox once committed
+                enqueue(self.db, ORDER_CREATED, {
+                    "order_id": str(order.id),
+                    "order_number": order_number,
+                    "user_id": str(user_id),
+                    "cart_id": cart_id,
+                    "cart_item_ids": [item["id"] for item in cart_items],
+                    "item_count": sum(item["quantity"] for item in cart_items),
+                    "total": str(total),
+                })
+
                 # Transaction commits automatically on success
                 logger.info(
                     "Order created successfully",
@@ -283,6 +326,9 @@ class OrderService:
 
         except Exception as e:
             # Transaction rolls back automatically on any error
+            CHECKOUT_OUTCOMES.labels(
+                outcome=e.error_code if isinstance(e, FootyException) else "error"
+            ).inc()
             logger.error(
                 "Order creation failed, transaction rolled back",
                 extra={
@@ -293,8 +339,10 @@ class OrderService:
             )
             raise
 
-        # Clear cart after successful order (outside transaction)
-        await self._clear_cart(session_id)
+        CHECKOUT_OUTCOMES.labels(outcome="created").inc()
+
+        # Clear the cart now rather than at the relay's next interval
+        outbox_relay.wake()
 
         # Refresh to get items
         await self.db.refresh(order)
@@ -347,7 +395,7 @@ class OrderService:
         user_id: UUID,
         page: int = 1,
         page_size: int = 10,
-    ) -> dict:
+    ) -> OrderListResponse:
         """List all orders for a user with pagination."""
         # Count query
         count_query = (
@@ -373,13 +421,13 @@ class OrderService:
         result = await self.db.execute(query)
         orders = result.scalars().all()
 
-        return {
-            "items": [self._order_to_response(order) for order in orders],
-            "total": total,
-            "page": page,
-            "page_size": page_size,
-            "pages": pages,
-        }
+        return OrderListResponse(
+            items=[self._order_to_response(order) for order in orders],
+            total=total,
+            page=page,
+            page_size=page_size,
+            pages=pages,
+        )
 
     def _order_to_response(self, order: Order) -> OrderResponse:
         """Convert Order model to response schema."""
@@ -0,0 +1,207 @@
+"""Transactional outbox relay.
+
+Services record events with ``enqueue(db, topic, payload)`` in the same
+transaction as the change they describe, so an event exists if and only
+if the change was committed. Each API worker runs an OutboxRelay in the
+background. Every settings.outbox_relay_interval_seconds (or as soon as
+``wake()`` is called after a commit) it:
+
+    1. locks up to settings.outbox_relay_batch_size of the oldest messages
+       (FOR UPDATE SKIP LOCKED, so workers never take the same message),
+    2. runs the side effects registered for each message's topic in
+       HANDLERS (e.g. removing ordered items from the cart),
+    3. XADDs the message to the Redis stream ``stream:<topic>``, trimmed to
+       about settings.outbox_stream_maxlen entries,
+    4. deletes the delivered messages and commits.
+
+A message whose delivery fails stays in the table and is retried in a
+later round; after settings.outbox_max_attempts failures it is
+dead-lettered (``dead_lettered_at`` is set and it is no longer relayed)
+and logged, for someone to fix and requeue by clearing the column.
+Failures because Redis is down do not count as attempts. Delivery is at
+least once: handlers must be idempotent, and stream consumers should
+dedupe on the ``id`` field.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+import orjson
+import redis.asyncio as redis
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import OUTBOX_MESSAGES
+from app.core.redis import REDIS_UNAVAILABLE, RedisManager
+from app.db.base import async_session_maker
+from app.models import OutboxMessage
+from app.services.cart_store import CartStore
+
+logger = get_logger(__name__)
+
+STREAM_PREFIX = "stream:"
+
+# Topics
+ORDER_CREATED = "order.created"
+STOCK_CHANGED = "inventory.stock_changed"
+
+
+def enqueue(db: AsyncSession, topic: str, payload: dict[str, Any]) -> None:
+    """Add a message to the outbox; it is relayed once the transaction commits."""
+    db.add(OutboxMessage(topic=topic, payload=payload))
+
+
+async def remove_ordered_items(db: AsyncSession, payload: dict) -> None:
+    """Take the ordered lines out of the cart the order was placed from.
+
+    Only the ordered lines are removed, so items added to the cart after
+    checkout are kept (and a repeated delivery does nothing).
+    """
+    ordered = set(payload["cart_item_ids"])
+
+    def remove_modifier(cart_dict: dict) -> dict:
+        cart_dict["items"] = [
+            item for item in cart_dict.get("items", []) if item["id"] not in ordered
+        ]
+        return cart_dict
+
+    store = CartStore(db, await RedisManager.get_cart_shards())
+    await store.update(payload["cart_id"], remove_modifier)
+
+
+# Side effects run before a message is published, by topic
+HANDLERS: dict[str, list[Callable[[AsyncSession, dict], Awaitable[None]]]] = {
+    ORDER_CREATED: [remove_ordered_items],
+}
+
+
+class OutboxRelay:
+    """Background task delivering outbox messages."""
+
+    def __init__(
+        self,
+        interval: float = settings.outbox_relay_interval_seconds,
+        batch_size: int = settings.outbox_relay_batch_size,
+        max_attempts: int = settings.outbox_max_attempts,
+    ) -> None:
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    def wake(self) -> None:
+        """Relay new messages now instead of at the next interval."""
+        self._wakeup.set()
+
+    async def _publish(self, client: redis.Redis, message: OutboxMessage) -> None:
+        async with RedisManager.get_breaker("stream").guard():
+            await client.xadd(
+                STREAM_PREFIX + message.topic,
+                {
+                    "id": str(message.id),
+                    "topic": message.topic,
+                    "payload": orjson.dumps(message.payload),
+                    "created_at": message.created_at.isoformat(),
+                },
+                maxlen=settings.outbox_stream_maxlen,
+                approximate=True,
+            )
+
+    async def relay_once(self) -> int:
+        """
+        Deliver one batch of messages, those that failed least often first.
+
+        Returns:
+            Number of messages delivered
+        """
+        client = await RedisManager.get_client("stream")
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(OutboxMessage)
+                .where(OutboxMessage.dead_lettered_at.is_(None))
+                .order_by(OutboxMessage.attempts, OutboxMessage.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            messages = result.scalars().all()
+            if not messages:
+                return 0
+
+            delivered, failed = [], []
+            for message in messages:
+                try:
+                    # A failing message rolls back only its own side effects
+                    async with db.begin_nested():
+                        for handler in HANDLERS.get(message.topic, []):
+                            await handler(db, message.payload)
+                        await self._publish(client, message)
+                except REDIS_UNAVAILABLE as e:
+                    # Nothing else will get through either; retry the rest later
+                    # (not the message's fault, so not counted as an attempt)
+                    logger.warning("Outbox relay paused", extra={"error": str(e)})
+                    break
+                except Exception as e:
+                    failed.append(message.id)
+                    extra = {"message_id": message.id, "topic": message.topic, "error": str(e)}
+                    if message.attempts + 1 >= self.max_attempts:
+                        logger.error("Outbox message dead-lettered", extra=extra)
+                        OUTBOX_MESSAGES.labels(topic=message.topic, result="dead_lettered").inc()
+                    else:
+                        logger.warning("Outbox message delivery failed", extra=extra)
+                        OUTBOX_MESSAGES.labels(topic=message.topic, result="failed").inc()
+                    continue
+                delivered.append(message.id)
+                OUTBOX_MESSAGES.labels(topic=message.topic, result="published").inc()
+
+            if delivered:
+                await db.execute(delete(OutboxMessage).where(OutboxMessage.id.in_(delivered)))
+            if failed:
+                await db.execute(
+                    update(OutboxMessage)
+                    .where(OutboxMessage.id.in_(failed))
+                    .values(
+                        attempts=OutboxMessage.attempts + 1,
+                        dead_lettered_at=case(
+                            (OutboxMessage.attempts + 1 >= self.max_attempts, func.now()),
+                            else_=None,
+                        ),
+                    )
+                )
+            await db.commit()
+
+        return len(delivered)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                backlog = await self.relay_once() >= self.batch_size
+            except Exception as e:
+                logger.warning("Outbox relay failed", extra={"error": str(e)})
+                backlog = False
+            if not backlog:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self) -> None:
+        """Start relaying in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="outbox-relay")
+
+    async def stop(self) -> None:
+        """Stop the background task; undelivered messages wait in the table."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+outbox_relay = OutboxRelay()
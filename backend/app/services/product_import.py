@@ -0,0 +1,405 @@
+"""Bulk product and variant import from CSV or NDJSON.
+
+Each record holds a product's fields (keyed by ``slug``) and, optionally,
+one of its variants (``size``, ``sku``, ``stock``). NDJSON records may
+list several variants under ``variants`` instead. CSV ``images`` are
+separated by ``|``, and ``category`` is a category slug.
+
+The upload is first read to the end into a temporary file
+(``spool_upload``): a streaming response that read the request body while
+it was being sent would race Starlette's disconnect listener for the
+body's messages and lose some of them. The spooled file is then parsed
+and imported in chunks of IMPORT_CHUNK_SIZE records, each in its own
+transaction:
+
+    1. records are validated, category slugs resolved and SKUs checked
+       against variants of other products or sizes
+    2. products are upserted with INSERT ... ON CONFLICT (slug), updating
+       only the columns the records provided
+    3. variants are upserted with INSERT ... ON CONFLICT (product_id, size).
+       Stock is only set on new variants: an existing variant's stock is
+       live data, changed through the stock endpoints instead
+    4. the products' stock summary is refreshed
+
+The importer yields progress events as it goes. Invalid records are
+reported and skipped; a chunk the database rejects is rolled back,
+reported, and the import carries on with the next one.
+"""
+import asyncio
+import codecs
+import csv
+import tempfile
+import uuid
+from decimal import Decimal
+from typing import Any, AsyncIterator, Optional, Union
+
+import orjson
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
+from sqlalchemy import any_, func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger
+from app.models import Category, Product, ProductVariant
+from app.services.inventory_service import InventoryService
+
+logger = get_logger(__name__)
+
+IMPORT_CHUNK_SIZE = 1000
+
+# asyncpg allows at most 32767 bind parameters per statement, so multi-row
+# INSERTs are split to stay under it whatever the chunk holds
+MAX_BIND_PARAMS = 30000
+
+# Uploads up to this size are spooled in memory, larger ones to disk
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+SPOOL_READ_SIZE = 64 * 1024
+
+# Parsed records: (line number, fields) or (line number, error message)
+Record = tuple[int, Union[dict[str, Any], str]]
+
+
+class ProductImportVariant(BaseModel):
+    """One variant of an imported product."""
+    size: str = Field(min_length=1, max_length=20)
+    sku: Optional[str] = Field(None, min_length=1, max_length=100)
+    stock: int = Field(0, ge=0)
+
+
+class ProductImportRow(BaseModel):
+    """One import record."""
+    slug: str = Field(min_length=1, max_length=255)
+    name: str = Field(min_length=1, max_length=255)
+    description: Optional[str] = None
+    price: Decimal = Field(gt=0, max_digits=10, decimal_places=2)
+    compare_at_price: Optional[Decimal] = Field(None, gt=0, max_digits=10, decimal_places=2)
+    images: list[str] = []
+    brand: Optional[str] = Field(None, max_length=100)
+    material: Optional[str] = Field(None, max_length=100)
+    color: Optional[str] = Field(None, max_length=50)
+    gender: Optional[str] = Field(None, max_length=20)
+    is_active: bool = True
+    is_featured: bool = False
+    category: Optional[str] = None
+    meta_title: Optional[str] = Field(None, max_length=255)
+    meta_description: Optional[str] = Field(None, max_length=500)
+
+    # A single variant (CSV), or several (NDJSON)
+    size: Optional[str] = None
+    sku: Optional[str] = None
+    stock: Optional[int] = None
+    variants: list[ProductImportVariant] = []
+
+    @field_validator("images", mode="before")
+    @classmethod
+    def split_images(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            return [image.strip() for image in value.split("|") if image.strip()]
+        return value
+
+    @model_validator(mode="after")
+    def collect_variant(self) -> "ProductImportRow":
+        if self.size is not None:
+            self.variants.append(
+                ProductImportVariant(size=self.size, sku=self.sku, stock=self.stock or 0)
+            )
+        return self
+
+
+# Product columns an import record can set, besides slug
+PRODUCT_COLUMNS = [
+    "name", "description", "price", "compare_at_price", "images", "brand", "material",
+    "color", "gender", "is_active", "is_featured", "category_id", "meta_title",
+    "meta_description",
+]
+
+
+async def spool_upload(chunks: AsyncIterator[bytes]) -> tempfile.SpooledTemporaryFile:
+    """Read an upload to the end into a temporary file; the caller closes it."""
+    upload = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    try:
+        async for chunk in chunks:
+            await asyncio.to_thread(upload.write, chunk)
+    except BaseException:
+        upload.close()
+        raise
+    return upload
+
+
+async def read_spool(upload: tempfile.SpooledTemporaryFile) -> AsyncIterator[bytes]:
+    """Read a spooled upload back from the start, in chunks."""
+    upload.seek(0)
+    while chunk := await asyncio.to_thread(upload.read, SPOOL_READ_SIZE):
+        yield chunk
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into text lines (UTF-8, optional BOM)."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def parse_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """Parse a CSV upload with a header row; empty cells are left out."""
+    header: Optional[list[str]] = None
+    record: list[str] = []
+    quotes = 0
+    line_no = start = 0
+    async for line in _lines(chunks):
+        line_no += 1
+        if not record:
+            if not line.strip():
+                continue
+            start = line_no
+        record.append(line)
+        # An odd number of quotes so far means a quoted field continues on the next line
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+
+        fields = next(csv.reader(["\n".join(record)]))
+        record, quotes = [], 0
+        if header is None:
+            header = [name.strip() for name in fields]
+            continue
+        if len(fields) != len(header):
+            yield start, f"Expected {len(header)} columns, got {len(fields)}"
+            continue
+        yield start, {name: value for name, value in zip(header, fields) if value != ""}
+
+    if record:
+        yield start, "Unterminated quoted field"
+
+
+async def parse_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """Parse an NDJSON upload: one JSON object per line."""
+    line_no = 0
+    async for line in _lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            data = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            yield line_no, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield line_no, "Expected a JSON object"
+            continue
+        yield line_no, data
+
+
+def _batches(values: list[dict]) -> list[list[dict]]:
+    """Split rows for multi-row INSERTs, keeping each under MAX_BIND_PARAMS."""
+    size = max(1, MAX_BIND_PARAMS // len(values[0])) if values else 1
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'record'}: {e['msg']}"
+        for e in error.errors()
+    )
+
+
+class ProductImporter:
+    """Imports parsed records in chunks, yielding progress events."""
+
+    def __init__(self, db: AsyncSession, chunk_size: int = IMPORT_CHUNK_SIZE):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.categories: dict[str, uuid.UUID] = {}
+        self.counts = {
+            "records": 0,
+            "products_created": 0,
+            "products_updated": 0,
+            "variants_created": 0,
+            "variants_updated": 0,
+            "errors": 0,
+        }
+
+    def _error(self, line: int, message: str) -> dict:
+        self.counts["errors"] += 1
+        return {"event": "error", "line": line, "message": message}
+
+    async def run(self, records: AsyncIterator[Record]) -> AsyncIterator[dict]:
+        """
+        Import records, yielding an "error" event per rejected record, a
+        "progress" event per chunk and a final "done" event.
+        """
+        result = await self.db.execute(select(Category.slug, Category.id))
+        self.categories = dict(result.all())
+
+        chunk: list[tuple[int, ProductImportRow]] = []
+        async for line, record in records:
+            self.counts["records"] += 1
+            if isinstance(record, str):
+                yield self._error(line, record)
+                continue
+            try:
+                row = ProductImportRow.model_validate(record)
+            except ValidationError as e:
+                yield self._error(line, _validation_message(e))
+                continue
+            if row.category is not None and row.category not in self.categories:
+                yield self._error(line, f"Category {row.category!r} not found")
+                continue
+            chunk.append((line, row))
+
+            if len(chunk) >= self.chunk_size:
+                async for event in self._import_chunk(chunk):
+                    yield event
+                chunk = []
+
+        if chunk:
+            async for event in self._import_chunk(chunk):
+                yield event
+
+        logger.info("Product import finished", extra=self.counts)
+        yield {"event": "done", **self.counts}
+
+    async def _import_chunk(self, chunk: list[tuple[int, ProductImportRow]]) -> AsyncIterator[dict]:
+        rows: list[tuple[int, ProductImportRow]] = []
+        async for event in self._check_skus(chunk, rows):
+            yield event
+        if not rows:
+            yield {"event": "progress", **self.counts}
+            return
+
+        # Created/updated counts only reach the totals once the chunk commits
+        counts = dict.fromkeys(
+            ("products_created", "products_updated", "variants_created", "variants_updated"), 0
+        )
+        try:
+            product_ids = await self._upsert_products([row for _, row in rows], counts)
+            await self._upsert_variants([row for _, row in rows], product_ids, counts)
+            await InventoryService(self.db).refresh_stock_summary(product_ids.values())
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            logger.warning("Product import chunk failed", extra={"error": str(e)})
+            first, last = rows[0][0], rows[-1][0]
+            yield self._error(first, f"Records on lines {first}-{last} not imported: {e}")
+            self.counts["errors"] += len(rows) - 1
+        else:
+            for name, count in counts.items():
+                self.counts[name] += count
+
+        yield {"event": "progress", **self.counts}
+
+    async def _check_skus(
+        self, chunk: list[tuple[int, ProductImportRow]], accepted: list
+    ) -> AsyncIterator[dict]:
+        """Reject records whose SKUs belong to another product or size."""
+        skus = [v.sku for _, row in chunk for v in row.variants if v.sku]
+        owners: dict[str, tuple[str, str]] = {}
+        if skus:
+            result = await self.db.execute(
+                select(ProductVariant.sku, Product.slug, ProductVariant.size)
+                .join(Product, Product.id == ProductVariant.product_id)
+                .where(ProductVariant.sku == any_(skus))
+            )
+            owners = {sku: (slug, size) for sku, slug, size in result.all()}
+
+        for line, row in chunk:
+            conflict = next(
+                (
+                    v.sku
+                    for v in row.variants
+                    if v.sku and owners.setdefault(v.sku, (row.slug, v.size)) != (row.slug, v.size)
+                ),
+                None,
+            )
+            if conflict:
+                yield self._error(line, f"SKU {conflict!r} is used by another variant")
+            else:
+                accepted.append((line, row))
+
+    async def _upsert_products(
+        self, rows: list[ProductImportRow], counts: dict[str, int]
+    ) -> dict[str, uuid.UUID]:
+        """Upsert products by slug; returns product IDs by slug."""
+        # Last record wins for a slug; records giving the same fields share a statement
+        by_slug = {row.slug: row for row in rows}
+        groups: dict[frozenset, list[dict]] = {}
+        for row in by_slug.values():
+            values = {
+                "id": uuid.uuid4(),
+                "slug": row.slug,
+                "name": row.name,
+                "description": row.description,
+                "price": row.price,
+                "compare_at_price": row.compare_at_price,
+                "images": row.images,
+                "brand": row.brand,
+                "material": row.material,
+                "color": row.color,
+                "gender": row.gender,
+                "is_active": row.is_active,
+                "is_featured": row.is_featured,
+                "category_id": self.categories.get(row.category) if row.category else None,
+                "meta_title": row.meta_title,
+                "meta_description": row.meta_description,
+            }
+            provided = set(row.model_fields_set)
+            if "category" in provided:
+                provided.add("category_id")
+            columns = frozenset(c for c in PRODUCT_COLUMNS if c in provided)
+            groups.setdefault(columns, []).append(values)
+
+        product_ids: dict[str, uuid.UUID] = {}
+        for columns, group in groups.items():
+            for values in _batches(group):
+                stmt = pg_insert(Product).values(values)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[Product.slug],
+                    set_={**{c: stmt.excluded[c] for c in columns}, "updated_at": func.now()},
+                ).returning(Product.slug, Product.id, literal_column("xmax = 0").label("created"))
+                for slug, product_id, created in (await self.db.execute(stmt)).all():
+                    product_ids[slug] = product_id
+                    counts["products_created" if created else "products_updated"] += 1
+        return product_ids
+
+    async def _upsert_variants(
+        self,
+        rows: list[ProductImportRow],
+        product_ids: dict[str, uuid.UUID],
+        counts: dict[str, int],
+    ) -> None:
+        """Upsert variants by (product_id, size)."""
+        # Last record wins for a product and size
+        variants = {
+            (product_ids[row.slug], v.size): {
+                "id": uuid.uuid4(),
+                "product_id": product_ids[row.slug],
+                "size": v.size,
+                "sku": v.sku,
+                "stock": v.stock,
+                "version": 1,
+            }
+            for row in rows
+            for v in row.variants
+        }
+        for values in _batches(list(variants.values())):
+            stmt = pg_insert(ProductVariant).values(values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ProductVariant.product_id, ProductVariant.size],
+                set_={
+                    "sku": stmt.excluded.sku,
+                    "version": ProductVariant.version + 1,
+                    "updated_at": func.now(),
+                },
+                # Only a new SKU changes an existing variant
+                where=(stmt.excluded.sku.isnot(None))
+                & ProductVariant.sku.is_distinct_from(stmt.excluded.sku),
+            ).returning(literal_column("xmax = 0"))
+            for (created,) in (await self.db.execute(stmt)).all():
+                counts["variants_created" if created else "variants_updated"] += 1
@@ -3,17 +3,24 @@ from uuid import UUID
 from typing import Optional
 from decimal import Decimal
 
-from sqlalchemy import select, func, or_, and_
+from sqlalchemy import Numeric, Select, distinct, func, or_, select, true, tuple_
+from sqlalchemy.dialects.postgresql import array
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Product, ProductVariant, Category
+from app.models import Product, Category
 from app.schemas import (
     ProductFilters, ProductResponse, ProductListResponse,
+    ProductSummary, ProductSummaryListResponse,
     ProductVariantResponse, CategoryResponse,
+    FacetCount, PriceRangeCount, ProductFacets,
 )
 
 
+# Upper bounds of the catalog price facet ranges; the last range is open-ended
+PRICE_FACET_BOUNDS = (Decimal("50"), Decimal("100"), Decimal("150"), Decimal("200"))
+
+
 class ProductService:
     """Service for product-related operations."""
 
@@ -36,80 +43,10 @@ class ProductService:
             )
             .where(Product.is_active == True)
         )
-
-        # Apply filters
-        if filters:
-            if filters.category_id:
-                query = query.where(Product.category_id == filters.category_id)
-
-            if filters.category_slug:
-                query = query.join(Category).where(Category.slug == filters.category_slug)
-
-            if filters.brand:
-                query = query.where(Product.brand.ilike(f"%{filters.brand}%"))
-
-            if filters.color:
-                query = query.where(Product.color.ilike(f"%{filters.color}%"))
-
-            if filters.gender:
-                if filters.gender in ("men", "women"):
-                    query = query.where(
-                        or_(
-                            Product.gender == filters.gender,
-                            Product.gender == "unisex"
-                        )
-                    )
-                else:
-                    query = query.where(Product.gender == filters.gender)
-
-            if filters.min_price is not None:
-                query = query.where(Product.price >= filters.min_price)
-
-            if filters.max_price is not None:
-                query = query.where(Product.price <= filters.max_price)
-
-            if filters.is_featured:
-                query = query.where(Product.is_featured == True)
-
-            if filters.search:
-                search_term = f"%{filters.search}%"
-                query = query.where(
-                    or_(
-                        Product.name.ilike(search_term),
-                        Product.description.ilike(search_term),
-                        Product.brand.ilike(search_term),
-                    )
-                )
-
-            if filters.sizes:
-                # Filter products that have at least one variant with the specified size and stock > 0
-                query = query.where(
-                    Product.id.in_(
-                        select(ProductVariant.product_id)
-                        .where(
-                            and_(
-                                ProductVariant.size.in_(filters.sizes),
-                                ProductVariant.stock > 0,
-                            )
-                        )
-                        .distinct()
-                    )
-                )
-
-            if filters.in_stock:
-                # Filter products that have at least one variant with stock > 0
-                query = query.where(
-                    Product.id.in_(
-                        select(ProductVariant.product_id)
-                        .where(ProductVariant.stock > 0)
-                        .distinct()
-                    )
-                )
+        query = self._apply_filters(query, filters)
 
         # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar() or 0
+        total = await self._count_products(filters)
 
         # Apply pagination
         offset = (page - 1) * page_size
@@ -131,6 +68,224 @@ class ProductService:
             pages=pages,
         )
 
+    async def get_product_summaries(
+        self,
+        filters: Optional[ProductFilters] = None,
+        page: int = 1,
+        page_size: int = 12,
+    ) -> ProductSummaryListResponse:
+        """Get paginated product summaries for grid views.
+
+        Selects only the columns a product card needs (stock and sizes come
+        from the denormalized summary columns), so no ORM entities are
+        hydrated and variants are never read.
+        """
+        query = self._summary_query().where(Product.is_active == True)
+        query = self._apply_filters(query, filters)
+
+        total = await self._count_products(filters)
+
+        offset = (page - 1) * page_size
+        query = query.order_by(Product.created_at.desc()).offset(offset).limit(page_size)
+
+        result = await self.db.execute(query)
+        items = [ProductSummary.model_validate(row) for row in result.mappings()]
+        pages = (total + page_size - 1) // page_size if page_size > 0 else 0
+
+        return ProductSummaryListResponse(
+            items=items,
+            total=total,
+            page=page,
+            page_size=page_size,
+            pages=pages,
+        )
+
+    async def get_featured_summaries(self, limit: int = 8) -> list[ProductSummary]:
+        """Get featured product summaries."""
+        query = (
+            self._summary_query()
+            .where(Product.is_active == True, Product.is_featured == True)
+            .order_by(Product.created_at.desc())
+            .limit(limit)
+        )
+
+        result = await self.db.execute(query)
+        return [ProductSummary.model_validate(row) for row in result.mappings()]
+
+    async def get_facets(self, filters: Optional[ProductFilters] = None) -> ProductFacets:
+        """
+        Get facet counts (brand, color, gender, size, price range) for a filter set.
+
+        All facets and the total are computed in one grouped pass using
+        GROUPING SETS over the filtered products, with sizes unnested from
+        the denormalized available_sizes column.
+        """
+        base = self._apply_filters(
+            select(
+                Product.id,
+                Product.brand,
+                Product.color,
+                Product.gender,
+                Product.available_sizes,
+                func.width_bucket(
+                    Product.price, array(PRICE_FACET_BOUNDS, type_=Numeric(10, 2))
+                ).label("price_bucket"),
+            ).where(Product.is_active == True),
+            filters,
+        ).subquery()
+        sizes = (
+            func.unnest(base.c.available_sizes)
+            .table_valued("size")
+            .render_derived()
+            .lateral("sizes")
+        )
+
+        facet_columns = {
+            "brands": base.c.brand,
+            "colors": base.c.color,
+            "genders": base.c.gender,
+            "sizes": sizes.c.size,
+            "price_ranges": base.c.price_bucket,
+        }
+        columns = list(facet_columns.values())
+
+        query = (
+            select(
+                *columns,
+                func.grouping(*columns).label("grouping"),
+                func.count(distinct(base.c.id)).label("count"),
+            )
+            .select_from(base.outerjoin(sizes, true()))
+            .group_by(
+                func.grouping_sets(*(tuple_(column) for column in columns), tuple_())
+            )
+        )
+        result = await self.db.execute(query)
+
+        # grouping() sets one bit per column that is NOT grouped, first column highest
+        all_bits = (1 << len(columns)) - 1
+        facet_by_mask = {
+            all_bits ^ (1 << (len(columns) - 1 - index)): name
+            for index, name in enumerate(facet_columns)
+        }
+
+        total = 0
+        counts: dict[str, list[tuple]] = {name: [] for name in facet_columns}
+        for row in result:
+            if row.grouping == all_bits:
+                total = row.count
+                continue
+            name = facet_by_mask[row.grouping]
+            value = row[list(facet_columns).index(name)]
+            if value is not None:
+                counts[name].append((value, row.count))
+
+        def by_count(pairs: list[tuple]) -> list[FacetCount]:
+            return [
+                FacetCount(value=value, count=count)
+                for value, count in sorted(pairs, key=lambda p: (-p[1], p[0]))
+            ]
+
+        bounds = (None, *PRICE_FACET_BOUNDS, None)
+        price_ranges = [
+            PriceRangeCount(min_price=bounds[bucket], max_price=bounds[bucket + 1], count=count)
+            for bucket, count in sorted(counts["price_ranges"])
+        ]
+
+        return ProductFacets(
+            total=total,
+            brands=by_count(counts["brands"]),
+            colors=by_count(counts["colors"]),
+            genders=by_count(counts["genders"]),
+            sizes=[FacetCount(value=v, count=c) for v, c in sorted(counts["sizes"])],
+            price_ranges=price_ranges,
+        )
+
+    def _summary_query(self) -> Select:
+        """Build the column projection behind ProductSummary."""
+        return select(
+            Product.id,
+            Product.name,
+            Product.slug,
+            Product.price,
+            Product.compare_at_price,
+            Product.images,
+            Product.brand,
+            Product.color,
+            Product.gender,
+            Product.is_featured,
+            Product.category_id,
+            Product.in_stock,
+            Product.available_sizes,
+        )
+
+    async def _count_products(self, filters: Optional[ProductFilters]) -> int:
+        """Count active products matching the filters."""
+        query = self._apply_filters(
+            select(Product.id).where(Product.is_active == True), filters
+        )
+        count_query = select(func.count()).select_from(query.subquery())
+        result = await self.db.execute(count_query)
+        return result.scalar() or 0
+
+    def _apply_filters(self, query: Select, filters: Optional[ProductFilters]) -> Select:
+        """Apply catalog filters to a query over products."""
+        if not filters:
+            return query
+
+        if filters.category_id:
+            query = query.where(Product.category_id == filters.category_id)
+
+        if filters.category_slug:
+            query = query.join(Category, Category.id == Product.category_id).where(
+                Category.slug == filters.category_slug
+            )
+
+        if filters.brand:
+            query = query.where(Product.brand.ilike(f"%{filters.brand}%"))
+
+        if filters.color:
+            query = query.where(Product.color.ilike(f"%{filters.color}%"))
+
+        if filters.gender:
+            if filters.gender in ("men", "women"):
+                query = query.where(
+                    or_(
+                        Product.gender == filters.gender,
+                        Product.gender == "unisex"
+                    )
+                )
+            else:
+                query = query.where(Product.gender == filters.gender)
+
+        if filters.min_price is not None:
+            query = query.where(Product.price >= filters.min_price)
+
+        if filters.max_price is not None:
+            query = query.where(Product.price <= filters.max_price)
+
+        if filters.is_featured:
+            query = query.where(Product.is_featured == True)
+
+        if filters.search:
+            search_term = f"%{filters.search}%"
+            query = query.where(
+                or_(
+                    Product.name.ilike(search_term),
+                    Product.description.ilike(search_term),
+                    Product.brand.ilike(search_term),
+                )
+            )
+
+        if filters.sizes:
+            # Products with at least one in-stock variant in any of the sizes (GIN-indexed)
+            query = query.where(Product.available_sizes.overlap(filters.sizes))
+
+        if filters.in_stock:
+            query = query.where(Product.in_stock == True)
+
+        return query
+
     async def get_product_by_id(self, product_id: UUID) -> Optional[ProductResponse]:
         """Get a single product by ID."""
         query = (
@@ -202,10 +357,6 @@ class ProductService:
             for v in product.variants
         ]
 
-        # Calculate derived fields
-        in_stock = any(v.stock > 0 for v in product.variants)
-        available_sizes = sorted(set(v.size for v in product.variants if v.stock > 0))
-
         category = None
         if product.category:
             category = CategoryResponse(
@@ -240,8 +391,8 @@ class ProductService:
             created_at=product.created_at,
             updated_at=product.updated_at,
             variants=variants,
-            in_stock=in_stock,
-            available_sizes=available_sizes,
+            in_stock=product.in_stock,
+            available_sizes=product.available_sizes,
         )
 
 
@@ -0,0 +1,103 @@
+"""Statistics service - platform statistics for the About page."""
+from typing import Optional
+
+import orjson
+import redis.asyncio as redis
+from sqlalchemy import select, func, distinct
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import record_cache_lookup
+from app.core.redis import REDIS_UNAVAILABLE, RedisManager
+from app.models.user import User
+from app.models.product import Product
+from app.models.order import Order, OrderStatus
+
+logger = get_logger(__name__)
+
+STATISTICS_KEY = "statistics:platform"
+
+
+class StatisticsService:
+    """Service for platform statistics, cached in Redis.
+
+    The statistics task (app.tasks.statistics) recomputes them on a
+    schedule; requests only compute them on a cache miss.
+    """
+
+    def __init__(self, db: AsyncSession, cache: Optional[redis.Redis] = None):
+        self.db = db
+        self.cache = cache
+        self.breaker = RedisManager.get_breaker("cache")
+
+    async def compute(self) -> dict:
+        """Compute the statistics from the database (one round trip)."""
+        query = select(
+            # Total customers (users)
+            select(func.count(User.id)).scalar_subquery().label("total_customers"),
+            # Total active products
+            select(func.count(Product.id))
+            .where(Product.is_active == True)
+            .scalar_subquery()
+            .label("total_products"),
+            # Total brands (distinct)
+            select(func.count(distinct(Product.brand)))
+            .where(Product.is_active == True, Product.brand.isnot(None))
+            .scalar_subquery()
+            .label("total_brands"),
+            select(func.count(Order.id))
+            .where(Order.status == OrderStatus.DELIVERED)
+            .scalar_subquery()
+            .label("delivered_orders"),
+            select(func.count(Order.id))
+            .where(Order.status.notin_([OrderStatus.CANCELLED]))
+            .scalar_subquery()
+            .label("total_orders"),
+        )
+        row = (await self.db.execute(query)).one()
+
+        # Calculate rating (minimum 4.5, scales up based on order success rate)
+        # Rating = 4.5 + (delivered orders / total orders) * 0.5
+        if row.total_orders > 0:
+            success_rate = row.delivered_orders / row.total_orders
+            customer_rating = round(4.5 + (success_rate * 0.5), 1)
+        else:
+            customer_rating = 4.9  # Default when no orders exist
+
+        return {
+            "total_customers": row.total_customers,
+            "total_products": row.total_products,
+            "total_brands": row.total_brands,
+            "customer_rating": customer_rating,
+        }
+
+    async def get(self) -> dict:
+        """Get the cached statistics, computing them on a miss."""
+        if self.cache is not None:
+            try:
+                async with self.breaker.guard():
+                    cached = await self.cache.get(STATISTICS_KEY)
+            except REDIS_UNAVAILABLE as e:
+                logger.debug("Statistics cache unavailable", extra={"error": str(e)})
+                return await self.compute()
+            record_cache_lookup("statistics", hit=cached is not None)
+            if cached is not None:
+                return orjson.loads(cached)
+
+        return await self.refresh()
+
+    async def refresh(self) -> dict:
+        """Recompute the statistics and cache them."""
+        statistics = await self.compute()
+        if self.cache is not None:
+            try:
+                async with self.breaker.guard():
+                    await self.cache.set(
+                        STATISTICS_KEY,
+                        orjson.dumps(statistics),
+                        ex=settings.statistics_cache_ttl_seconds,
+                    )
+            except REDIS_UNAVAILABLE as e:
+                logger.debug("Statistics not cached", extra={"error": str(e)})
+        return statistics
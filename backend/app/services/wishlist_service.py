@@ -103,8 +103,6 @@ class WishlistService:
 
         # Build variants list
         variants = []
-        available_sizes = []
-        in_stock = False
 
         if prod.variants:
             for v in prod.variants:
@@ -119,9 +117,6 @@ class WishlistService:
                         updated_at=v.updated_at,
                     )
                 )
-                if v.stock > 0:
-                    in_stock = True
-                    available_sizes.append(v.size)
 
         # Build category response
         category_response = None
@@ -158,8 +153,8 @@ class WishlistService:
             created_at=prod.created_at,
             updated_at=prod.updated_at,
             variants=variants,
-            in_stock=in_stock,
-            available_sizes=available_sizes,
+            in_stock=prod.in_stock,
+            available_sizes=prod.available_sizes,
         )
 
         return WishlistItemResponse(
@@ -1 +1,8 @@
-# Celery tasks package
+"""Celery tasks package.
+
+The Celery application and its beat schedule are in app.tasks.celery_app;
+task modules are grouped by feature (carts, events, identity, statistics).
+"""
+from app.tasks.celery_app import celery_app
+
+__all__ = ["celery_app"]
@@ -0,0 +1,63 @@
+"""Cart maintenance tasks."""
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.redis import RedisManager
+from app.db.base import async_session_maker
+from app.services.cart_store import CartStore, delete_idle_carts
+from app.services.cart_sync import CartSyncWorker
+from app.tasks.celery_app import celery_app, run_async
+
+logger = get_logger(__name__)
+
+CLEANUP_BATCH_SIZE = 1000
+
+
+async def _sync_dirty() -> None:
+    worker = CartSyncWorker()
+    while await worker.sync_once():
+        pass
+
+
+@celery_app.task(name="carts.sync_dirty")
+def sync_dirty() -> None:
+    """Copy every dirty cart to Postgres."""
+    run_async(_sync_dirty())
+
+
+async def _warm_cache(hours: int) -> int:
+    changed_since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    carts = await RedisManager.get_cart_shards()
+    async with async_session_maker() as db:
+        warmed = await CartStore(db, carts).warm(changed_since)
+    if warmed:
+        logger.info("Cart cache warmed", extra={"carts": warmed})
+    return warmed
+
+
+@celery_app.task(name="carts.warm_cache")
+def warm_cache(hours: int = settings.cart_warm_hours) -> int:
+    """Put recently changed carts missing from Redis back into it."""
+    return run_async(_warm_cache(hours))
+
+
+async def _cleanup_idle(days: int) -> int:
+    idle_before = datetime.now(timezone.utc) - timedelta(days=days)
+    deleted = 0
+    async with async_session_maker() as db:
+        while True:
+            count = await delete_idle_carts(db, idle_before, CLEANUP_BATCH_SIZE)
+            await db.commit()
+            deleted += count
+            if count < CLEANUP_BATCH_SIZE:
+                break
+    if deleted:
+        logger.info("Idle carts deleted", extra={"carts": deleted})
+    return deleted
+
+
+@celery_app.task(name="carts.cleanup_idle")
+def cleanup_idle(days: int = settings.cart_retention_days) -> int:
+    """Delete anonymous carts nobody has touched for a while."""
+    return run_async(_cleanup_idle(days))
@@ -0,0 +1,133 @@
+"""Celery application.
+
+Run a worker and the scheduler with:
+
+    celery -A app.tasks.celery_app worker --loglevel=INFO
+    celery -A app.tasks.celery_app beat --loglevel=INFO
+
+The broker is Redis (settings.celery_broker_url, defaulting to
+settings.redis_url). Task results are not stored: tasks report through
+logs and metrics. Tasks are acknowledged after they finish, so a task
+interrupted by a worker crash runs again; every task must be safe to
+repeat.
+
+Tasks reuse the async services. Each worker process keeps one event loop
+(run_async), so the database engine's and RedisManager's pooled
+connections, which belong to a loop, are reused between tasks.
+
+Task runs and durations are recorded as Prometheus metrics. Worker
+processes share them through PROMETHEUS_MULTIPROC_DIR, and the worker
+serves them on settings.celery_metrics_port.
+
+With settings.celery_task_always_eager, ``.delay()`` runs the task inline
+in the caller instead of sending it to the broker (local testing; the
+caller must not be inside a running event loop).
+"""
+import asyncio
+import time
+from typing import Any, Coroutine, Optional, TypeVar
+
+from celery import Celery, signals
+
+from app.core.config import settings
+from app.core.logging import setup_logging, shutdown_logging
+from app.core.metrics import TASK_DURATION, TASK_RUNS, mark_process_dead, start_metrics_server
+from app.core.redis import RedisManager
+from app.db.base import engine
+
+T = TypeVar("T")
+
+celery_app = Celery(
+    "footy",
+    broker=settings.celery_broker_url or settings.redis_url,
+    include=[
+        "app.tasks.carts",
+        "app.tasks.events",
+        "app.tasks.identity",
+        "app.tasks.statistics",
+    ],
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    task_ignore_result=True,
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,  # Long tasks should not hold back queued ones
+    task_always_eager=settings.celery_task_always_eager,
+    task_eager_propagates=True,
+    broker_connection_retry_on_startup=True,
+    timezone="UTC",
+    beat_schedule={
+        # Backstops for the API workers' own relay and cart sync loops
+        "relay-outbox": {"task": "events.relay_outbox", "schedule": 30.0},
+        "sync-carts": {"task": "carts.sync_dirty", "schedule": 60.0},
+        "backfill-identity-links": {"task": "identity.backfill_links", "schedule": 60.0},
+        "recompute-statistics": {"task": "statistics.recompute", "schedule": 300.0},
+        "warm-cart-cache": {"task": "carts.warm_cache", "schedule": 3600.0},
+        "cleanup-carts": {"task": "carts.cleanup_idle", "schedule": 6 * 3600.0},
+    },
+)
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine on this process's event loop."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
+
+
+async def _close_connections() -> None:
+    await RedisManager.close()
+    await engine.dispose()
+
+
+@signals.setup_logging.connect
+def _setup_logging(**kwargs: Any) -> None:
+    # Same JSON logging as the API instead of Celery's own configuration
+    setup_logging(settings.debug)
+
+
+@signals.worker_init.connect
+def _init_worker(**kwargs: Any) -> None:
+    if settings.celery_metrics_port:
+        start_metrics_server(settings.celery_metrics_port)
+
+
+@signals.worker_process_init.connect
+def _init_worker_process(**kwargs: Any) -> None:
+    # The log writer thread does not survive the fork
+    setup_logging(settings.debug)
+
+
+@signals.worker_process_shutdown.connect
+def _shutdown_worker_process(pid: Optional[int] = None, **kwargs: Any) -> None:
+    if _loop is not None and not _loop.is_closed():
+        run_async(_close_connections())
+        _loop.close()
+    mark_process_dead(pid)
+    shutdown_logging()
+
+
+# Per-task metrics (start times by task ID)
+_started: dict[str, float] = {}
+
+
+@signals.task_prerun.connect
+def _task_started(task_id: str, **kwargs: Any) -> None:
+    _started[task_id] = time.perf_counter()
+
+
+@signals.task_postrun.connect
+def _task_finished(task_id: str, task: Any, state: Optional[str] = None, **kwargs: Any) -> None:
+    started = _started.pop(task_id, None)
+    if started is not None:
+        TASK_DURATION.labels(task=task.name).observe(time.perf_counter() - started)
+    TASK_RUNS.labels(
+        task=task.name,
+        state={"SUCCESS": "succeeded", "RETRY": "retried"}.get(state, "failed"),
+    ).inc()
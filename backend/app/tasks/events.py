@@ -0,0 +1,19 @@
+"""Outbox event tasks."""
+from app.services.outbox import OutboxRelay
+from app.tasks.celery_app import celery_app, run_async
+
+
+async def _relay_outbox() -> int:
+    relay = OutboxRelay()
+    relayed = 0
+    while delivered := await relay.relay_once():
+        relayed += delivered
+        if delivered < relay.batch_size:
+            break
+    return relayed
+
+
+@celery_app.task(name="events.relay_outbox")
+def relay_outbox() -> int:
+    """Deliver every pending outbox message; returns how many were delivered."""
+    return run_async(_relay_outbox())
@@ -0,0 +1,28 @@
+"""Identity linking tasks."""
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.base import async_session_maker
+from app.services.event_service import EventService
+from app.tasks.celery_app import celery_app, run_async
+
+logger = get_logger(__name__)
+
+
+async def _backfill_links(batch_size: int) -> int:
+    updated = 0
+    async with async_session_maker() as db:
+        service = EventService(db)
+        while True:
+            count = await service.backfill_identity_links(batch_size)
+            updated += count
+            if count < batch_size:
+                break
+    if updated:
+        logger.info("Identity links backfilled", extra={"events": updated})
+    return updated
+
+
+@celery_app.task(name="identity.backfill_links")
+def backfill_links(batch_size: int = settings.identity_backfill_batch_size) -> int:
+    """Attach users to the anonymous events of their linked sessions."""
+    return run_async(_backfill_links(batch_size))
@@ -0,0 +1,17 @@
+"""Statistics tasks."""
+from app.core.redis import RedisManager
+from app.db.base import async_session_maker
+from app.services.statistics_service import StatisticsService
+from app.tasks.celery_app import celery_app, run_async
+
+
+async def _recompute() -> dict:
+    cache = await RedisManager.get_client("cache")
+    async with async_session_maker() as db:
+        return await StatisticsService(db, cache).refresh()
+
+
+@celery_app.task(name="statistics.recompute")
+def recompute() -> dict:
+    """Recompute the platform statistics and refresh their cache."""
+    return run_async(_recompute())
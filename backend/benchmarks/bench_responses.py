@@ -0,0 +1,80 @@
+"""Benchmark the default response path against FastJSONResponse.
+
+Compares the per-response cost of what FastAPI does for a route returning a
+model with ``response_model`` set (validate against the response field,
+dump to JSON-compatible Python, ``json.dumps``) against ``fast_json_response``
+(direct pydantic-core serialization) for a full 100-item product page.
+
+Run from the backend directory:
+    python -m benchmarks.bench_responses
+"""
+import json
+import timeit
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from pydantic import TypeAdapter
+
+from app.core.responses import FastJSONResponse
+from app.schemas import (
+    CategoryResponse, ProductListResponse, ProductResponse, ProductVariantResponse,
+)
+
+SIZES = ["36", "37", "38", "39", "40", "41", "42", "43", "44", "45", "46"]
+
+
+def build_page(page_size: int = 100) -> ProductListResponse:
+    """Build a product page shaped like GET /products output."""
+    now = datetime.now(timezone.utc)
+    category = CategoryResponse(
+        id=uuid.uuid4(), name="Sneakers", slug="sneakers",
+        description="Casual and athletic sneakers", image_url=None, parent_id=None,
+        created_at=now, updated_at=now,
+    )
+    items = []
+    for i in range(page_size):
+        product_id = uuid.uuid4()
+        variants = [
+            ProductVariantResponse(
+                id=uuid.uuid4(), product_id=product_id, size=size,
+                sku=f"SKU-{i}-{size}", stock=i % 7, created_at=now, updated_at=now,
+            )
+            for size in SIZES
+        ]
+        items.append(ProductResponse(
+            id=product_id, name=f"Product {i}", slug=f"product-{i}",
+            description="Lorem ipsum dolor sit amet " * 10,
+            price=Decimal("149.99"), compare_at_price=Decimal("179.99"),
+            images=[f"/images/products/product-{i}-1.jpg"],
+            brand="Nike", material="Leather/Mesh", color="White/Red", gender="unisex",
+            is_active=True, is_featured=False, category_id=category.id, category=category,
+            meta_title=None, meta_description=None, created_at=now, updated_at=now,
+            variants=variants, in_stock=True, available_sizes=SIZES,
+        ))
+    return ProductListResponse(
+        items=items, total=page_size, page=1, page_size=page_size, pages=1,
+    )
+
+
+def main(number: int = 200) -> None:
+    page = build_page()
+    adapter = TypeAdapter(ProductListResponse)
+
+    def default_path() -> bytes:
+        validated = adapter.validate_python(page, from_attributes=True)
+        content = adapter.dump_python(validated, mode="json")
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def fast_path() -> bytes:
+        return FastJSONResponse(page).body
+
+    assert json.loads(default_path()) == json.loads(fast_path())
+
+    for name, fn in (("default", default_path), ("fast_json", fast_path)):
+        seconds = min(timeit.repeat(fn, number=number, repeat=5))
+        print(f"{name:>10}: {seconds / number * 1000:8.3f} ms/response")
+
+
+if __name__ == "__main__":
+    main()